@@ -1,7 +1,7 @@
 import os
 import platform
 from pathlib import Path
-from typing import Annotated, Iterable
+from typing import Annotated, Any, Iterable
 
 from pydantic import AfterValidator, BaseModel
 from pydantic_settings import (
@@ -170,6 +170,42 @@ class StockDB(BaseModel):
     port: int
     data_base_path: Annotated[Path, AfterValidator(_resolve_data_path)]
     download_batch_size: int
+    # concurrent download engine, defaults keep older config files valid
+    download_workers: int = 4
+    download_rate_limit: float = 1.0  # batch requests per second
+    download_max_retries: int = 3
+    # streaming merge, flush downloaded data once either limit is reached
+    download_flush_batches: int = 10
+    download_flush_rows: int = 1_000_000
+    # feature store, indicators kept up to date in `{exchange}/ticker_features` after every download,
+    # given as `stocksense.strategy.ta.incremental` specs. Empty list disables the feature store
+    feature_indicators: list[dict[str, Any]] = [
+        {"name": "SMA", "period": 50},
+        {"name": "SMA", "period": 200},
+        {"name": "EMA", "period": 20},
+        {"name": "RSI", "period": 14},
+        {"name": "MACD"},
+        {"name": "BBANDS", "period": 20},
+        {"name": "ATR", "period": 14},
+        {"name": "OBV"},
+    ]
+    feature_batch_size: int = 500  # tickers per feature store commit
+    # latest bars per ticker kept in `{exchange}/ticker_snapshot`
+    screener_bars: int = 5
+    # days, tickers whose latest bar is older than the exchange's latest one by more (e.g. delisted
+    # or suspended) are left out of the snapshot
+    screener_max_age: int = 7
+    # SQL query engine, a pool of DuckDB connections each running one query at a time
+    sql_connections: int = 4
+    sql_threads: int = 2  # DuckDB threads per query
+    sql_memory_limit: str = "1GB"  # DuckDB memory limit per query
+    sql_timeout: float = 30.0  # seconds, queries running longer are interrupted
+    # result budget of a (non streamed) query, streamed results are truncated at it
+    sql_max_rows: int = 1_000_000
+    sql_max_bytes: int = 256 * 1024 * 1024
+    # result cache of SQL queries, per Delta version of the queried table. 0 disables a tier
+    sql_cache_bytes: int = 256 * 1024 * 1024
+    sql_cache_disk_bytes: int = 0  # on-disk tier in `common/query_cache`
 
 
 class Settings(BaseSettings):
@@ -1,9 +1,31 @@
-from ._db import StockDataDB
+from ._cache import QueryResultCache
+from ._db import (
+    TICKER_HISTORY_PARTITION_COLUMNS,
+    StockDataDB,
+    StockDataDBPool,
+    with_ticker_history_partitions,
+)
+from ._sql import (
+    DuckDBPool,
+    QueryLimitError,
+    QueryStream,
+    QueryTimeoutError,
+    ReadOnlyQueryError,
+)
 from .exchange import Exchange
 from .yahoo import YFStockData
 
 __all__ = [
     "StockDataDB",
+    "StockDataDBPool",
+    "DuckDBPool",
+    "QueryLimitError",
+    "QueryResultCache",
+    "QueryStream",
+    "QueryTimeoutError",
+    "ReadOnlyQueryError",
+    "TICKER_HISTORY_PARTITION_COLUMNS",
+    "with_ticker_history_partitions",
     "YFStockData",
     "Exchange",
 ]
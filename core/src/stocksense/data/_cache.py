@@ -0,0 +1,151 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal
+
+import polars as pl
+from sqlglot.errors import SqlglotError
+
+from ..tools.sql import SQLQueryValidator
+
+
+@dataclass
+class QueryResultCache:
+    """
+    LRU cache of SQL query results, held as compressed Arrow IPC.
+
+    Entries are keyed by the normalized query, its parameters & the Delta version of the table it
+    ran on. A new commit (e.g. by a download) changes the version, so older entries are never hit
+    again & age out of the LRU without explicit invalidation. With a `disk_path`, entries evicted
+    from memory are kept there (LRU too, up to `disk_max_bytes`) & moved back to memory on a hit.
+
+    Attributes
+    ----------
+        max_bytes : int, optional
+            Memory budget of the compressed results, by default 256 MiB
+        disk_path : Path | None, optional
+            Directory of the on-disk tier, by default None (memory only)
+        disk_max_bytes : int, optional
+            Budget of the on-disk tier, by default 2 GiB
+        compression : Literal["zstd", "lz4"], optional
+            Arrow IPC compression of the results, by default "zstd"
+    """
+
+    max_bytes: int = 256 * 1024**2
+    disk_path: Path | None = None
+    disk_max_bytes: int = 2 * 1024**3
+    compression: Literal["zstd", "lz4"] = "zstd"
+
+    def __post_init__(self):
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        if self.disk_path is not None:
+            self.disk_path.mkdir(parents=True, exist_ok=True)
+            # NOTE - entries left by an earlier process are reused, least recently written first
+            for path in sorted(
+                self.disk_path.glob("*.arrow"), key=lambda path: path.stat().st_mtime
+            ):
+                self._disk[path.stem] = path.stat().st_size
+                self._disk_bytes += self._disk[path.stem]
+            self._evict_disk()
+
+    @staticmethod
+    def key(
+        exchange: str, table: str, version: int, query: str, params: Any = None
+    ) -> str | None:
+        """
+        Cache key of `query` (with `params`) run on `version` of `exchange/table`.
+
+        Returns `None` when the query must not be cached, i.e. its result can change on the same
+        data (e.g. it uses `current_date` or `random()`).
+        """
+        try:
+            validator = SQLQueryValidator(query)
+            if not validator.is_deterministic():
+                return None
+            normalized = validator.normalize()
+        except SqlglotError:
+            # NOTE - DuckDB accepts some SQL which sqlglot can't parse, such queries are keyed as
+            # written
+            normalized = query.strip()
+        return hashlib.sha256(
+            repr((exchange.lower(), table, version, normalized, params)).encode()
+        ).hexdigest()
+
+    def get(self, key: str) -> pl.DataFrame | None:
+        """Cached result of `key`, `None` on a miss."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+            elif key in self._disk:
+                try:
+                    data = self._entry_path(key).read_bytes()
+                except FileNotFoundError:
+                    data = None
+                self._remove_disk(key)
+                if data is not None:
+                    self._put_memory(key, data)
+        if data is None:
+            return None
+        return pl.read_ipc(io.BytesIO(data))
+
+    def put(self, key: str, result: pl.DataFrame) -> None:
+        """Cache `result` under `key`, results larger than `max_bytes` compressed are skipped."""
+        buffer = io.BytesIO()
+        result.write_ipc(buffer, compression=self.compression)
+        data = buffer.getvalue()
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            self._put_memory(key, data)
+
+    def clear(self) -> None:
+        """Drop all entries, from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            for key in list(self._disk):
+                self._remove_disk(key)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.disk_path / f"{key}.arrow"
+
+    def _put_memory(self, key: str, data: bytes) -> None:
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_bytes:
+            evicted_key, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._put_disk(evicted_key, evicted)
+
+    def _put_disk(self, key: str, data: bytes) -> None:
+        if self.disk_path is None or len(data) > self.disk_max_bytes:
+            return
+        # NOTE - written aside & renamed, so other processes sharing the directory never read a
+        # partial entry
+        path = self._entry_path(key)
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_bytes(data)
+        temp_path.replace(path)
+        if key in self._disk:
+            self._disk_bytes -= self._disk.pop(key)
+        self._disk[key] = len(data)
+        self._disk_bytes += len(data)
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        while self._disk_bytes > self.disk_max_bytes:
+            self._remove_disk(next(iter(self._disk)))
+
+    def _remove_disk(self, key: str) -> None:
+        self._disk_bytes -= self._disk.pop(key)
+        self._entry_path(key).unlink(missing_ok=True)
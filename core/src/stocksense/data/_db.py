@@ -1,10 +1,36 @@
+import threading
+import zlib
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
 from typing import Any, ClassVar, Final, Literal
 
 import deltalake
 import polars as pl
+from deltalake import DeltaTable
+
+from ..tools.sql import SQLQueryValidator
+
+# NOTE - `ticker_history` partitioned layout. Changing the bucket count requires re-running the
+# partition migration, since readers & writers must agree on the bucket of every ticker
+TICKER_HISTORY_BUCKETS: Final[int] = 16
+TICKER_HISTORY_PARTITION_COLUMNS: Final[list[str]] = ["ticker_bucket", "year"]
+
+
+def ticker_bucket(ticker: str) -> int:
+    """Stable hash bucket of a `ticker` symbol (same in every process & polars version)."""
+    return zlib.crc32(ticker.encode()) % TICKER_HISTORY_BUCKETS
+
+
+def with_ticker_history_partitions(data: pl.DataFrame) -> pl.DataFrame:
+    """Add `ticker_bucket` & `year` partition columns to ticker history data."""
+    buckets = {
+        t: ticker_bucket(t) for t in data.get_column("ticker").unique().to_list()
+    }
+    return data.with_columns(
+        ticker_bucket=pl.col("ticker").replace_strict(buckets).cast(pl.Int32),
+        year=pl.col("date").dt.year().cast(pl.Int32),
+    )
 
 
 @dataclass
@@ -17,32 +43,147 @@ class StockDataDB:
     table_version: int | str | datetime | None = None
 
     def __post_init__(self):
-        self._table = pl.scan_delta(
-            source=self.db_path,
-            version=self.table_version,
-        )
+        # NOTE - keeping the `DeltaTable` snapshot around lets `refresh()` replay only the commits
+        # that landed after it was loaded, instead of re-reading the whole transaction log
+        self._delta_table = DeltaTable(self.db_path)
+        if self.table_version is not None:
+            self._delta_table.load_as_version(self.table_version)
+        self._table = pl.scan_delta(source=self._delta_table)
+        self._lock = threading.Lock()
 
     @property
     def table_data(self):
-        return self._table
+        return self._without_partitions(self._table)
+
+    @property
+    def delta_table(self) -> DeltaTable:
+        return self._delta_table
+
+    @property
+    def version(self) -> int:
+        """Delta version of the snapshot currently held in memory."""
+        return self._delta_table.version()
+
+    @property
+    def is_ticker_partitioned(self) -> bool:
+        """Whether the table uses the `ticker_bucket`/`year` partitioned layout."""
+        return set(TICKER_HISTORY_PARTITION_COLUMNS).issubset(
+            self._delta_table.metadata().partition_columns
+        )
+
+    def _without_partitions(self, table: pl.LazyFrame) -> pl.LazyFrame:
+        # NOTE - partition columns are storage layout only, they are dropped once the partition
+        # predicates (see `ticker_predicate` & `date_predicate`) are applied
+        if self.is_ticker_partitioned:
+            return table.drop(TICKER_HISTORY_PARTITION_COLUMNS)
+        return table
+
+    def refresh(self) -> bool:
+        """Load commits newer than the in-memory snapshot.
+
+        Returns `True` if a newer version was loaded. Handles pinned to a `table_version` are never
+        refreshed.
+        """
+        if self.table_version is not None:
+            return False
+
+        with self._lock:
+            current_version = self._delta_table.version()
+            self._delta_table.update_incremental()
+            if self._delta_table.version() == current_version:
+                return False
+            self._table = pl.scan_delta(source=self._delta_table)
+            return True
 
     def sql_filter(self, query: str) -> pl.LazyFrame:
+        """Run SQL `query` on the table, referred as `stockdb` (or `self`) in the query.
+
+        The query's columns & `ticker` / `date` predicates are applied to the Delta scan first (see
+        `SQLQueryValidator.scan_pushdown`), DuckDB can't push them into a polars `LazyFrame`.
+        Use `DuckDBPool` to serve many queries, this one opens a connection per call.
+        """
         import duckdb
 
-        # NOTE - duckdb needs df variable in local scope to refer as table. Here `self._table` is
-        # referred as `stockdb` table locally
-        exec(f"{self.table_name} = self._table")
-        return duckdb.sql(query).pl(lazy=True)
+        # NOTE - views are registered on a private connection, binding a local variable for
+        # DuckDB's replacement scan (`exec`) does not work from Python 3.13 on
+        connection = duckdb.connect()
+        table = self.pushdown_scan(query)
+        for view in (self.table_name, "self"):
+            connection.register(view, table)
+        return connection.sql(query).pl(lazy=True)
+
+    def pushdown_scan(self, query: str) -> pl.LazyFrame:
+        """Table scan limited to the columns, tickers & dates SQL `query` reads."""
+        table = self._table
+        schema = self.table_data.collect_schema()
+        pushdown = SQLQueryValidator(query).scan_pushdown(
+            schema.names(), (self.table_name, "self")
+        )
+        if pushdown.tickers is not None:
+            table = table.filter(self.ticker_predicate(pushdown.tickers))
+        if pushdown.start is not None or pushdown.end is not None:
+            start, end = pushdown.start, pushdown.end
+            if schema["date"] == pl.Date:
+                start, end = start and start.date(), end and end.date()
+            table = table.filter(self.date_predicate(start, end))
+        if pushdown.columns is not None:
+            # NOTE - a query reading no column (e.g. `count(*)`) still needs the rows
+            return table.select(pushdown.columns or schema.names()[:1])
+        return self._without_partitions(table)
 
     def polars_filter(self, *predicates: Any, **constraints: Any) -> pl.LazyFrame:
-        return self._table.filter(*predicates, **constraints)
+        return self._without_partitions(self._table.filter(*predicates, **constraints))
+
+    def ticker_predicate(self, ticker: str | list[str]) -> pl.Expr:
+        """`ticker` predicate which also prunes `ticker_bucket` partitions when available."""
+        tickers = [ticker] if isinstance(ticker, str) else ticker
+        predicate = pl.col("ticker").is_in(tickers)
+        if self.is_ticker_partitioned:
+            buckets = sorted({ticker_bucket(t) for t in tickers})
+            predicate = pl.col("ticker_bucket").is_in(buckets) & predicate
+        return predicate
+
+    def date_predicate(
+        self, start: date | datetime | None = None, end: date | datetime | None = None
+    ) -> pl.Expr:
+        """`date` range predicate (both ends inclusive) which also prunes `year` partitions when available."""
+        predicate = pl.lit(True)
+        if start is not None:
+            predicate &= pl.col("date") >= start
+        if end is not None:
+            predicate &= pl.col("date") <= end
+        if self.is_ticker_partitioned:
+            if start is not None:
+                predicate = (pl.col("year") >= start.year) & predicate
+            if end is not None:
+                predicate = (pl.col("year") <= end.year) & predicate
+        return predicate
+
+    def last_dates(self, tickers: list[str] | None = None) -> pl.LazyFrame:
+        """Latest stored `date` of every ticker (optionally only of `tickers`) in one aggregated scan."""
+        table = self._table
+        if tickers is not None:
+            table = table.filter(self.ticker_predicate(tickers))
+        return table.group_by("ticker").agg(last_date=pl.col("date").max())
 
     def merge(
         self,
         data: pl.DataFrame,
         predicate: str = "s.date = t.date AND s.ticker = t.ticker",
     ) -> dict:
-        return (
+        if self.is_ticker_partitioned and not data.is_empty():
+            # NOTE - MERGE only skips target files for literal partition predicates, so the
+            # partitions touched by incoming data are spelled out explicitly
+            data = with_ticker_history_partitions(data)
+            buckets = ", ".join(
+                map(str, data.get_column("ticker_bucket").unique().sort())
+            )
+            years = ", ".join(map(str, data.get_column("year").unique().sort()))
+            predicate = (
+                f"t.ticker_bucket IN ({buckets}) AND t.year IN ({years}) "
+                f"AND s.ticker_bucket = t.ticker_bucket AND s.year = t.year AND {predicate}"
+            )
+        result = (
             data
             .write_delta(
                 target=self.db_path,
@@ -60,12 +201,75 @@ class StockDataDB:
             .when_not_matched_insert_all()
             .execute()
         )
+        self.refresh()
+        return result
+
+    def upsert(self, data: pl.DataFrame) -> dict:
+        """
+        Insert or update ticker history `data`, appending whatever is strictly new.
+
+        Rows newer than the latest stored `date` of their ticker can't match any existing key, so they
+        are appended without a MERGE. Only the remaining (possibly overlapping) rows go through
+        `merge`, limited to their own date range, so a daily load costs in proportion to the day's
+        data instead of the table size.
+
+        Parameters
+        ----------
+        data : pl.DataFrame
+            Ticker history rows with `ticker` & `date` columns
+
+        Returns
+        -------
+        dict
+            Merge metrics, with the appended rows counted in `num_source_rows`,
+            `num_target_rows_inserted` & `num_appended_rows`
+        """
+        if data.is_empty():
+            return {"num_source_rows": 0, "num_appended_rows": 0}
+
+        last_dates = self.last_dates(
+            data.get_column("ticker").unique().to_list()
+        ).collect()
+        is_new = (
+            data
+            .join(last_dates, on="ticker", how="left")
+            .select(
+                pl.col("last_date").is_null() | (pl.col("date") > pl.col("last_date"))
+            )
+            .to_series()
+        )
+        new_data, overlap_data = data.filter(is_new), data.filter(~is_new)
+
+        result = {}
+        if not overlap_data.is_empty():
+            start, end = overlap_data.select(
+                start=pl.col("date").min().dt.to_string("%Y-%m-%d %H:%M:%S%.f"),
+                end=pl.col("date").max().dt.to_string("%Y-%m-%d %H:%M:%S%.f"),
+            ).row(0)
+            result = self.merge(
+                overlap_data,
+                predicate=(
+                    f"t.date >= '{start}' AND t.date <= '{end}' "
+                    "AND s.date = t.date AND s.ticker = t.ticker"
+                ),
+            )
+        if not new_data.is_empty():
+            self.write(new_data, mode="append")
+
+        result["num_source_rows"] = result.get("num_source_rows", 0) + new_data.height
+        result["num_target_rows_inserted"] = (
+            result.get("num_target_rows_inserted", 0) + new_data.height
+        )
+        result["num_appended_rows"] = new_data.height
+        return result
 
     def write(
         self,
         data: pl.DataFrame,
         mode: Literal["error", "append", "overwrite", "ignore"] = "overwrite",
     ) -> None:
+        if self.is_ticker_partitioned:
+            data = with_ticker_history_partitions(data)
         data.write_delta(
             target=self.db_path,
             mode=mode,
@@ -76,3 +280,49 @@ class StockDataDB:
                 "schema_mode": "merge",
             },
         )
+        self.refresh()
+
+
+@dataclass
+class StockDataDBPool:
+    """
+    Process-wide registry of open `StockDataDB` handles.
+
+    Handles are keyed by `(exchange, table)` and resolved under `base_path` as
+    `base_path / exchange / table` (e.g. `("nse", "ticker_history")` or `("common", "prompt_cache")`).
+    Every `get` only checks the Delta log for commits newer than the cached snapshot, so hot
+    endpoints don't replay the whole transaction log per request.
+
+    Attributes
+    ----------
+        base_path : Path
+            Root directory holding all the Delta tables
+    """
+
+    base_path: Path
+
+    def __post_init__(self):
+        self._handles: dict[tuple[str, str], StockDataDB] = {}
+        self._lock = threading.Lock()
+
+    def get(self, exchange: str, table: str) -> StockDataDB:
+        """Get the cached handle for `exchange/table`, refreshed to the latest Delta version."""
+        key = (exchange.lower(), table)
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is None:
+                handle = StockDataDB(self.base_path / key[0] / key[1])
+                self._handles[key] = handle
+                return handle
+
+        handle.refresh()
+        return handle
+
+    def invalidate(self, exchange: str | None = None, table: str | None = None) -> None:
+        """Drop cached handles, optionally only the ones matching `exchange` and/or `table`."""
+        with self._lock:
+            for key in list(self._handles):
+                if (exchange is None or key[0] == exchange.lower()) and (
+                    table is None or key[1] == table
+                ):
+                    del self._handles[key]
@@ -0,0 +1,436 @@
+import queue
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Self
+
+import duckdb
+import polars as pl
+import pyarrow as pa
+
+from ..tools.sql import SQLQueryValidator
+from ._cache import QueryResultCache
+from ._db import (
+    TICKER_HISTORY_PARTITION_COLUMNS,
+    StockDataDB,
+    StockDataDBPool,
+    ticker_bucket,
+)
+
+
+class ReadOnlyQueryError(ValueError):
+    """Raised when a SQL query is not a single read-only `SELECT` statement."""
+
+
+class QueryTimeoutError(TimeoutError):
+    """Raised when a SQL query runs longer than the pool's `timeout` & is interrupted."""
+
+
+class QueryLimitError(Exception):
+    """Raised when a SQL query result exceeds the pool's `max_rows` or `max_bytes`."""
+
+
+@dataclass
+class _Connection:
+    """Pooled DuckDB connection & the table source its views currently read."""
+
+    connection: duckdb.DuckDBPyConnection
+    bound: tuple[str, str, int, str] | None = None
+    # NOTE - set while a query runs, a timeout only interrupts the query it was started for
+    running: threading.Event | None = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def interrupt(self, running: threading.Event) -> None:
+        with self.lock:
+            if self.running is running:
+                running.set()
+                self.connection.interrupt()
+
+
+class QueryStream:
+    """
+    Record batches of a running query, produced as DuckDB computes them.
+
+    The pooled connection is held until the batches are consumed or the stream is closed, use it
+    as a context manager. Iterating raises `QueryTimeoutError` once the pool's `timeout` passes &
+    `QueryLimitError` when the result exceeds the pool's limits, unless the stream `truncate`s
+    the result at the limits instead.
+    """
+
+    def __init__(
+        self,
+        pool: "DuckDBPool",
+        pooled: _Connection,
+        running: threading.Event,
+        timer: threading.Timer | None,
+        reader: pa.RecordBatchReader,
+        truncate: bool,
+    ):
+        self.schema: pa.Schema = reader.schema
+        self.truncated = False
+        self._pool = pool
+        self._pooled: _Connection | None = pooled
+        self._running = running
+        self._timer = timer
+        self._reader = reader
+        self._truncate = truncate
+
+    def __iter__(self) -> Iterator[pa.RecordBatch]:
+        max_rows, max_bytes = self._pool.max_rows, self._pool.max_bytes
+        num_rows = num_bytes = 0
+        try:
+            for batch in self._reader:
+                num_rows += batch.num_rows
+                num_bytes += batch.nbytes
+                over_rows = max_rows is not None and num_rows > max_rows
+                over_bytes = max_bytes is not None and num_bytes > max_bytes
+                if not (over_rows or over_bytes):
+                    yield batch
+                    continue
+                if not self._truncate:
+                    raise QueryLimitError(
+                        f"Query result exceeds {max_rows} rows or {max_bytes} bytes, "
+                        "narrow it down (e.g. with LIMIT) or stream it"
+                    )
+                self.truncated = True
+                if over_rows and not over_bytes:
+                    yield batch.slice(0, batch.num_rows - (num_rows - max_rows))
+                break
+        except (duckdb.InterruptException, OSError) as e:
+            # NOTE - an interrupt while fetching surfaces as an arrow `OSError`
+            if self._running.is_set():
+                raise QueryTimeoutError(
+                    f"Query exceeded the {self._pool.timeout}s timeout"
+                ) from e
+            raise
+        finally:
+            self.close()
+
+    def read_all(self) -> pl.DataFrame:
+        """Consume the stream into a dataframe."""
+        with self:
+            return pl.from_arrow(pa.Table.from_batches(list(self), schema=self.schema))
+
+    def close(self) -> None:
+        """Stop the query & return its connection to the pool."""
+        if self._pooled is not None:
+            pooled, self._pooled = self._pooled, None
+            self._pool._release(pooled, self._timer)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+
+@dataclass
+class DuckDBPool:
+    """
+    Pool of read-only DuckDB connections querying the Delta tables of a `StockDataDBPool`.
+
+    Every connection is its own in-memory database, so `threads` & `memory_limit` bound each query
+    on its own & up to `size` queries run in parallel (DuckDB releases the GIL while executing).
+    A table is exposed under the `self` & `stockdb` view names as a `read_parquet` of the data
+    files of its latest Delta snapshot, listed once per Delta version. Each connection (re)creates
+    its views only when the version (or the files a query reads) changes. Queries limited to some
+    tickers or dates only list the files of the matching `ticker_bucket` & `year` partitions (&
+    file stats), DuckDB can't prune a list of files by their Delta partition values. DuckDB's own
+    parquet reader prunes columns & row groups, so only the data a query needs is read. Like
+    `StockDataDB.table_data`, the views leave out the `ticker_bucket` & `year` partition columns
+    of ticker history.
+
+    Connections can only read files under the pool's `base_path`, their configuration is locked &
+    only single `SELECT` statements are executed, so queries can't write anything.
+
+    Results are fetched as Arrow record batches of `batch_rows` rows & checked against `max_rows`
+    & `max_bytes` as they arrive, so a runaway query is stopped before its result is held in
+    memory. Queries running longer than `timeout` are interrupted.
+
+    With a `cache`, results of `execute` are served from it while the table's Delta version is
+    unchanged.
+
+    Attributes
+    ----------
+        db_pool : StockDataDBPool
+            Handles of the Delta tables, also used to pick up newer versions
+        size : int, optional
+            Number of connections i.e. concurrent queries, by default 4
+        threads : int, optional
+            DuckDB threads per query, by default 2
+        memory_limit : str, optional
+            DuckDB memory limit per query, by default "1GB"
+        timeout : float | None, optional
+            Seconds a query (including fetching its result) may run, by default None (no limit)
+        max_rows : int | None, optional
+            Maximum rows of a result, by default None (no limit)
+        max_bytes : int | None, optional
+            Maximum (Arrow) size of a result, by default None (no limit)
+        batch_rows : int, optional
+            Rows per fetched record batch, by default 100_000
+        cache : QueryResultCache | None, optional
+            Result cache of `execute`, by default None (no caching)
+    """
+
+    views: ClassVar[tuple[str, ...]] = ("self", StockDataDB.table_name)
+
+    db_pool: StockDataDBPool
+    size: int = 4
+    threads: int = 2
+    memory_limit: str = "1GB"
+    timeout: float | None = None
+    max_rows: int | None = None
+    max_bytes: int | None = None
+    batch_rows: int = 100_000
+    cache: QueryResultCache | None = None
+    _connections: queue.Queue = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._connections = queue.Queue()
+        for _ in range(self.size):
+            connection = duckdb.connect(
+                config={"threads": self.threads, "memory_limit": self.memory_limit}
+            )
+            # NOTE - allowed directories can only be set once the database is started & before
+            # external access is disabled
+            connection.execute(
+                "SET allowed_directories = $directories",
+                {"directories": [f"{self.db_pool.base_path.resolve().as_posix()}/"]},
+            )
+            connection.execute("SET enable_external_access = false")
+            connection.execute("SET lock_configuration = true")
+            self._connections.put(_Connection(connection))
+        self._sources: dict[tuple[str, str], tuple[int, str]] = {}
+        self._lock = threading.Lock()
+
+    def source(
+        self, exchange: str, table: str, query: str | None = None
+    ) -> tuple[int, str]:
+        """
+        `SELECT` of the latest `exchange/table` version, along with the version.
+
+        With a `query`, only the data files which can hold the tickers & dates it is limited to
+        are read (see `SQLQueryValidator.scan_pushdown`), pruned by their partition values &
+        column stats.
+        """
+        handle = self.db_pool.get(exchange, table)
+        key = (exchange.lower(), table)
+        filters = self._file_filters(handle, query) if query is not None else []
+        with self._lock:
+            version = handle.version
+            if filters:
+                files = handle.delta_table.file_uris(file_pruning_predicate=filters)
+                return version, self._select(handle, files)
+
+            cached = self._sources.get(key)
+            if cached is None or cached[0] != version:
+                # NOTE - delta-rs writes no deletion vectors, the snapshot is just its files
+                cached = (version, self._select(handle, handle.delta_table.file_uris()))
+                self._sources[key] = cached
+            return cached
+
+    def _file_filters(
+        self, handle: StockDataDB, query: str
+    ) -> list[tuple[str, str, Any]]:
+        """Delta file pruning filters of the tickers & dates `query` reads."""
+        schema = handle.table_data.collect_schema()
+        pushdown = SQLQueryValidator(query).scan_pushdown(schema.names(), self.views)
+        partitioned = handle.is_ticker_partitioned
+        filters = []
+        if pushdown.tickers is not None:
+            filters.append(("ticker", "in", pushdown.tickers))
+            if partitioned:
+                buckets = sorted({ticker_bucket(t) for t in pushdown.tickers})
+                filters.append(("ticker_bucket", "in", buckets))
+
+        # NOTE - stats of a timezone aware `date` can't be compared with naive datetimes
+        dtype = schema.get("date")
+        if dtype != pl.Date and not (
+            isinstance(dtype, pl.Datetime) and dtype.time_zone is None
+        ):
+            return filters
+        for op, value in ((">=", pushdown.start), ("<=", pushdown.end)):
+            if value is not None:
+                filters.append((
+                    "date",
+                    op,
+                    value.date() if dtype == pl.Date else value,
+                ))
+                if partitioned:
+                    filters.append(("year", op, value.year))
+        return filters
+
+    @staticmethod
+    def _select(handle: StockDataDB, files: list[str]) -> str:
+        """`SELECT` of the table's (non partition) columns from its data `files`."""
+        if not files:
+            # NOTE - `read_parquet` needs at least one file, an empty table still has its columns
+            empty = pl.DataFrame(schema=handle.table_data.collect_schema()).to_arrow()
+            with duckdb.connect() as connection:
+                relation = connection.from_arrow(empty)
+                columns = ", ".join(
+                    'NULL::{} AS "{}"'.format(dtype, name.replace('"', '""'))
+                    for name, dtype in zip(relation.columns, relation.types)
+                )
+            return f"SELECT {columns} WHERE false"
+
+        files = ", ".join("'{}'".format(uri.replace("'", "''")) for uri in files)
+        partitioned = bool(handle.delta_table.metadata().partition_columns)
+        exclude = (
+            f" EXCLUDE ({', '.join(TICKER_HISTORY_PARTITION_COLUMNS)})"
+            if handle.is_ticker_partitioned
+            else ""
+        )
+        return (
+            f"SELECT *{exclude} FROM read_parquet([{files}], union_by_name = true, "
+            f"hive_partitioning = {str(partitioned).lower()})"
+        )
+
+    @staticmethod
+    def check_read_only(query: str) -> None:
+        """Raise `ReadOnlyQueryError` unless `query` is a single `SELECT` statement."""
+        statements = duckdb.extract_statements(query)
+        if len(statements) != 1:
+            raise ReadOnlyQueryError(
+                f"Expected a single SQL statement, got {len(statements)}"
+            )
+        if statements[0].type != duckdb.StatementType.SELECT:
+            raise ReadOnlyQueryError(
+                f"Only SELECT queries are allowed, got {statements[0].type.name}"
+            )
+
+    def stream(
+        self,
+        exchange: str,
+        table: str,
+        query: str,
+        params: Any = None,
+        truncate: bool = False,
+    ) -> QueryStream:
+        """
+        Run `query` on `exchange/table`, referred as `self` (or `stockdb`) in the query.
+
+        Blocks until a connection is free & the query starts producing its result, call it from a
+        worker thread in async code.
+
+        Parameters
+        ----------
+        exchange : str
+            Exchange of the table
+        table : str
+            Table name, e.g. `ticker_history`
+        query : str
+            `SELECT` query
+        params : Any, optional
+            Prepared statement parameters of `query`, by default None
+        truncate : bool, optional
+            End the stream at `max_rows` / `max_bytes` instead of raising `QueryLimitError`, by
+            default False
+
+        Returns
+        -------
+        QueryStream
+            Record batches of the result
+
+        Raises
+        ------
+        ReadOnlyQueryError
+            When `query` is not a single `SELECT` statement
+        QueryTimeoutError
+            When `query` runs longer than `timeout`
+        duckdb.Error
+            When `query` is invalid or fails
+        """
+        self.check_read_only(query)
+        return self._start(
+            exchange,
+            table,
+            self.source(exchange, table, query),
+            query,
+            params,
+            truncate,
+        )
+
+    def execute(
+        self, exchange: str, table: str, query: str, params: Any = None
+    ) -> pl.DataFrame:
+        """
+        Run `query` on `exchange/table` & collect its result, see `stream`.
+
+        Raises
+        ------
+        QueryLimitError
+            When the result exceeds `max_rows` or `max_bytes`
+        """
+        self.check_read_only(query)
+        source = self.source(exchange, table, query)
+        key = (
+            self.cache.key(exchange, table, source[0], query, params)
+            if self.cache is not None
+            else None
+        )
+        if key is not None and (result := self.cache.get(key)) is not None:
+            return result
+
+        result = self._start(exchange, table, source, query, params, False).read_all()
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+
+    def _start(
+        self,
+        exchange: str,
+        table: str,
+        source: tuple[int, str],
+        query: str,
+        params: Any,
+        truncate: bool,
+    ) -> QueryStream:
+        version, source = source
+        pooled: _Connection = self._connections.get()
+        running = threading.Event()
+        with pooled.lock:
+            pooled.running = running
+        timer = None
+        if self.timeout is not None:
+            timer = threading.Timer(self.timeout, pooled.interrupt, (running,))
+            timer.daemon = True
+            timer.start()
+
+        try:
+            bound = (exchange.lower(), table, version, source)
+            if pooled.bound != bound:
+                for view in self.views:
+                    pooled.connection.execute(
+                        f'CREATE OR REPLACE TEMP VIEW "{view}" AS {source}'
+                    )
+                pooled.bound = bound
+            result = pooled.connection.execute(query, params)
+            # NOTE - `to_arrow_reader` replaces `fetch_record_batch` from duckdb 1.5 on
+            if hasattr(result, "to_arrow_reader"):
+                reader = result.to_arrow_reader(self.batch_rows)
+            else:
+                reader = result.fetch_record_batch(self.batch_rows)
+        except Exception as e:
+            self._release(pooled, timer)
+            if isinstance(e, duckdb.InterruptException) and running.is_set():
+                raise QueryTimeoutError(
+                    f"Query exceeded the {self.timeout}s timeout"
+                ) from e
+            raise
+        return QueryStream(self, pooled, running, timer, reader, truncate)
+
+    def _release(self, pooled: _Connection, timer: threading.Timer | None) -> None:
+        if timer is not None:
+            timer.cancel()
+        with pooled.lock:
+            pooled.running = None
+        self._connections.put(pooled)
+
+    def close(self) -> None:
+        """Close all connections, waiting for running queries to finish."""
+        for _ in range(self.size):
+            self._connections.get().connection.close()
@@ -1,6 +1,18 @@
 import polars as pl
 
 from .analysis import TechnicalAnalysis
+from .backtest import Backtest
+from .screener import compile_screen, screen
+from .sweep import Sweep
+
+__all__ = [
+    "Backtest",
+    "Sweep",
+    "TechnicalAnalysis",
+    "compile_screen",
+    "register_ta",
+    "screen",
+]
 
 
 def register_ta():
@@ -1,8 +1,12 @@
+import itertools
 from dataclasses import dataclass
+from typing import Any
 
 import polars as pl
 import polars.selectors as cs
 
+from .backtest import Backtest
+from .ta._base import IndicatorPlan, TAAccessor
 from .ta.cycle import CycleAccessor
 from .ta.momentum import MomentumAccessor
 from .ta.overlap_study import OverlapStudyAccessor
@@ -12,6 +16,57 @@ from .ta.trend import TrendAccessor
 from .ta.volatility import VolatilityAccessor
 from .ta.volume import VolumeAccessor
 
+# NOTE - lookup order for bare indicator names, e.g. `sma` resolves to `overlap.sma`
+ACCESSORS: dict[str, type[TAAccessor]] = {
+    "overlap": OverlapStudyAccessor,
+    "momentum": MomentumAccessor,
+    "volatility": VolatilityAccessor,
+    "volume": VolumeAccessor,
+    "trend": TrendAccessor,
+    "cycle": CycleAccessor,
+    "pattern": PatternRecognitionAccessor,
+    "stats": StatsAccessor,
+}
+
+
+def _resolve_indicator(name: str) -> tuple[type[TAAccessor], str]:
+    """Accessor class & method of `name`, either `<accessor>.<method>` or a bare method name."""
+    accessor_name, _, method = name.rpartition(".")
+    if accessor_name:
+        candidates = [ACCESSORS[accessor_name]] if accessor_name in ACCESSORS else []
+    else:
+        candidates = list(ACCESSORS.values())
+
+    if not method.startswith("_"):
+        for accessor in candidates:
+            if (
+                callable(getattr(accessor, method, None))
+                and method not in accessor.non_indicators
+            ):
+                return accessor, method
+    raise ValueError(f"Unknown indicator '{name}'")
+
+
+def _expand_spec(spec: str | dict[str, Any]) -> list[tuple[str, dict[str, Any]]]:
+    """Indicator name & parameters of every call in `spec`, sweeps expanded."""
+    if isinstance(spec, str):
+        return [(spec, {})]
+
+    params = dict(spec)
+    try:
+        name = params.pop("name")
+    except KeyError:
+        raise ValueError(f"Indicator spec {spec} has no 'name'") from None
+
+    sweeps = {
+        key: value if isinstance(value, (list, tuple, range)) else [value]
+        for key, value in params.items()
+    }
+    return [
+        (name, dict(zip(sweeps, values)))
+        for values in itertools.product(*sweeps.values())
+    ]
+
 
 @pl.api.register_dataframe_namespace("ta")
 @pl.api.register_lazyframe_namespace("ta")
@@ -20,57 +75,133 @@ class TechnicalAnalysis:
     """
     Polars Namespace for Technical Analysis.
     Usage: df.ta.trend.sma(...)
+
+    For a frame holding many tickers use `df.ta.over("ticker").trend.sma(...)`, every indicator is
+    then computed per ticker in a single pass (result is sorted by ticker & date).
     """
 
     df: pl.DataFrame | pl.LazyFrame
+    by: str | None = None
 
     def __post_init__(self):
         self._df = self.df.lazy() if isinstance(self.df, pl.DataFrame) else self.df
         # NOTE - cast to Float64 since TA-Lib expects float inputs
         self._df = self._df.cast({cs.numeric(): pl.Float64})
 
+        if self.by is not None:
+            # NOTE - groups must be contiguous & in time order, so each group is one slice
+            if "date" in self._df.collect_schema().names():
+                self._df = self._df.sort(self.by, "date")
+            else:
+                self._df = self._df.sort(self.by, maintain_order=True)
+
         # Basic validation - can be relaxed if needed
         required = {"open", "high", "low", "close", "volume"}
         if any(col not in self._df.collect_schema().names() for col in required):
             # Only warn or check subset to allow flexible usage
             pass
 
+    def over(self, by: str) -> "TechnicalAnalysis":
+        """Compute indicators per `by` group (e.g. `ticker`) instead of across the whole frame."""
+
+        return TechnicalAnalysis(self.df, by=by)
+
+    def compute(self, specs: list[str | dict[str, Any]]) -> pl.LazyFrame:
+        """
+        Compute many indicators in a single query.
+
+        Native indicators are evaluated in one projection, sharing common sub-expressions, &
+        all TA-Lib ones in one batch UDF reading every input column once. Identical indicators
+        (same output columns) are computed once.
+
+        Parameters
+        ----------
+        specs : list[str | dict[str, Any]]
+            Indicators as a name (`"rsi"` or `"momentum.rsi"`) using default parameters, or a
+            dict of name & parameters (`{"name": "rsi", "period": 21}`). A list, tuple or range
+            parameter is swept, one indicator per value (per combination of values when many
+            parameters are swept), e.g. `{"name": "rsi", "period": range(5, 30)}`.
+
+        Returns
+        -------
+        pl.LazyFrame
+            Data with all indicator columns, in spec order
+
+        Raises
+        ------
+        ValueError
+            When an indicator is unknown or a spec has no name
+        """
+        plan = IndicatorPlan()
+        for spec in specs:
+            for name, params in _expand_spec(spec):
+                accessor, method = _resolve_indicator(name)
+                getattr(accessor(self._df, self.by, plan), method)(**params)
+
+        return plan.apply(self._df, self.by).select(pl.exclude(plan.names), *plan.names)
+
+    def backtest(
+        self,
+        signals: str | list[str] | cs.Selector | dict[str, pl.Expr],
+        backtest: Backtest | None = None,
+        price: str = "close",
+    ) -> pl.LazyFrame:
+        """
+        Backtest signal columns, per `by` group when set, see `Backtest.run`.
+
+        Parameters
+        ----------
+        signals : str | list[str] | cs.Selector | dict[str, pl.Expr]
+            Signal column(s), each one a strategy, or strategy names mapped to signal expressions
+        backtest : Backtest | None, optional
+            Costs & settings, by default `Backtest()` (no costs, long only)
+        price : str, optional
+            Price column trades are made at, by default "close"
+
+        Returns
+        -------
+        pl.LazyFrame
+            Equity curve of every strategy, use `Backtest.metrics` to summarize it
+        """
+
+        return (backtest or Backtest()).run(self._df, signals, price, self.by)
+
     @property
     def trend(self) -> TrendAccessor:
 
-        return TrendAccessor(self._df)
+        return TrendAccessor(self._df, self.by)
 
     @property
     def momentum(self) -> MomentumAccessor:
 
-        return MomentumAccessor(self._df)
+        return MomentumAccessor(self._df, self.by)
 
     @property
     def volatility(self) -> VolatilityAccessor:
 
-        return VolatilityAccessor(self._df)
+        return VolatilityAccessor(self._df, self.by)
 
     @property
     def volume(self) -> VolumeAccessor:
 
-        return VolumeAccessor(self._df)
+        return VolumeAccessor(self._df, self.by)
 
     @property
     def cycle(self) -> CycleAccessor:
 
-        return CycleAccessor(self._df)
+        return CycleAccessor(self._df, self.by)
 
     @property
     def pattern(self) -> PatternRecognitionAccessor:
 
-        return PatternRecognitionAccessor(self._df)
+        return PatternRecognitionAccessor(self._df, self.by)
 
     @property
     def stats(self) -> StatsAccessor:
 
-        return StatsAccessor(self._df)
+        return StatsAccessor(self._df, self.by)
 
     @property
     def overlap(self) -> OverlapStudyAccessor:
 
-        return OverlapStudyAccessor(self._df)
+        return OverlapStudyAccessor(self._df, self.by)
@@ -0,0 +1,192 @@
+"""
+Vectorized backtesting of signal columns.
+
+Signals are turned into positions, returns, equity & drawdown curves with window expressions, so
+every ticker & every strategy (e.g. each parameter set of a sweep) is evaluated in a single lazy
+query without a per bar Python loop.
+
+Usage:
+    backtest = Backtest(cost=0.001)
+    result = (
+        df.ta.over("ticker")
+        .compute([{"name": "sma_crossover", "fast": [5, 10, 20], "slow": [50, 100, 200]}])
+        .ta.over("ticker")
+        .backtest(cs.starts_with("SMA_crossover"), backtest)
+    )
+    backtest.metrics(result, by="ticker").sort("sharpe", descending=True).collect()
+"""
+
+from dataclasses import dataclass
+
+import polars as pl
+import polars.selectors as cs
+
+
+@dataclass
+class Backtest:
+    """
+    Backtest settings, shared by every strategy of a run.
+
+    A signal is the position to hold from the next bar on: `1` long, `-1` short & `0` flat (or
+    `True` / `False`, fractional values size the position). Acting on the next bar keeps the
+    signal of a bar from trading on that same bar's close. Null & NaN signals (e.g. during
+    indicator warmup) are flat.
+
+    Attributes
+    ----------
+        cost : float, optional
+            Brokerage & taxes as a fraction of the traded value, by default 0.0
+        slippage : float, optional
+            Execution price slippage as a fraction of the traded value, by default 0.0
+        allow_short : bool, optional
+            Take short positions on negative signals, else they are flat, by default False
+        periods_per_year : int, optional
+            Bars per year, used to annualize metrics, by default 252 (daily bars)
+    """
+
+    cost: float = 0.0
+    slippage: float = 0.0
+    allow_short: bool = False
+    periods_per_year: int = 252
+
+    def run(
+        self,
+        df: pl.DataFrame | pl.LazyFrame,
+        signals: str | list[str] | cs.Selector | dict[str, pl.Expr],
+        price: str = "close",
+        by: str | None = None,
+    ) -> pl.LazyFrame:
+        """
+        Equity curve of every strategy (& every `by` group).
+
+        Parameters
+        ----------
+        df : pl.DataFrame | pl.LazyFrame
+            Prices & signal columns, sorted by date (within each `by` group)
+        signals : str | list[str] | cs.Selector | dict[str, pl.Expr]
+            Signal column(s), each one a strategy named after its column, or strategy names
+            mapped to signal expressions
+        price : str, optional
+            Price column trades are made at, by default "close"
+        by : str | None, optional
+            Group column (e.g. `ticker`), each group is backtested on its own, by default None
+
+        Returns
+        -------
+        pl.LazyFrame
+            Long frame of `by`, `date` (when available), `strategy`, `signal`, `position`,
+            `turnover`, `return` (after costs), `equity` (starting from 1) & `drawdown`
+        """
+        df = df.lazy()
+        if not isinstance(signals, dict):
+            signals = {
+                name: pl.col(name)
+                for name in df.select(signals).collect_schema().names()
+            }
+
+        keys = [col for col in (by, "date") if col in df.collect_schema().names()]
+        fields = ["signal", "position", "turnover", "return", "equity", "drawdown"]
+        # NOTE - strategies are named positionally while wide, so they can be named like any
+        # output column (e.g. a `signal` column)
+        strategies = {f"strategy_{i}": name for i, name in enumerate(signals)}
+
+        def over(expr: pl.Expr) -> pl.Expr:
+            return expr.over(by) if by else expr
+
+        def curve(key: str, field: str) -> pl.Expr:
+            return pl.col(f"{key}.{field}")
+
+        def position(signal: pl.Expr) -> pl.Expr:
+            position = signal.fill_nan(0).fill_null(0).shift(1).fill_null(0)
+            return position if self.allow_short else position.clip(lower_bound=0)
+
+        # NOTE - curves are computed wide (a set of columns per strategy) in stages which refer to
+        # the previous stage's columns, so windows only group by `by` & nothing is computed twice,
+        # & are then unpivoted to long
+        wide = (
+            df
+            .select(
+                *keys,
+                over(pl.col(price).pct_change()).fill_null(0).alias("asset_return"),
+                *(
+                    expr.cast(pl.Float64).alias(f"{key}.signal")
+                    for key, expr in zip(strategies, signals.values())
+                ),
+            )
+            .with_columns(
+                over(position(curve(key, "signal"))).alias(f"{key}.position")
+                for key in strategies
+            )
+            .with_columns(
+                over(curve(key, "position").diff().fill_null(0).abs()).alias(
+                    f"{key}.turnover"
+                )
+                for key in strategies
+            )
+            .with_columns(
+                (
+                    curve(key, "position") * pl.col("asset_return")
+                    - curve(key, "turnover") * (self.cost + self.slippage)
+                ).alias(f"{key}.return")
+                for key in strategies
+            )
+            .with_columns(
+                over((1 + curve(key, "return")).cum_prod()).alias(f"{key}.equity")
+                for key in strategies
+            )
+            .with_columns(
+                over(curve(key, "equity") / curve(key, "equity").cum_max() - 1).alias(
+                    f"{key}.drawdown"
+                )
+                for key in strategies
+            )
+        )
+        return (
+            wide
+            .select(
+                *keys,
+                *(
+                    pl.struct(curve(key, field).alias(field) for field in fields).alias(
+                        key
+                    )
+                    for key in strategies
+                ),
+            )
+            .unpivot(
+                on=list(strategies),
+                index=keys,
+                variable_name="strategy",
+                value_name="curves",
+            )
+            .with_columns(
+                pl.col("strategy").replace_strict(strategies, return_dtype=pl.String)
+            )
+            .unnest("curves")
+        )
+
+    def metrics(self, result: pl.LazyFrame, by: str | None = None) -> pl.LazyFrame:
+        """
+        Performance metrics of every strategy (& every `by` group) of a `run` result.
+
+        Returns
+        -------
+        pl.LazyFrame
+            `by`, `strategy`, `total_return`, `cagr`, `volatility` (annualized), `sharpe`
+            (annualized, zero risk free rate), `max_drawdown`, `trades` (position changes) &
+            `exposure` (fraction of bars in the market)
+        """
+        returns = pl.col("return")
+        annualize = self.periods_per_year**0.5
+        return result.group_by(
+            [by, "strategy"] if by else ["strategy"], maintain_order=True
+        ).agg(
+            total_return=pl.col("equity").last() - 1,
+            cagr=pl.col("equity").last() ** (self.periods_per_year / pl.len()) - 1,
+            volatility=returns.std() * annualize,
+            sharpe=pl.when(returns.std() > 0).then(
+                returns.mean() / returns.std() * annualize
+            ),
+            max_drawdown=pl.col("drawdown").min(),
+            trades=(pl.col("turnover") > 0).sum(),
+            exposure=(pl.col("position") != 0).mean(),
+        )
@@ -0,0 +1,290 @@
+"""
+Declarative stock screens compiled to a single polars expression.
+
+A screen is a boolean filter over the columns of a per ticker snapshot (latest bars, indicators &
+equity info), e.g. `RSI_14 < 30 AND close > SMA_200 AND index_symbol contains 'NIFTY 50'`.
+
+Grammar (keywords are case insensitive):
+    filter      := and_filter (OR and_filter)*
+    and_filter  := not_filter (AND not_filter)*
+    not_filter  := NOT not_filter | predicate
+    predicate   := value [comparison]
+    comparison  := (< | <= | > | >= | = | == | != | <>) value
+                 | [NOT] CONTAINS value | [NOT] IN (value, ...) | BETWEEN value AND value
+                 | IS [NOT] NULL
+    value       := term ((+ | -) term)*
+    term        := factor ((* | /) factor)*
+    factor      := number | 'string' | TRUE | FALSE | column [ '[' bars ']' ] | - factor
+                 | ( filter )
+    column      := name | "quoted name"
+
+`column[n]` is the column's value `n` bars before the latest one, e.g. `close > close[1]`.
+`CONTAINS` is a list membership test for list columns (e.g. `index_symbol`) & a substring test
+for string columns.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+import polars as pl
+
+_TOKEN = re.compile(
+    r"""
+    \s*(?:
+        (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)
+      | '(?P<string>(?:[^']|'')*)'
+      | "(?P<quoted>(?:[^"]|"")+)"
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<op><=|>=|!=|<>|==|[<>=+\-*/(),\[\]])
+    )
+    """,
+    re.VERBOSE,
+)
+_KEYWORDS = {
+    "AND", "OR", "NOT", "CONTAINS", "IN", "BETWEEN", "IS", "NULL", "TRUE", "FALSE"
+}  # fmt: skip
+_COMPARISONS = {
+    "<": pl.Expr.lt,
+    "<=": pl.Expr.le,
+    ">": pl.Expr.gt,
+    ">=": pl.Expr.ge,
+    "=": pl.Expr.eq,
+    "==": pl.Expr.eq,
+    "!=": pl.Expr.ne,
+    "<>": pl.Expr.ne,
+}
+
+
+@dataclass
+class _Token:
+    kind: str  # number, string, name, keyword, op or end
+    value: Any
+    position: int
+
+
+def _tokenize(text: str) -> list[_Token]:
+    tokens, position = [], 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Unexpected character at {position}: '{text[position:]}'")
+        kind = match.lastgroup
+        value, start = match.group(kind), match.start(kind)
+        if kind == "number":
+            value = float(value) if re.search(r"[.eE]", value) else int(value)
+        elif kind == "string":
+            value = value.replace("''", "'")
+        elif kind == "quoted":
+            kind, value = "name", value.replace('""', '"')
+        elif kind == "name" and value.upper() in _KEYWORDS:
+            kind, value = "keyword", value.upper()
+        tokens.append(_Token(kind, value, start))
+        position = match.end()
+    tokens.append(_Token("end", None, len(text)))
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser, building the polars expression while parsing."""
+
+    def __init__(self, text: str, schema: pl.Schema, by: str):
+        self.tokens = _tokenize(text)
+        self.index = 0
+        self.schema = schema
+        self.by = by
+
+    @property
+    def token(self) -> _Token:
+        return self.tokens[self.index]
+
+    def accept(self, kind: str, *values: Any) -> _Token | None:
+        token = self.token
+        if token.kind == kind and (not values or token.value in values):
+            self.index += 1
+            return token
+        return None
+
+    def expect(self, kind: str, *values: Any) -> _Token:
+        token = self.accept(kind, *values)
+        if token is None:
+            expected = " or ".join(map(str, values)) or kind
+            found = self.token.value if self.token.kind != "end" else "end of filter"
+            raise ValueError(
+                f"Expected {expected} at {self.token.position}, found '{found}'"
+            )
+        return token
+
+    def parse(self) -> pl.Expr:
+        expr = self.filter()
+        self.expect("end")
+        return expr
+
+    def filter(self) -> pl.Expr:
+        expr = self.and_filter()
+        while self.accept("keyword", "OR"):
+            expr = expr | self.and_filter()
+        return expr
+
+    def and_filter(self) -> pl.Expr:
+        expr = self.not_filter()
+        while self.accept("keyword", "AND"):
+            expr = expr & self.not_filter()
+        return expr
+
+    def not_filter(self) -> pl.Expr:
+        if self.accept("keyword", "NOT"):
+            return ~self.not_filter()
+        return self.predicate()
+
+    def predicate(self) -> pl.Expr:
+        start = self.token
+        left = self.value()
+        if token := self.accept("op", *_COMPARISONS):
+            return _COMPARISONS[token.value](left, self.value())
+        if self.accept("keyword", "BETWEEN"):
+            lower = self.value()
+            self.expect("keyword", "AND")
+            return left.is_between(lower, self.value())
+        if self.accept("keyword", "IS"):
+            negate = self.accept("keyword", "NOT")
+            self.expect("keyword", "NULL")
+            return left.is_not_null() if negate else left.is_null()
+
+        negate = self.accept("keyword", "NOT")
+        if self.accept("keyword", "CONTAINS"):
+            expr = self.contains(start, left, self.value())
+        elif self.accept("keyword", "IN"):
+            self.expect("op", "(")
+            values = [self.value()]
+            while self.accept("op", ","):
+                values.append(self.value())
+            self.expect("op", ")")
+            expr = pl.any_horizontal(left == value for value in values)
+        elif negate:
+            raise ValueError(f"Expected CONTAINS or IN at {self.token.position}")
+        else:
+            return left
+        return ~expr if negate else expr
+
+    def contains(self, start: _Token, left: pl.Expr, value: pl.Expr) -> pl.Expr:
+        dtype = self.schema.get(start.value) if start.kind == "name" else None
+        if isinstance(dtype, pl.List):
+            return left.list.contains(value)
+        if dtype == pl.String:
+            return left.str.contains(value, literal=True)
+        raise ValueError(
+            f"CONTAINS at {start.position} needs a list or string column, "
+            f"found '{start.value}'"
+        )
+
+    def value(self) -> pl.Expr:
+        expr = self.term()
+        while token := self.accept("op", "+", "-"):
+            right = self.term()
+            expr = expr + right if token.value == "+" else expr - right
+        return expr
+
+    def term(self) -> pl.Expr:
+        expr = self.factor()
+        while token := self.accept("op", "*", "/"):
+            right = self.factor()
+            expr = expr * right if token.value == "*" else expr / right
+        return expr
+
+    def factor(self) -> pl.Expr:
+        if token := self.accept("number"):
+            return pl.lit(token.value)
+        if token := self.accept("string"):
+            return pl.lit(token.value)
+        if token := self.accept("keyword", "TRUE", "FALSE"):
+            return pl.lit(token.value == "TRUE")
+        if self.accept("op", "-"):
+            return -self.factor()
+        if self.accept("op", "("):
+            expr = self.filter()
+            self.expect("op", ")")
+            return expr
+        return self.column()
+
+    def column(self) -> pl.Expr:
+        token = self.expect("name")
+        if token.value not in self.schema:
+            raise ValueError(f"Unknown column '{token.value}' at {token.position}")
+        expr = pl.col(token.value)
+        if self.accept("op", "["):
+            bars = self.expect("number").value
+            if not isinstance(bars, int):
+                raise ValueError(f"Bars before must be an integer at {token.position}")
+            self.expect("op", "]")
+            expr = expr.shift(bars).over(self.by)
+        return expr
+
+
+def compile_screen(text: str, schema: pl.Schema, by: str = "ticker") -> pl.Expr:
+    """
+    Compile a screen filter into a polars expression.
+
+    Parameters
+    ----------
+    text : str
+        Filter, e.g. `RSI_14 < 30 AND close > SMA_200`, see module docstring for the grammar
+    schema : pl.Schema
+        Schema of the screened data, used to validate column names
+    by : str, optional
+        Ticker column, `column[n]` looks back within it, by default "ticker"
+
+    Returns
+    -------
+    pl.Expr
+        Boolean expression, data must be sorted by `by` & date when `column[n]` is used
+
+    Raises
+    ------
+    ValueError
+        When the filter is invalid or refers to unknown columns
+    """
+    return _Parser(text, schema, by).parse()
+
+
+def screen(
+    snapshot: pl.DataFrame | pl.LazyFrame,
+    text: str,
+    by: str = "ticker",
+    max_age: timedelta | None = None,
+) -> pl.LazyFrame:
+    """
+    Latest bar of every `by` ticker in `snapshot` which passes the screen `text`.
+
+    Parameters
+    ----------
+    snapshot : pl.DataFrame | pl.LazyFrame
+        Latest bars of every ticker, with `by` & `date` columns
+    text : str
+        Filter, see `compile_screen`
+    by : str, optional
+        Ticker column, by default "ticker"
+    max_age : timedelta | None, optional
+        Skip tickers whose latest bar is older than the latest bar of `snapshot` by more than
+        `max_age` (e.g. delisted ones, `timedelta(0)` screens only the latest date), by default
+        every ticker is screened
+
+    Returns
+    -------
+    pl.LazyFrame
+        Matching rows, one per ticker
+
+    Raises
+    ------
+    ValueError
+        When the filter is invalid or refers to unknown columns
+    """
+    snapshot = snapshot.lazy()
+    predicate = compile_screen(text, snapshot.collect_schema(), by)
+    if max_age is not None:
+        predicate = predicate & (pl.col("date") >= pl.col("date").max() - max_age)
+    return snapshot.sort(by, "date").filter(
+        (pl.col("date") == pl.col("date").max().over(by)) & predicate
+    )
@@ -0,0 +1,200 @@
+"""
+Multi-core parameter sweep of a strategy over many tickers.
+
+Work is split into (tickers chunk x parameter set) units run on a process pool. The OHLCV data is
+written once to an (uncompressed) Arrow IPC file which every worker memory maps, so units only
+carry row offsets & parameters instead of pickled frames, and each one reads a zero-copy slice of
+its tickers.
+
+Usage:
+    def sma_cross(df: pl.LazyFrame, fast: int, slow: int) -> pl.LazyFrame:
+        return df.ta.over("ticker").trend.sma_crossover(fast, slow).rename(
+            {f"SMA_crossover_{fast}_{slow}": "signal"}
+        )
+
+    sweep = Sweep(sma_cross, {"fast": [5, 10, 20], "slow": [50, 100, 200]})
+    results = sweep.run(df)
+    sweep.summarize(results)
+"""
+
+import itertools
+import logging
+import os
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+import pyarrow as pa
+
+from .backtest import Backtest
+
+logger = logging.getLogger("stocksense")
+
+# NOTE - OHLCV memory mapped by a worker process, opened once by `_open_data`
+_data: pl.DataFrame | None = None
+
+
+def _open_data(path: str) -> None:
+    global _data
+    # NOTE - arrow buffers point into the mapped file & polars takes them over without a copy,
+    # so pages are only read when a unit touches its slice & are shared by all workers
+    with pa.memory_map(path) as source:
+        _data = pl.from_arrow(pa.ipc.open_file(source).read_all(), rechunk=False)
+
+
+def _run_unit(
+    strategy: Callable[..., pl.DataFrame | pl.LazyFrame],
+    params: dict[str, Any],
+    offset: int,
+    length: int,
+    backtest: Backtest,
+) -> pl.DataFrame:
+    """Backtest metrics of `strategy` with `params` on the `offset`/`length` rows of data."""
+    signals = strategy(_data.slice(offset, length).lazy(), **params)
+    result = backtest.run(signals, {"signal": pl.col("signal")}, by="ticker")
+    return (
+        backtest
+        .metrics(result, by="ticker")
+        .drop("strategy")
+        .with_columns(pl.lit(value).alias(name) for name, value in params.items())
+        .collect()
+    )
+
+
+@dataclass
+class Sweep:
+    """
+    Parameter sweep of a strategy, backtested per ticker.
+
+    Attributes
+    ----------
+        strategy : Callable[..., pl.DataFrame | pl.LazyFrame]
+            `strategy(df, **params)` adding a `signal` column (see `Backtest`) to `df`, the OHLCV of
+            a few tickers sorted by ticker & date. Runs in worker processes, so it must be
+            importable (defined at module level)
+        grid : dict[str, list]
+            Values of every parameter, all their combinations are swept
+        backtest : Backtest, optional
+            Costs & settings of the backtest, by default `Backtest()`
+        max_workers : int | None, optional
+            Worker processes, by default the number of CPUs
+        tickers_per_unit : int, optional
+            Tickers per work unit, more amortizes the per unit overhead while fewer balances the
+            load better, by default 20
+    """
+
+    strategy: Callable[..., pl.DataFrame | pl.LazyFrame]
+    grid: dict[str, list]
+    backtest: Backtest = field(default_factory=Backtest)
+    max_workers: int | None = None
+    tickers_per_unit: int = 20
+
+    @property
+    def param_sets(self) -> list[dict[str, Any]]:
+        return [
+            dict(zip(self.grid, values))
+            for values in itertools.product(*self.grid.values())
+        ]
+
+    def run(self, df: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame:
+        """
+        Backtest every parameter set on every ticker of `df`.
+
+        Parameters
+        ----------
+        df : pl.DataFrame | pl.LazyFrame
+            OHLCV data of many tickers, with `ticker` & `date` columns
+
+        Returns
+        -------
+        pl.DataFrame
+            `Backtest.metrics` of every ticker & parameter set, one column per parameter
+
+        Raises
+        ------
+        ValueError
+            When `df` is empty
+        """
+        data = df.lazy().sort("ticker", "date").collect()
+        if data.is_empty():
+            raise ValueError("No data to sweep")
+
+        # NOTE - rows of a ticker are contiguous, a unit's tickers are one (offset, length) slice
+        ends = data.get_column("ticker").rle().struct.field("len").cum_sum().to_list()
+        starts = [0, *ends[:-1]]
+        chunks = [
+            (starts[i], ends[min(i + self.tickers_per_unit, len(ends)) - 1] - starts[i])
+            for i in range(0, len(ends), self.tickers_per_unit)
+        ]
+        units = [(params, *chunk) for params in self.param_sets for chunk in chunks]
+        max_workers = self.max_workers or os.cpu_count() or 1
+        logger.info(f"sweeping {len(units)} units on {max_workers} processes")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "ohlcv.arrow"
+            # NOTE - only uncompressed IPC can be memory mapped
+            data.write_ipc(path, compression="uncompressed")
+            del data
+
+            # NOTE - every worker is given its share of the cores for polars' own thread pool, the
+            # variable is read when polars is imported in the (spawned, not forked) worker
+            threads = os.environ.get("POLARS_MAX_THREADS")
+            os.environ["POLARS_MAX_THREADS"] = str(
+                max(1, (os.cpu_count() or 1) // max_workers)
+            )
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=get_context("spawn"),
+                    initializer=_open_data,
+                    initargs=(path.as_posix(),),
+                ) as executor:
+                    futures = [
+                        executor.submit(
+                            _run_unit,
+                            self.strategy,
+                            params,
+                            offset,
+                            length,
+                            self.backtest,
+                        )
+                        for params, offset, length in units
+                    ]
+                    results = [future.result() for future in futures]
+            finally:
+                if threads is None:
+                    os.environ.pop("POLARS_MAX_THREADS")
+                else:
+                    os.environ["POLARS_MAX_THREADS"] = threads
+
+        return pl.concat(results).select(
+            "ticker", *self.grid, pl.exclude("ticker", *self.grid)
+        )
+
+    def summarize(self, results: pl.DataFrame, rank_by: str = "sharpe") -> pl.DataFrame:
+        """
+        Rank parameter sets by their mean `rank_by` metric across tickers.
+
+        Returns
+        -------
+        pl.DataFrame
+            `rank`, parameters, number of `tickers` & the mean & median of `rank_by`, and the mean
+            of the other metrics, best first
+        """
+        metrics = [col for col in results.columns if col not in ("ticker", *self.grid)]
+        return (
+            results
+            .group_by(list(self.grid))
+            .agg(
+                tickers=pl.len(),
+                **{f"median_{rank_by}": pl.col(rank_by).median()},
+                **{f"mean_{col}": pl.col(col).mean() for col in metrics},
+            )
+            .sort(f"mean_{rank_by}", descending=True, nulls_last=True)
+            .with_row_index("rank", offset=1)
+        )
@@ -0,0 +1,138 @@
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import ClassVar
+
+import numpy as np
+import polars as pl
+
+
+@dataclass
+class TalibCall:
+    """A TA-Lib `func` call on `inputs` columns, `outputs` naming its result(s)."""
+
+    func: Callable[..., np.ndarray | tuple[np.ndarray, ...]]
+    inputs: list[str]
+    outputs: list[str]
+    dtype: type[pl.DataType] = pl.Float64
+    kwargs: dict = field(default_factory=dict)
+
+
+def talib_expr(calls: list[TalibCall]) -> pl.Expr:
+    """
+    Run TA-Lib `calls` in a single batch UDF, as a struct expression holding all their outputs.
+
+    Every input column is converted to numpy once & shared between the calls.
+    """
+    inputs = list(dict.fromkeys(col for call in calls for col in call.inputs))
+    schema = {name: call.dtype for call in calls for name in call.outputs}
+
+    def apply(batch: pl.Series) -> pl.Series:
+        arrays = {col: batch.struct.field(col).to_numpy() for col in inputs}
+        columns = {}
+        for call in calls:
+            results = call.func(*(arrays[col] for col in call.inputs), **call.kwargs)
+            if not isinstance(results, tuple):
+                results = (results,)
+            columns.update(zip(call.outputs, results))
+        return pl.DataFrame(columns, schema=schema).to_struct()
+
+    return pl.struct(inputs).map_batches(apply, return_dtype=pl.Struct(schema))
+
+
+@dataclass
+class IndicatorPlan:
+    """
+    Indicators to attach to a frame with a single `with_columns`.
+
+    Native expressions are evaluated in one context (so polars shares their common
+    sub-expressions) & all TA-Lib calls run in one batch UDF. Indicators are keyed by their
+    output column(s), adding the same one twice is a no-op.
+    """
+
+    columns: dict[str, pl.Expr] = field(default_factory=dict)
+    calls: dict[tuple[str, ...], TalibCall] = field(default_factory=dict)
+    names: list[str] = field(default_factory=list)
+
+    def add_columns(self, columns: dict[str, pl.Expr]) -> None:
+        for name, expr in columns.items():
+            if name not in self.columns:
+                self.columns[name] = expr
+                self.names.append(name)
+
+    def add_call(self, call: TalibCall) -> None:
+        key = tuple(call.outputs)
+        if key not in self.calls:
+            self.calls[key] = call
+            self.names.extend(call.outputs)
+
+    def apply(self, df: pl.LazyFrame, by: str | None = None) -> pl.LazyFrame:
+        """Attach planned indicators to `df`, computed per `by` group when given."""
+
+        def over(expr: pl.Expr) -> pl.Expr:
+            return expr.over(by) if by else expr
+
+        exprs = [over(expr).alias(name) for name, expr in self.columns.items()]
+        if self.calls:
+            exprs.append(over(talib_expr(list(self.calls.values()))).struct.unnest())
+        return df.with_columns(exprs)
+
+
+@dataclass
+class TAAccessor:
+    """
+    Base of every `ta` accessor.
+
+    Indicators are attached as expressions, so nothing is computed until the returned frame is
+    collected & chained indicators run as a single query.
+
+    Attributes
+    ----------
+        df : pl.LazyFrame
+            Data to compute indicators on, must be sorted by `by` (and date) when `by` is given
+        by : str | None, optional
+            Group column (e.g. `ticker`), indicators are then computed per group instead of
+            across the whole frame, by default None
+        plan : IndicatorPlan | None, optional
+            When given, indicators are added to it (& `df` is returned as is) instead of being
+            attached right away, used by `TechnicalAnalysis.compute`, by default None
+    """
+
+    # NOTE - public methods which are not indicators, `TechnicalAnalysis.compute` rejects them
+    non_indicators: ClassVar[frozenset[str]] = frozenset()
+
+    df: pl.LazyFrame
+    by: str | None = None
+    plan: IndicatorPlan | None = None
+
+    def _native(self, columns: dict[str, pl.Expr]) -> pl.LazyFrame:
+        """Attach native polars indicator expressions as `columns`."""
+        if self.plan is not None:
+            self.plan.add_columns(columns)
+            return self.df
+
+        plan = IndicatorPlan()
+        plan.add_columns(columns)
+        return plan.apply(self.df, self.by)
+
+    def _talib(
+        self,
+        func: Callable[..., np.ndarray | tuple[np.ndarray, ...]],
+        inputs: list[str],
+        outputs: list[str],
+        dtype: type[pl.DataType] = pl.Float64,
+        **kwargs,
+    ) -> pl.LazyFrame:
+        """
+        Attach TA-Lib `func` result(s) on `inputs` columns as `outputs` columns.
+
+        `func` runs as a batch UDF inside the query, once for the whole frame or, with `by`, once
+        per group, so values never leak across group boundaries.
+        """
+        call = TalibCall(func, inputs, outputs, dtype, kwargs)
+        if self.plan is not None:
+            self.plan.add_call(call)
+            return self.df
+
+        plan = IndicatorPlan()
+        plan.add_call(call)
+        return plan.apply(self.df, self.by)
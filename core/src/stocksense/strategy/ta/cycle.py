@@ -3,48 +3,34 @@ from dataclasses import dataclass
 import polars as pl
 import talib
 
+from ._base import TAAccessor
 
-@dataclass
-class CycleAccessor:
-    df: pl.LazyFrame
 
+@dataclass
+class CycleAccessor(TAAccessor):
     def ht_dcperiod(self, col: str = "close") -> pl.LazyFrame:
         """Hilbert Transform - Dominant Cycle Period."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        dcperiod = talib.HT_DCPERIOD(close)
-        return self.df.with_columns(pl.Series("HT_DCPERIOD", dcperiod))
+        return self._talib(talib.HT_DCPERIOD, [col], ["HT_DCPERIOD"])
 
     def ht_dcphase(self, col: str = "close") -> pl.LazyFrame:
         """Hilbert Transform - Dominant Cycle Phase."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        dcphase = talib.HT_DCPHASE(close)
-        return self.df.with_columns(pl.Series("HT_DCPHASE", dcphase))
+        return self._talib(talib.HT_DCPHASE, [col], ["HT_DCPHASE"])
 
     def ht_phasor(self, col: str = "close") -> pl.LazyFrame:
         """Hilbert Transform - Phasor Components (inphase, quadrature)."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        inphase, quadrature = talib.HT_PHASOR(close)
-        return self.df.with_columns([
-            pl.Series("HT_PHASOR_inphase", inphase),
-            pl.Series("HT_PHASOR_quadrature", quadrature),
-        ])
+        return self._talib(
+            talib.HT_PHASOR, [col], ["HT_PHASOR_inphase", "HT_PHASOR_quadrature"]
+        )
 
     def ht_sine(self, col: str = "close") -> pl.LazyFrame:
         """Hilbert Transform - Sine and Lead Sine."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        sine, leadsine = talib.HT_SINE(close)
-        return self.df.with_columns([
-            pl.Series("HT_SINE", sine),
-            pl.Series("HT_LEADSINE", leadsine),
-        ])
+        return self._talib(talib.HT_SINE, [col], ["HT_SINE", "HT_LEADSINE"])
 
     def ht_trendmode(self, col: str = "close") -> pl.LazyFrame:
         """Hilbert Transform - Trend vs Cycle Mode."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        trendmode = talib.HT_TRENDMODE(close)
-        return self.df.with_columns(pl.Series("HT_TRENDMODE", trendmode))
+        return self._talib(talib.HT_TRENDMODE, [col], ["HT_TRENDMODE"], dtype=pl.Int32)
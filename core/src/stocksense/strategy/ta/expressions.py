@@ -0,0 +1,251 @@
+"""
+Native polars expression implementations of common indicators.
+
+Every function follows TA-Lib's definition of the indicator (EMA seeded with the SMA of its first
+window, Wilder smoothing for RSI/ATR, population standard deviation for BBANDS), so values match
+TA-Lib's up to floating point error, but being expressions they stay inside the lazy query plan.
+Values during the warmup period are null (TA-Lib returns NaN).
+
+Expressions work on a single series, wrap them with `.over(<group>)` for multi-ticker frames.
+"""
+
+import polars as pl
+
+
+def seeded_ewm(expr: pl.Expr, period: int, alpha: float, offset: int = 0) -> pl.Expr:
+    """
+    Exponentially weighted mean seeded with the SMA of the first `period` values.
+
+    Parameters
+    ----------
+    expr : pl.Expr
+        Input series
+    period : int
+        Window of the seed SMA
+    alpha : float
+        Smoothing factor, `2 / (period + 1)` for EMA, `1 / period` for Wilder smoothing
+    offset : int, optional
+        Leading rows of `expr` which are null (e.g. after `diff`), by default 0
+
+    Returns
+    -------
+    pl.Expr
+        Smoothed series, null before row `offset + period - 1`
+    """
+    start = offset + period - 1
+    index = pl.int_range(pl.len())
+    seeded = (
+        pl
+        .when(index < start)
+        .then(None)
+        .when(index == start)
+        .then(expr.rolling_mean(window_size=period))
+        .otherwise(expr)
+    )
+    return seeded.ewm_mean(alpha=alpha, adjust=False)
+
+
+# SECTION - overlap studies
+
+
+def sma(expr: pl.Expr, period: int) -> pl.Expr:
+    """Simple Moving Average."""
+    return expr.rolling_mean(window_size=period)
+
+
+def ema(expr: pl.Expr, period: int, offset: int = 0) -> pl.Expr:
+    """Exponential Moving Average."""
+    return seeded_ewm(expr, period, 2 / (period + 1), offset)
+
+
+def dema(expr: pl.Expr, period: int) -> pl.Expr:
+    """Double Exponential Moving Average."""
+    ema1 = ema(expr, period)
+    return 2 * ema1 - ema(ema1, period, offset=period - 1)
+
+
+def tema(expr: pl.Expr, period: int) -> pl.Expr:
+    """Triple Exponential Moving Average."""
+    ema1 = ema(expr, period)
+    ema2 = ema(ema1, period, offset=period - 1)
+    ema3 = ema(ema2, period, offset=2 * (period - 1))
+    return 3 * ema1 - 3 * ema2 + ema3
+
+
+def bbands(
+    expr: pl.Expr, period: int, nbdevup: float = 2.0, nbdevdn: float = 2.0
+) -> tuple[pl.Expr, pl.Expr, pl.Expr]:
+    """Bollinger Bands (SMA based) upper, middle & lower band."""
+    middle = expr.rolling_mean(window_size=period)
+    std = expr.rolling_std(window_size=period, ddof=0)
+    return middle + nbdevup * std, middle, middle - nbdevdn * std
+
+
+def midpoint(expr: pl.Expr, period: int) -> pl.Expr:
+    """MidPoint over period."""
+    return (
+        expr.rolling_max(window_size=period) + expr.rolling_min(window_size=period)
+    ) / 2
+
+
+def midprice(high: pl.Expr, low: pl.Expr, period: int) -> pl.Expr:
+    """Midpoint Price over period."""
+    return (
+        high.rolling_max(window_size=period) + low.rolling_min(window_size=period)
+    ) / 2
+
+
+# SECTION - momentum
+
+
+def rsi(expr: pl.Expr, period: int) -> pl.Expr:
+    """Relative Strength Index (Wilder smoothing)."""
+    change = expr.diff()
+    gain = seeded_ewm(change.clip(lower_bound=0), period, 1 / period, offset=1)
+    loss = seeded_ewm((-change).clip(lower_bound=0), period, 1 / period, offset=1)
+    total = gain + loss
+    return pl.when(total == 0).then(0.0).otherwise(100 * gain / total)
+
+
+def cmo(expr: pl.Expr, period: int) -> pl.Expr:
+    """Chande Momentum Oscillator (Wilder smoothing)."""
+    change = expr.diff()
+    gain = seeded_ewm(change.clip(lower_bound=0), period, 1 / period, offset=1)
+    loss = seeded_ewm((-change).clip(lower_bound=0), period, 1 / period, offset=1)
+    total = gain + loss
+    return pl.when(total == 0).then(0.0).otherwise(100 * (gain - loss) / total)
+
+
+def mom(expr: pl.Expr, period: int) -> pl.Expr:
+    """Momentum, `price - prev_price`."""
+    return expr - expr.shift(period)
+
+
+def roc(expr: pl.Expr, period: int) -> pl.Expr:
+    """Rate of Change, `(price / prev_price - 1) * 100`."""
+    return (expr / expr.shift(period) - 1) * 100
+
+
+def rocp(expr: pl.Expr, period: int) -> pl.Expr:
+    """Rate of Change Percentage, `(price - prev_price) / prev_price`."""
+    return (expr - expr.shift(period)) / expr.shift(period)
+
+
+def rocr(expr: pl.Expr, period: int) -> pl.Expr:
+    """Rate of Change Ratio, `price / prev_price`."""
+    return expr / expr.shift(period)
+
+
+def trix(expr: pl.Expr, period: int) -> pl.Expr:
+    """1-day Rate of Change of a Triple smooth EMA."""
+    ema1 = ema(expr, period)
+    ema2 = ema(ema1, period, offset=period - 1)
+    ema3 = ema(ema2, period, offset=2 * (period - 1))
+    return roc(ema3, 1)
+
+
+def willr(high: pl.Expr, low: pl.Expr, close: pl.Expr, period: int) -> pl.Expr:
+    """Williams' %R."""
+    highest = high.rolling_max(window_size=period)
+    lowest = low.rolling_min(window_size=period)
+    spread = highest - lowest
+    return pl.when(spread == 0).then(0.0).otherwise(-100 * (highest - close) / spread)
+
+
+# SECTION - volatility
+
+
+def trange(high: pl.Expr, low: pl.Expr, close: pl.Expr) -> pl.Expr:
+    """True Range, null for the first row (no previous close)."""
+    prev_close = close.shift(1)
+    return (
+        pl
+        .when(prev_close.is_null())
+        .then(None)
+        .otherwise(
+            pl.max_horizontal(
+                high - low, (high - prev_close).abs(), (low - prev_close).abs()
+            )
+        )
+    )
+
+
+def atr(high: pl.Expr, low: pl.Expr, close: pl.Expr, period: int) -> pl.Expr:
+    """Average True Range (Wilder smoothing)."""
+    return seeded_ewm(trange(high, low, close), period, 1 / period, offset=1)
+
+
+def natr(high: pl.Expr, low: pl.Expr, close: pl.Expr, period: int) -> pl.Expr:
+    """Normalized Average True Range."""
+    return atr(high, low, close, period) / close * 100
+
+
+# SECTION - volume
+
+
+def obv(close: pl.Expr, volume: pl.Expr) -> pl.Expr:
+    """On Balance Volume, starting from the first row's volume."""
+    return (close.diff().sign().fill_null(1) * volume).cum_sum()
+
+
+# SECTION - statistics
+
+
+def log_return(expr: pl.Expr, period: int = 1) -> pl.Expr:
+    """Log return over `period` rows, `ln(price / prev_price)`."""
+    return (expr / expr.shift(period)).log()
+
+
+def zscore(expr: pl.Expr, period: int) -> pl.Expr:
+    """Rolling z-score, distance from the rolling mean in (population) standard deviations."""
+    std = expr.rolling_std(window_size=period, ddof=0)
+    return (
+        pl
+        .when(std == 0)
+        .then(0.0)
+        .otherwise((expr - expr.rolling_mean(window_size=period)) / std)
+    )
+
+
+def correl(x: pl.Expr, y: pl.Expr, period: int) -> pl.Expr:
+    """Rolling Pearson correlation."""
+    return pl.rolling_corr(x, y, window_size=period)
+
+
+def beta(x: pl.Expr, y: pl.Expr, period: int) -> pl.Expr:
+    """Rolling beta of `x` against `y`, on their simple returns (like TA-Lib's BETA)."""
+    x_returns, y_returns = x.pct_change(), y.pct_change()
+    return pl.rolling_cov(x_returns, y_returns, window_size=period, ddof=0) / (
+        y_returns.rolling_var(window_size=period, ddof=0)
+    )
+
+
+def linearreg_slope(expr: pl.Expr, period: int) -> pl.Expr:
+    """Slope of the rolling least squares line of `expr` against its row number."""
+    # NOTE - variance of `period` consecutive integers is `(period^2 - 1) / 12`
+    index = pl.int_range(pl.len()).cast(pl.Float64)
+    return pl.rolling_cov(index, expr, window_size=period, ddof=0) / (
+        (period**2 - 1) / 12
+    )
+
+
+def realized_volatility(
+    expr: pl.Expr, period: int, periods_per_year: int = 252
+) -> pl.Expr:
+    """Annualized rolling (sample) standard deviation of log returns."""
+    return log_return(expr).rolling_std(window_size=period) * periods_per_year**0.5
+
+
+def drawdown(expr: pl.Expr) -> pl.Expr:
+    """Fall from the running peak, as a (negative) fraction of the peak."""
+    return expr / expr.cum_max() - 1
+
+
+def max_drawdown(expr: pl.Expr) -> pl.Expr:
+    """Deepest drawdown so far."""
+    return drawdown(expr).cum_min()
+
+
+def percent_rank(expr: pl.Expr, period: int) -> pl.Expr:
+    """Rolling percentile rank (0 - 100) of the latest value among the last `period` values."""
+    return (expr.rolling_rank(window_size=period) - 1) / (period - 1) * 100
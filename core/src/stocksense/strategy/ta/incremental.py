@@ -0,0 +1,567 @@
+"""
+Incremental (streaming) versions of recursive & rolling indicators.
+
+Every indicator keeps only the state needed to produce its next value from one new bar, so
+keeping indicators fresh as bars are appended is O(1) work per bar (rolling window ones keep
+running sums) instead of a recompute over the whole history. Values match the batch `df.ta` ones, `None`
+during warmup & TA-Lib's definition afterwards.
+
+State is serializable: `to_state()` gives a JSON compatible dict & `from_state()` restores the
+indicator from it, e.g. to continue from the last stored bar of a ticker. State can also be
+rebuilt without the whole history: replaying the last `warmup` bars & `align`ing with the batch
+(`df.ta.compute()`, see `batch_spec`) values of the last bar gives the same state, up to float
+precision.
+
+Usage:
+    rsi = RSI(period=14)
+    for close in closes:
+        value = rsi.update(close)
+    state = json.dumps(rsi.to_state())
+    ...
+    rsi = IncrementalState.from_state(json.loads(state))
+    rsi.update(new_close)
+"""
+
+import math
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields
+from typing import Any, ClassVar
+
+import polars as pl
+
+_REGISTRY: dict[str, type["IncrementalState"]] = {}
+
+
+def _decay_bars(alpha: float) -> int:
+    """Bars after which an exponential average's seed weighs less than float precision."""
+    if alpha >= 1:
+        return 0
+    return math.ceil(math.log(1e-16) / math.log(1 - alpha))
+
+
+@dataclass
+class IncrementalState:
+    """Base of serializable incremental state, subclasses are registered by class name."""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _REGISTRY[cls.__name__] = cls
+
+    def to_state(self) -> dict[str, Any]:
+        """JSON compatible state, including the state of nested indicators."""
+        state = {"kind": type(self).__name__}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, IncrementalState):
+                value = value.to_state()
+            elif isinstance(value, list):
+                value = list(value)
+            state[f.name] = value
+        return state
+
+    @staticmethod
+    def from_state(state: Mapping[str, Any]) -> "IncrementalState":
+        """Restore an indicator (of any kind) from its `to_state()` dict."""
+        state = dict(state)
+        kind = state.pop("kind")
+        if kind not in _REGISTRY:
+            raise ValueError(f"Unknown incremental state kind '{kind}'")
+
+        return _REGISTRY[kind](**{
+            key: (
+                IncrementalState.from_state(value)
+                if isinstance(value, Mapping) and "kind" in value
+                else value
+            )
+            for key, value in state.items()
+        })
+
+
+@dataclass
+class RollingWindow(IncrementalState):
+    """Fixed size ring buffer of the latest `size` values."""
+
+    size: int
+    values: list[float] = field(default_factory=list)
+    head: int = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.size
+
+    @property
+    def oldest(self) -> float:
+        return self.values[self.head]
+
+    @property
+    def latest(self) -> float:
+        return self.values[self.head - 1]
+
+    def push(self, value: float) -> float | None:
+        """Add `value`, returns the value it replaces once the window is full."""
+        if not self.full:
+            self.values.append(value)
+            return None
+        evicted, self.values[self.head] = self.values[self.head], value
+        self.head = (self.head + 1) % self.size
+        return evicted
+
+
+@dataclass
+class IncrementalIndicator(IncrementalState, ABC):
+    """
+    Base of incremental indicators.
+
+    `update` takes the new bar's `inputs` values & returns the indicator value(s) for it, a
+    tuple in `outputs` order for multi output indicators. `outputs` are named like the matching
+    `df.ta` columns, `batch_indicator` is the name of that `df.ta` indicator.
+    """
+
+    inputs: ClassVar[tuple[str, ...]] = ("close",)
+    batch_indicator: ClassVar[str | None] = None
+
+    @property
+    @abstractmethod
+    def outputs(self) -> list[str]: ...
+
+    @property
+    @abstractmethod
+    def warmup(self) -> int:
+        """Trailing bars whose replay rebuilds the state (before `align`)."""
+
+    @abstractmethod
+    def update(self, *values: float) -> Any: ...
+
+    def align(self, last: Mapping[str, float | None]) -> None:
+        """
+        Match the state to the batch `outputs` values `last` of the latest replayed bar.
+
+        Needed by indicators whose state depends on more than the last `warmup` bars (e.g. a
+        cumulative total), others have nothing to do.
+        """
+
+    def update_bar(self, bar: Mapping[str, float]) -> dict[str, float | None]:
+        """Update with a bar holding (at least) `inputs` columns, values keyed by `outputs`."""
+        result = self.update(*(bar[col] for col in self.inputs))
+        values = result if isinstance(result, tuple) else (result,)
+        return dict(zip(self.outputs, values))
+
+    def warm_up(self, df: pl.DataFrame, last: Mapping[str, float | None]) -> None:
+        """
+        Rebuild the state of a fresh indicator as if it had been updated with every row of `df`.
+
+        Only the last `warmup` rows are replayed, `last` are the batch `outputs` values of the
+        last row of `df` (e.g. from `df.ta.compute()`).
+        """
+        for bar in df.tail(self.warmup).select(self.inputs).iter_rows(named=True):
+            self.update_bar(bar)
+        self.align(last)
+
+    def run(self, df: pl.DataFrame) -> pl.DataFrame:
+        """Update with every row of `df` (in order), a frame of `outputs` columns."""
+        rows = [
+            self.update_bar(bar) for bar in df.select(self.inputs).iter_rows(named=True)
+        ]
+        return pl.DataFrame(
+            rows, schema={name: pl.Float64 for name in self.outputs}, orient="row"
+        )
+
+
+def batch_spec(spec: Mapping[str, Any]) -> dict[str, Any] | None:
+    """
+    `df.ta.compute()` spec of the incremental indicator `spec`, computing the same `outputs`.
+
+    Returns `None` when the indicator has no batch version.
+    """
+    indicator = type(from_spec(spec))
+    if indicator.batch_indicator is None:
+        return None
+    return {**spec, "name": indicator.batch_indicator}
+
+
+def from_spec(spec: Mapping[str, Any]) -> IncrementalIndicator:
+    """
+    Create a fresh indicator from its spec, the indicator class name & its parameters.
+
+    Parameters
+    ----------
+    spec : Mapping[str, Any]
+        e.g. `{"name": "RSI", "period": 14}` or `{"name": "MACD"}` for default parameters
+
+    Returns
+    -------
+    IncrementalIndicator
+        Indicator with no state yet
+
+    Raises
+    ------
+    ValueError
+        When `name` is not an incremental indicator
+    """
+    params = dict(spec)
+    name = params.pop("name", None)
+    indicator = _REGISTRY.get(name)
+    if indicator is None or not issubclass(indicator, IncrementalIndicator):
+        raise ValueError(f"Unknown incremental indicator '{name}'")
+    return indicator(**params)
+
+
+# SECTION - moving averages
+
+
+@dataclass
+class EMA(IncrementalIndicator):
+    """Exponential Moving Average, seeded with the SMA of the first `period` values."""
+
+    batch_indicator: ClassVar[str | None] = "overlap.ema"
+
+    period: int = 30
+    count: int = 0
+    seed: float = 0.0
+    value: float | None = None
+
+    @property
+    def alpha(self) -> float:
+        return 2 / (self.period + 1)
+
+    @property
+    def outputs(self) -> list[str]:
+        return [f"EMA_{self.period}"]
+
+    @property
+    def warmup(self) -> int:
+        return self.period
+
+    def align(self, last: Mapping[str, float | None]) -> None:
+        # NOTE - the replay only restores the seed, the value itself is the batch one
+        if (value := last.get(self.outputs[0])) is not None:
+            self.value = value
+
+    def update(self, close: float) -> float | None:
+        if self.value is not None:
+            self.value += self.alpha * (close - self.value)
+        else:
+            self.count += 1
+            self.seed += close
+            if self.count == self.period:
+                self.value = self.seed / self.period
+        return self.value
+
+
+@dataclass
+class WilderSmoothing(EMA):
+    """Wilder's smoothing, an EMA with `1 / period` smoothing factor (used by RSI & ATR)."""
+
+    batch_indicator: ClassVar[str | None] = None
+
+    @property
+    def alpha(self) -> float:
+        return 1 / self.period
+
+    @property
+    def outputs(self) -> list[str]:
+        return [f"WILDER_{self.period}"]
+
+    @property
+    def warmup(self) -> int:
+        # NOTE - not a batch output, the value is rebuilt by replaying until the seed is negligible
+        return self.period + _decay_bars(self.alpha)
+
+
+@dataclass
+class SMA(IncrementalIndicator):
+    """Simple Moving Average, from a running sum of the window."""
+
+    batch_indicator: ClassVar[str | None] = "overlap.sma"
+
+    period: int = 30
+    window: RollingWindow | None = None
+    total: float | None = None
+
+    def __post_init__(self):
+        if self.window is None:
+            self.window = RollingWindow(self.period)
+        # NOTE - states stored before running sums were kept only have the window
+        if self.total is None:
+            self.total = math.fsum(self.window.values)
+
+    @property
+    def outputs(self) -> list[str]:
+        return [f"SMA_{self.period}"]
+
+    @property
+    def warmup(self) -> int:
+        return self.period
+
+    def update(self, close: float) -> float | None:
+        self.total += close - (self.window.push(close) or 0.0)
+        return self.total / self.period if self.window.full else None
+
+
+@dataclass
+class BBANDS(IncrementalIndicator):
+    """Bollinger Bands (SMA based) upper, middle & lower band, from running window sums."""
+
+    batch_indicator: ClassVar[str | None] = "overlap.bbands"
+
+    period: int = 20
+    nbdevup: float = 2.0
+    nbdevdn: float = 2.0
+    window: RollingWindow | None = None
+    total: float | None = None
+    squares: float | None = None
+
+    def __post_init__(self):
+        if self.window is None:
+            self.window = RollingWindow(self.period)
+        if self.total is None:
+            self.total = math.fsum(self.window.values)
+        if self.squares is None:
+            mean = self.total / len(self.window.values) if self.window.values else 0.0
+            self.squares = math.fsum(
+                (value - mean) ** 2 for value in self.window.values
+            )
+
+    @property
+    def outputs(self) -> list[str]:
+        return [
+            f"BBANDS_upper_{self.period}",
+            f"BBANDS_middle_{self.period}",
+            f"BBANDS_lower_{self.period}",
+        ]
+
+    @property
+    def warmup(self) -> int:
+        return self.period
+
+    def update(self, close: float) -> tuple[float | None, float | None, float | None]:
+        # NOTE - squared deviations from the mean are updated in place of a plain sum of squares,
+        # which loses the variance to rounding when it is tiny relative to the price
+        size = len(self.window.values)
+        prev_mean = self.total / size if size else 0.0
+        evicted = self.window.push(close)
+        if evicted is None:
+            self.total += close
+            mean = self.total / (size + 1)
+            self.squares += (close - prev_mean) * (close - mean)
+        else:
+            self.total += close - evicted
+            mean = self.total / size
+            self.squares += (close - evicted) * (close - mean + evicted - prev_mean)
+        if not self.window.full:
+            return None, None, None
+
+        # NOTE - rounding can leave a tiny negative variance for a flat window
+        std = math.sqrt(max(self.squares, 0.0) / self.period)
+        return mean + self.nbdevup * std, mean, mean - self.nbdevdn * std
+
+
+# SECTION - momentum
+
+
+@dataclass
+class RSI(IncrementalIndicator):
+    """Relative Strength Index (Wilder smoothing)."""
+
+    batch_indicator: ClassVar[str | None] = "momentum.rsi"
+
+    period: int = 14
+    prev_close: float | None = None
+    gain: WilderSmoothing | None = None
+    loss: WilderSmoothing | None = None
+
+    def __post_init__(self):
+        if self.gain is None:
+            self.gain = WilderSmoothing(self.period)
+        if self.loss is None:
+            self.loss = WilderSmoothing(self.period)
+
+    @property
+    def outputs(self) -> list[str]:
+        return [f"RSI_{self.period}"]
+
+    @property
+    def warmup(self) -> int:
+        return 1 + self.gain.warmup
+
+    def update(self, close: float) -> float | None:
+        prev_close, self.prev_close = self.prev_close, close
+        if prev_close is None:
+            return None
+
+        change = close - prev_close
+        gain = self.gain.update(max(change, 0.0))
+        loss = self.loss.update(max(-change, 0.0))
+        if gain is None:
+            return None
+        total = gain + loss
+        return 0.0 if total == 0 else 100 * gain / total
+
+
+@dataclass
+class MACD(IncrementalIndicator):
+    """
+    MACD line, signal & histogram.
+
+    Like TA-Lib, the fast EMA is seeded on the same bar as the slow one & nothing is returned until
+    the signal line is available.
+    """
+
+    batch_indicator: ClassVar[str | None] = "momentum.macd"
+
+    fastperiod: int = 12
+    slowperiod: int = 26
+    signalperiod: int = 9
+    count: int = 0
+    fast: EMA | None = None
+    slow: EMA | None = None
+    signal: EMA | None = None
+
+    def __post_init__(self):
+        if self.fast is None:
+            self.fast = EMA(self.fastperiod)
+        if self.slow is None:
+            self.slow = EMA(self.slowperiod)
+        if self.signal is None:
+            self.signal = EMA(self.signalperiod)
+
+    @property
+    def outputs(self) -> list[str]:
+        return ["MACD", "MACD_signal", "MACD_hist"]
+
+    @property
+    def warmup(self) -> int:
+        # NOTE - only the signal line is a batch output, fast & slow EMAs are rebuilt by replaying
+        return self.slowperiod + max(_decay_bars(self.slow.alpha), self.signalperiod)
+
+    def align(self, last: Mapping[str, float | None]) -> None:
+        self.signal.align({self.signal.outputs[0]: last["MACD_signal"]})
+
+    def update(self, close: float) -> tuple[float | None, float | None, float | None]:
+        self.count += 1
+        slow = self.slow.update(close)
+        # NOTE - fast EMA only sees the `fastperiod` bars before the slow EMA's first value
+        if self.count > self.slowperiod - self.fastperiod:
+            self.fast.update(close)
+        if slow is None:
+            return None, None, None
+
+        macd = self.fast.value - slow
+        signal = self.signal.update(macd)
+        if signal is None:
+            return None, None, None
+        return macd, signal, macd - signal
+
+
+@dataclass
+class MOM(IncrementalIndicator):
+    """Momentum, `price - prev_price`."""
+
+    batch_indicator: ClassVar[str | None] = "momentum.momentum"
+
+    period: int = 10
+    window: RollingWindow | None = None
+
+    def __post_init__(self):
+        if self.window is None:
+            self.window = RollingWindow(self.period + 1)
+
+    @property
+    def outputs(self) -> list[str]:
+        return [f"MOM_{self.period}"]
+
+    @property
+    def warmup(self) -> int:
+        return self.window.size
+
+    def update(self, close: float) -> float | None:
+        self.window.push(close)
+        return self.window.latest - self.window.oldest if self.window.full else None
+
+
+@dataclass
+class ROC(MOM):
+    """Rate of Change, `(price / prev_price - 1) * 100`."""
+
+    batch_indicator: ClassVar[str | None] = "momentum.roc"
+
+    @property
+    def outputs(self) -> list[str]:
+        return [f"ROC_{self.period}"]
+
+    def update(self, close: float) -> float | None:
+        self.window.push(close)
+        if not self.window.full:
+            return None
+        return (self.window.latest / self.window.oldest - 1) * 100
+
+
+# SECTION - volatility & volume
+
+
+@dataclass
+class ATR(IncrementalIndicator):
+    """Average True Range (Wilder smoothing)."""
+
+    inputs: ClassVar[tuple[str, ...]] = ("high", "low", "close")
+    batch_indicator: ClassVar[str | None] = "volatility.atr"
+
+    period: int = 14
+    prev_close: float | None = None
+    smoothing: WilderSmoothing | None = None
+
+    def __post_init__(self):
+        if self.smoothing is None:
+            self.smoothing = WilderSmoothing(self.period)
+
+    @property
+    def outputs(self) -> list[str]:
+        return [f"ATR_{self.period}"]
+
+    @property
+    def warmup(self) -> int:
+        return 1 + self.period
+
+    def align(self, last: Mapping[str, float | None]) -> None:
+        self.smoothing.align({self.smoothing.outputs[0]: last[self.outputs[0]]})
+
+    def update(self, high: float, low: float, close: float) -> float | None:
+        prev_close, self.prev_close = self.prev_close, close
+        if prev_close is None:
+            return None
+
+        true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        return self.smoothing.update(true_range)
+
+
+@dataclass
+class OBV(IncrementalIndicator):
+    """On Balance Volume, starting from the first bar's volume."""
+
+    inputs: ClassVar[tuple[str, ...]] = ("close", "volume")
+    batch_indicator: ClassVar[str | None] = "volume.obv"
+
+    prev_close: float | None = None
+    value: float = 0.0
+
+    @property
+    def outputs(self) -> list[str]:
+        return ["OBV"]
+
+    @property
+    def warmup(self) -> int:
+        return 1
+
+    def align(self, last: Mapping[str, float | None]) -> None:
+        # NOTE - the total depends on every bar, replaying only the last one restarts it
+        if last["OBV"] is not None:
+            self.value = last["OBV"]
+
+    def update(self, close: float, volume: float) -> float:
+        if self.prev_close is None or close > self.prev_close:
+            self.value += volume
+        elif close < self.prev_close:
+            self.value -= volume
+        self.prev_close = close
+        return self.value
@@ -3,17 +3,16 @@ from dataclasses import dataclass
 import polars as pl
 import talib
 
+from . import expressions
+from ._base import TAAccessor
 
-@dataclass
-class MomentumAccessor:
-    df: pl.LazyFrame
 
+@dataclass
+class MomentumAccessor(TAAccessor):
     def rsi(self, period: int = 14, col: str = "close") -> pl.LazyFrame:
         """Relative Strength Index."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        rsi = talib.RSI(close, timeperiod=period)
-        return self.df.with_columns(pl.Series(f"RSI_{period}", rsi))
+        return self._native({f"RSI_{period}": expressions.rsi(pl.col(col), period)})
 
     def stoch_rsi(
         self,
@@ -25,18 +24,15 @@ class MomentumAccessor:
     ) -> pl.LazyFrame:
         """Stochastic RSI fast %K and %D."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        fastk, fastd = talib.STOCHRSI(
-            close,
+        return self._talib(
+            talib.STOCHRSI,
+            [col],
+            [f"StochRSI_fastk_{timeperiod}", f"StochRSI_fastd_{timeperiod}"],
             timeperiod=timeperiod,
             fastk_period=fastk_period,
             fastd_period=fastd_period,
             fastd_matype=fastd_matype,
         )
-        return self.df.with_columns([
-            pl.Series(f"StochRSI_fastk_{timeperiod}", fastk),
-            pl.Series(f"StochRSI_fastd_{timeperiod}", fastd),
-        ])
 
     def stochastic(
         self,
@@ -48,133 +44,107 @@ class MomentumAccessor:
     ) -> pl.LazyFrame:
         """Stochastic Oscillator %K and %D."""
 
-        highs, lows, closes = (
-            self.df.select(["high", "low", "close"]).collect().get_columns()
-        )
-        slowk, slowd = talib.STOCH(
-            highs.to_numpy(),
-            lows.to_numpy(),
-            closes.to_numpy(),
+        return self._talib(
+            talib.STOCH,
+            ["high", "low", "close"],
+            ["STOCH_slowk", "STOCH_slowd"],
             fastk_period=fastk_period,
             slowk_period=slowk_period,
             slowk_matype=slowk_matype,
             slowd_period=slowd_period,
             slowd_matype=slowd_matype,
         )
-        return self.df.with_columns([
-            pl.Series("STOCH_slowk", slowk),
-            pl.Series("STOCH_slowd", slowd),
-        ])
 
     def cci(self, period: int = 14) -> pl.LazyFrame:
         """Commodity Channel Index."""
 
-        highs, lows, closes = (
-            self.df.select(["high", "low", "close"]).collect().get_columns()
+        return self._talib(
+            talib.CCI, ["high", "low", "close"], [f"CCI_{period}"], timeperiod=period
         )
-        cci = talib.CCI(
-            highs.to_numpy(), lows.to_numpy(), closes.to_numpy(), timeperiod=period
-        )
-        return self.df.with_columns(pl.Series(f"CCI_{period}", cci))
 
     def roc(self, period: int = 10, col: str = "close") -> pl.LazyFrame:
         """Rate of Change."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        roc = talib.ROC(close, timeperiod=period)
-        return self.df.with_columns(pl.Series(f"ROC_{period}", roc))
+        return self._native({f"ROC_{period}": expressions.roc(pl.col(col), period)})
 
     def momentum(self, period: int = 10, col: str = "close") -> pl.LazyFrame:
         """Momentum indicator (MOM)."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        mom = talib.MOM(close, timeperiod=period)
-        return self.df.with_columns(pl.Series(f"MOM_{period}", mom))
+        return self._native({f"MOM_{period}": expressions.mom(pl.col(col), period)})
 
     def williams_r(self, period: int = 14) -> pl.LazyFrame:
         """Williams %R."""
 
-        highs, lows, closes = (
-            self.df.select(["high", "low", "close"]).collect().get_columns()
-        )
-        willr = talib.WILLR(
-            highs.to_numpy(), lows.to_numpy(), closes.to_numpy(), timeperiod=period
-        )
-        return self.df.with_columns(pl.Series(f"WILLR_{period}", willr))
+        return self._native({
+            f"WILLR_{period}": expressions.willr(
+                pl.col("high"), pl.col("low"), pl.col("close"), period
+            )
+        })
 
     def trix(self, period: int = 30, col: str = "close") -> pl.LazyFrame:
         """Triple Exponential Average (TRIX)."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        trix = talib.TRIX(close, timeperiod=period)
-        return self.df.with_columns(pl.Series(f"TRIX_{period}", trix))
+        return self._native({f"TRIX_{period}": expressions.trix(pl.col(col), period)})
 
     def adx(self, period: int = 14) -> pl.LazyFrame:
         """Average Directional Movement Index."""
 
-        highs, lows, closes = (
-            self.df.select(["high", "low", "close"]).collect().get_columns()
+        return self._talib(
+            talib.ADX, ["high", "low", "close"], [f"ADX_{period}"], timeperiod=period
         )
-        adx = talib.ADX(highs.to_numpy(), lows.to_numpy(), closes.to_numpy(), timeperiod=period)
-        return self.df.with_columns(pl.Series(f"ADX_{period}", adx))
 
     def adxr(self, period: int = 14) -> pl.LazyFrame:
         """Average Directional Movement Index Rating."""
 
-        highs, lows, closes = (
-            self.df.select(["high", "low", "close"]).collect().get_columns()
+        return self._talib(
+            talib.ADXR, ["high", "low", "close"], [f"ADXR_{period}"], timeperiod=period
         )
-        adxr = talib.ADXR(highs.to_numpy(), lows.to_numpy(), closes.to_numpy(), timeperiod=period)
-        return self.df.with_columns(pl.Series(f"ADXR_{period}", adxr))
 
     def apo(self, fastperiod: int = 12, slowperiod: int = 26, matype: int = 0, col: str = "close") -> pl.LazyFrame:
         """Absolute Price Oscillator."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        apo = talib.APO(close, fastperiod=fastperiod, slowperiod=slowperiod, matype=matype)
-        return self.df.with_columns(pl.Series(f"APO_{fastperiod}_{slowperiod}", apo))
+        return self._talib(
+            talib.APO,
+            [col],
+            [f"APO_{fastperiod}_{slowperiod}"],
+            fastperiod=fastperiod,
+            slowperiod=slowperiod,
+            matype=matype,
+        )
 
     def aroon(self, period: int = 14) -> pl.LazyFrame:
         """Aroon up and down."""
 
-        highs, lows = self.df.select(["high", "low"]).collect().get_columns()
-        aroondown, aroonup = talib.AROON(highs.to_numpy(), lows.to_numpy(), timeperiod=period)
-        return self.df.with_columns([
-            pl.Series(f"AROON_down_{period}", aroondown),
-            pl.Series(f"AROON_up_{period}", aroonup),
-        ])
+        return self._talib(
+            talib.AROON,
+            ["high", "low"],
+            [f"AROON_down_{period}", f"AROON_up_{period}"],
+            timeperiod=period,
+        )
 
     def aroonosc(self, period: int = 14) -> pl.LazyFrame:
         """Aroon Oscillator."""
 
-        highs, lows = self.df.select(["high", "low"]).collect().get_columns()
-        osc = talib.AROONOSC(highs.to_numpy(), lows.to_numpy(), timeperiod=period)
-        return self.df.with_columns(pl.Series(f"AROONOSC_{period}", osc))
+        return self._talib(
+            talib.AROONOSC, ["high", "low"], [f"AROONOSC_{period}"], timeperiod=period
+        )
 
     def bop(self) -> pl.LazyFrame:
         """Balance of Power."""
 
-        opens, highs, lows, closes = (
-            self.df.select(["open", "high", "low", "close"]).collect().get_columns()
-        )
-        bop = talib.BOP(opens.to_numpy(), highs.to_numpy(), lows.to_numpy(), closes.to_numpy())
-        return self.df.with_columns(pl.Series("BOP", bop))
+        return self._talib(talib.BOP, ["open", "high", "low", "close"], ["BOP"])
 
     def cmo(self, period: int = 14, col: str = "close") -> pl.LazyFrame:
         """Chande Momentum Oscillator."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        cmo = talib.CMO(close, timeperiod=period)
-        return self.df.with_columns(pl.Series(f"CMO_{period}", cmo))
+        return self._native({f"CMO_{period}": expressions.cmo(pl.col(col), period)})
 
     def dx(self, period: int = 14) -> pl.LazyFrame:
         """Directional Movement Index."""
 
-        highs, lows, closes = (
-            self.df.select(["high", "low", "close"]).collect().get_columns()
+        return self._talib(
+            talib.DX, ["high", "low", "close"], [f"DX_{period}"], timeperiod=period
         )
-        dx = talib.DX(highs.to_numpy(), lows.to_numpy(), closes.to_numpy(), timeperiod=period)
-        return self.df.with_columns(pl.Series(f"DX_{period}", dx))
 
     def macd(
         self,
@@ -185,18 +155,14 @@ class MomentumAccessor:
     ) -> pl.LazyFrame:
         """MACD line, signal, and histogram."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        macd, macdsignal, macdhist = talib.MACD(
-            close,
+        return self._talib(
+            talib.MACD,
+            [col],
+            ["MACD", "MACD_signal", "MACD_hist"],
             fastperiod=fastperiod,
             slowperiod=slowperiod,
             signalperiod=signalperiod,
         )
-        return self.df.with_columns([
-            pl.Series("MACD", macd),
-            pl.Series("MACD_signal", macdsignal),
-            pl.Series("MACD_hist", macdhist),
-        ])
 
     def macdext(
         self,
@@ -210,9 +176,10 @@ class MomentumAccessor:
     ) -> pl.LazyFrame:
         """MACD with configurable MA types."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        macd, macdsignal, macdhist = talib.MACDEXT(
-            close,
+        return self._talib(
+            talib.MACDEXT,
+            [col],
+            ["MACDEXT", "MACDEXT_signal", "MACDEXT_hist"],
             fastperiod=fastperiod,
             fastmatype=fastmatype,
             slowperiod=slowperiod,
@@ -220,91 +187,89 @@ class MomentumAccessor:
             signalperiod=signalperiod,
             signalmatype=signalmatype,
         )
-        return self.df.with_columns([
-            pl.Series("MACDEXT", macd),
-            pl.Series("MACDEXT_signal", macdsignal),
-            pl.Series("MACDEXT_hist", macdhist),
-        ])
 
     def macdfix(self, signalperiod: int = 9, col: str = "close") -> pl.LazyFrame:
         """MACD Fix 12/26 with variable signal period."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        macd, macdsignal, macdhist = talib.MACDFIX(close, signalperiod=signalperiod)
-        return self.df.with_columns([
-            pl.Series("MACDFIX", macd),
-            pl.Series("MACDFIX_signal", macdsignal),
-            pl.Series("MACDFIX_hist", macdhist),
-        ])
+        return self._talib(
+            talib.MACDFIX,
+            [col],
+            ["MACDFIX", "MACDFIX_signal", "MACDFIX_hist"],
+            signalperiod=signalperiod,
+        )
 
     def mfi(self, period: int = 14) -> pl.LazyFrame:
         """Money Flow Index."""
 
-        highs, lows, closes, volumes = (
-            self.df.select(["high", "low", "close", "volume"]).collect().get_columns()
+        return self._talib(
+            talib.MFI,
+            ["high", "low", "close", "volume"],
+            [f"MFI_{period}"],
+            timeperiod=period,
         )
-        mfi = talib.MFI(highs.to_numpy(), lows.to_numpy(), closes.to_numpy(), volumes.to_numpy(), timeperiod=period)
-        return self.df.with_columns(pl.Series(f"MFI_{period}", mfi))
 
     def minus_di(self, period: int = 14) -> pl.LazyFrame:
         """Minus Directional Indicator."""
 
-        highs, lows, closes = (
-            self.df.select(["high", "low", "close"]).collect().get_columns()
+        return self._talib(
+            talib.MINUS_DI,
+            ["high", "low", "close"],
+            [f"MINUS_DI_{period}"],
+            timeperiod=period,
         )
-        mdi = talib.MINUS_DI(highs.to_numpy(), lows.to_numpy(), closes.to_numpy(), timeperiod=period)
-        return self.df.with_columns(pl.Series(f"MINUS_DI_{period}", mdi))
 
     def minus_dm(self, period: int = 14) -> pl.LazyFrame:
         """Minus Directional Movement."""
 
-        highs, lows = self.df.select(["high", "low"]).collect().get_columns()
-        mdm = talib.MINUS_DM(highs.to_numpy(), lows.to_numpy(), timeperiod=period)
-        return self.df.with_columns(pl.Series(f"MINUS_DM_{period}", mdm))
+        return self._talib(
+            talib.MINUS_DM, ["high", "low"], [f"MINUS_DM_{period}"], timeperiod=period
+        )
 
     def plus_di(self, period: int = 14) -> pl.LazyFrame:
         """Plus Directional Indicator."""
 
-        highs, lows, closes = (
-            self.df.select(["high", "low", "close"]).collect().get_columns()
+        return self._talib(
+            talib.PLUS_DI,
+            ["high", "low", "close"],
+            [f"PLUS_DI_{period}"],
+            timeperiod=period,
         )
-        pdi = talib.PLUS_DI(highs.to_numpy(), lows.to_numpy(), closes.to_numpy(), timeperiod=period)
-        return self.df.with_columns(pl.Series(f"PLUS_DI_{period}", pdi))
 
     def plus_dm(self, period: int = 14) -> pl.LazyFrame:
         """Plus Directional Movement."""
 
-        highs, lows = self.df.select(["high", "low"]).collect().get_columns()
-        pdm = talib.PLUS_DM(highs.to_numpy(), lows.to_numpy(), timeperiod=period)
-        return self.df.with_columns(pl.Series(f"PLUS_DM_{period}", pdm))
+        return self._talib(
+            talib.PLUS_DM, ["high", "low"], [f"PLUS_DM_{period}"], timeperiod=period
+        )
 
     def ppo(self, fastperiod: int = 12, slowperiod: int = 26, matype: int = 0, col: str = "close") -> pl.LazyFrame:
         """Percentage Price Oscillator."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        ppo = talib.PPO(close, fastperiod=fastperiod, slowperiod=slowperiod, matype=matype)
-        return self.df.with_columns(pl.Series(f"PPO_{fastperiod}_{slowperiod}", ppo))
+        return self._talib(
+            talib.PPO,
+            [col],
+            [f"PPO_{fastperiod}_{slowperiod}"],
+            fastperiod=fastperiod,
+            slowperiod=slowperiod,
+            matype=matype,
+        )
 
     def rocp(self, period: int = 10, col: str = "close") -> pl.LazyFrame:
         """Rate of Change Percentage."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        rocp = talib.ROCP(close, timeperiod=period)
-        return self.df.with_columns(pl.Series(f"ROCP_{period}", rocp))
+        return self._native({f"ROCP_{period}": expressions.rocp(pl.col(col), period)})
 
     def rocr(self, period: int = 10, col: str = "close") -> pl.LazyFrame:
         """Rate of Change Ratio."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        rocr = talib.ROCR(close, timeperiod=period)
-        return self.df.with_columns(pl.Series(f"ROCR_{period}", rocr))
+        return self._native({f"ROCR_{period}": expressions.rocr(pl.col(col), period)})
 
     def rocr100(self, period: int = 10, col: str = "close") -> pl.LazyFrame:
         """Rate of Change Ratio scaled to 100."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        rocr100 = talib.ROCR100(close, timeperiod=period)
-        return self.df.with_columns(pl.Series(f"ROCR100_{period}", rocr100))
+        return self._native({
+            f"ROCR100_{period}": expressions.rocr(pl.col(col), period) * 100
+        })
 
     def stochf(
         self,
@@ -314,21 +279,14 @@ class MomentumAccessor:
     ) -> pl.LazyFrame:
         """Stochastic Fast %K and %D."""
 
-        highs, lows, closes = (
-            self.df.select(["high", "low", "close"]).collect().get_columns()
-        )
-        fastk, fastd = talib.STOCHF(
-            highs.to_numpy(),
-            lows.to_numpy(),
-            closes.to_numpy(),
+        return self._talib(
+            talib.STOCHF,
+            ["high", "low", "close"],
+            ["STOCHF_fastk", "STOCHF_fastd"],
             fastk_period=fastk_period,
             fastd_period=fastd_period,
             fastd_matype=fastd_matype,
         )
-        return self.df.with_columns([
-            pl.Series("STOCHF_fastk", fastk),
-            pl.Series("STOCHF_fastd", fastd),
-        ])
 
     def ultosc(
         self,
@@ -338,15 +296,11 @@ class MomentumAccessor:
     ) -> pl.LazyFrame:
         """Ultimate Oscillator."""
 
-        highs, lows, closes = (
-            self.df.select(["high", "low", "close"]).collect().get_columns()
-        )
-        ult = talib.ULTOSC(
-            highs.to_numpy(),
-            lows.to_numpy(),
-            closes.to_numpy(),
+        return self._talib(
+            talib.ULTOSC,
+            ["high", "low", "close"],
+            ["ULTOSC"],
             timeperiod1=timeperiod1,
             timeperiod2=timeperiod2,
             timeperiod3=timeperiod3,
         )
-        return self.df.with_columns(pl.Series("ULTOSC", ult))
@@ -3,11 +3,12 @@ from dataclasses import dataclass
 import polars as pl
 import talib
 
+from . import expressions
+from ._base import TAAccessor
 
-@dataclass
-class OverlapStudyAccessor:
-    df: pl.LazyFrame
 
+@dataclass
+class OverlapStudyAccessor(TAAccessor):
     def bbands(
         self,
         period: int = 20,
@@ -18,54 +19,55 @@ class OverlapStudyAccessor:
     ) -> pl.LazyFrame:
         """Bollinger Bands upper/middle/lower."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        upper, middle, lower = talib.BBANDS(
-            close,
+        names = [
+            f"BBANDS_upper_{period}",
+            f"BBANDS_middle_{period}",
+            f"BBANDS_lower_{period}",
+        ]
+        if matype == 0:
+            bands = expressions.bbands(pl.col(col), period, nbdevup, nbdevdn)
+            return self._native(dict(zip(names, bands)))
+
+        return self._talib(
+            talib.BBANDS,
+            [col],
+            names,
             timeperiod=period,
             nbdevup=nbdevup,
             nbdevdn=nbdevdn,
             matype=matype,
         )
-        return self.df.with_columns([
-            pl.Series(f"BBANDS_upper_{period}", upper),
-            pl.Series(f"BBANDS_middle_{period}", middle),
-            pl.Series(f"BBANDS_lower_{period}", lower),
-        ])
 
     def dema(self, period: int = 30, col: str = "close") -> pl.LazyFrame:
         """Double Exponential Moving Average."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        dema = talib.DEMA(close, timeperiod=period)
-        return self.df.with_columns(pl.Series(f"DEMA_{period}", dema))
+        return self._native({f"DEMA_{period}": expressions.dema(pl.col(col), period)})
 
     def ema(self, period: int = 30, col: str = "close") -> pl.LazyFrame:
         """Exponential Moving Average."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        ema = talib.EMA(close, timeperiod=period)
-        return self.df.with_columns(pl.Series(f"EMA_{period}", ema))
+        return self._native({f"EMA_{period}": expressions.ema(pl.col(col), period)})
 
     def ht_trendline(self, col: str = "close") -> pl.LazyFrame:
         """Hilbert Transform - Instantaneous Trendline."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        trendline = talib.HT_TRENDLINE(close)
-        return self.df.with_columns(pl.Series("HT_TRENDLINE", trendline))
+        return self._talib(talib.HT_TRENDLINE, [col], ["HT_TRENDLINE"])
 
     def kama(self, period: int = 30, col: str = "close") -> pl.LazyFrame:
         """Kaufman Adaptive Moving Average."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        kama = talib.KAMA(close, timeperiod=period)
-        return self.df.with_columns(pl.Series(f"KAMA_{period}", kama))
+        return self._talib(talib.KAMA, [col], [f"KAMA_{period}"], timeperiod=period)
 
     def ma(self, period: int = 30, matype: int = 0, col: str = "close") -> pl.LazyFrame:
         """Generic Moving Average with type."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        ma = talib.MA(close, timeperiod=period, matype=matype)
-        return self.df.with_columns(pl.Series(f"MA_{period}_{matype}", ma))
+        return self._talib(
+            talib.MA,
+            [col],
+            [f"MA_{period}_{matype}"],
+            timeperiod=period,
+            matype=matype,
+        )
 
     def mama(
         self,
@@ -75,12 +77,13 @@ class OverlapStudyAccessor:
     ) -> pl.LazyFrame:
         """MESA Adaptive Moving Average."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        mama, fama = talib.MAMA(close, fastlimit=fastlimit, slowlimit=slowlimit)
-        return self.df.with_columns([
-            pl.Series("MAMA", mama),
-            pl.Series("FAMA", fama),
-        ])
+        return self._talib(
+            talib.MAMA,
+            [col],
+            ["MAMA", "FAMA"],
+            fastlimit=fastlimit,
+            slowlimit=slowlimit,
+        )
 
     def mavp(
         self,
@@ -95,41 +98,41 @@ class OverlapStudyAccessor:
         if period_col not in self.df.collect_schema().names():
             raise ValueError(f"period_col '{period_col}' not found in frame")
 
-        close, periods = self.df.select([col, period_col]).collect().get_columns()
-        mavp = talib.MAVP(
-            close.to_numpy(),
-            periods.to_numpy(),
+        return self._talib(
+            talib.MAVP,
+            [col, period_col],
+            [f"MAVP_{minperiod}_{maxperiod}"],
             minperiod=minperiod,
             maxperiod=maxperiod,
             matype=matype,
         )
-        return self.df.with_columns(pl.Series(f"MAVP_{minperiod}_{maxperiod}", mavp))
 
     def midpoint(self, period: int = 14, col: str = "close") -> pl.LazyFrame:
         """MidPoint over period."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        midpoint = talib.MIDPOINT(close, timeperiod=period)
-        return self.df.with_columns(pl.Series(f"MIDPOINT_{period}", midpoint))
+        return self._native({
+            f"MIDPOINT_{period}": expressions.midpoint(pl.col(col), period)
+        })
 
     def midprice(self, period: int = 14) -> pl.LazyFrame:
         """Midpoint Price over period."""
 
-        highs, lows = self.df.select(["high", "low"]).collect().get_columns()
-        midprice = talib.MIDPRICE(highs.to_numpy(), lows.to_numpy(), timeperiod=period)
-        return self.df.with_columns(pl.Series(f"MIDPRICE_{period}", midprice))
+        return self._native({
+            f"MIDPRICE_{period}": expressions.midprice(
+                pl.col("high"), pl.col("low"), period
+            )
+        })
 
     def sar(self, acceleration: float = 0.02, maximum: float = 0.2) -> pl.LazyFrame:
         """Parabolic SAR."""
 
-        highs, lows = self.df.select(["high", "low"]).collect().get_columns()
-        sar = talib.SAR(
-            highs.to_numpy(),
-            lows.to_numpy(),
+        return self._talib(
+            talib.SAR,
+            ["high", "low"],
+            ["SAR"],
             acceleration=acceleration,
             maximum=maximum,
         )
-        return self.df.with_columns(pl.Series("SAR", sar))
 
     def sarext(
         self,
@@ -144,10 +147,10 @@ class OverlapStudyAccessor:
     ) -> pl.LazyFrame:
         """Extended Parabolic SAR."""
 
-        highs, lows = self.df.select(["high", "low"]).collect().get_columns()
-        sarext = talib.SAREXT(
-            highs.to_numpy(),
-            lows.to_numpy(),
+        return self._talib(
+            talib.SAREXT,
+            ["high", "low"],
+            ["SAREXT"],
             startvalue=startvalue,
             offsetonreverse=offsetonreverse,
             accelerationinitlong=accelerationinitlong,
@@ -157,42 +160,37 @@ class OverlapStudyAccessor:
             accelerationshort=accelerationshort,
             accelerationmaxshort=accelerationmaxshort,
         )
-        return self.df.with_columns(pl.Series("SAREXT", sarext))
 
     def sma(self, period: int = 30, col: str = "close") -> pl.LazyFrame:
         """Simple Moving Average."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        sma = talib.SMA(close, timeperiod=period)
-        return self.df.with_columns(pl.Series(f"SMA_{period}", sma))
+        return self._native({f"SMA_{period}": expressions.sma(pl.col(col), period)})
 
     def t3(
         self, period: int = 5, vfactor: float = 0.7, col: str = "close"
     ) -> pl.LazyFrame:
         """Triple Exponential Moving Average (T3)."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        t3 = talib.T3(close, timeperiod=period, vfactor=vfactor)
         suffix = f"{vfactor}".replace(".", "_")
-        return self.df.with_columns(pl.Series(f"T3_{period}_{suffix}", t3))
+        return self._talib(
+            talib.T3,
+            [col],
+            [f"T3_{period}_{suffix}"],
+            timeperiod=period,
+            vfactor=vfactor,
+        )
 
     def tema(self, period: int = 30, col: str = "close") -> pl.LazyFrame:
         """Triple Exponential Moving Average."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        tema = talib.TEMA(close, timeperiod=period)
-        return self.df.with_columns(pl.Series(f"TEMA_{period}", tema))
+        return self._native({f"TEMA_{period}": expressions.tema(pl.col(col), period)})
 
     def trima(self, period: int = 30, col: str = "close") -> pl.LazyFrame:
         """Triangular Moving Average."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        trima = talib.TRIMA(close, timeperiod=period)
-        return self.df.with_columns(pl.Series(f"TRIMA_{period}", trima))
+        return self._talib(talib.TRIMA, [col], [f"TRIMA_{period}"], timeperiod=period)
 
     def wma(self, period: int = 30, col: str = "close") -> pl.LazyFrame:
         """Weighted Moving Average."""
 
-        close = self.df.select(col).collect().to_series().to_numpy()
-        wma = talib.WMA(close, timeperiod=period)
-        return self.df.with_columns(pl.Series(f"WMA_{period}", wma))
+        return self._talib(talib.WMA, [col], [f"WMA_{period}"], timeperiod=period)
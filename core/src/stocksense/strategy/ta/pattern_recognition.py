@@ -1,25 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import ClassVar
 
+import numpy as np
 import polars as pl
 import talib
 
+from ._base import TAAccessor
+
+# NOTE - every TA-Lib candlestick pattern function, e.g. `CDLDOJI`
+PATTERNS: list[str] = talib.get_function_groups()["Pattern Recognition"]
+
 
 @dataclass
-class PatternRecognitionAccessor:
-    df: pl.LazyFrame
+class PatternRecognitionAccessor(TAAccessor):
+    non_indicators: ClassVar[frozenset[str]] = frozenset({"scan", "scan_all"})
 
     def _apply_pattern(self, func, name: str, **kwargs) -> pl.LazyFrame:
-        opens, highs, lows, closes = (
-            self.df.select(["open", "high", "low", "close"]).collect().get_columns()
+        return self._talib(
+            func, ["open", "high", "low", "close"], [name], dtype=pl.Int32, **kwargs
         )
-        values = func(
-            opens.to_numpy(),
-            highs.to_numpy(),
-            lows.to_numpy(),
-            closes.to_numpy(),
-            **kwargs,
+
+    def scan(
+        self,
+        patterns: list[str] | None = None,
+        packed: bool = False,
+        max_workers: int | None = None,
+    ) -> pl.DataFrame:
+        """
+        Detect many candlestick patterns at once, e.g. to screen a whole exchange.
+
+        OHLC is collected & converted to numpy once, then every pattern function runs on a thread
+        pool (TA-Lib releases the GIL) over each `by` group's slice of the arrays. Unlike the
+        per pattern methods this computes right away.
+
+        Parameters
+        ----------
+        patterns : list[str] | None, optional
+            TA-Lib pattern names (`CDLDOJI` or `cdldoji`, duplicates are scanned once), by
+            default all of `PATTERNS`
+        packed : bool, optional
+            Return one row per input row with bit-packed `CDL_bullish` & `CDL_bearish` UInt64
+            columns, bit `i` set when `patterns[i]` signals, instead of the hits, by default False
+        max_workers : int | None, optional
+            Threads to run pattern functions on, by default `ThreadPoolExecutor`'s default
+
+        Returns
+        -------
+        pl.DataFrame
+            Pattern hits as a long frame of `by` & `date` (or `index` without them), `pattern`
+            (Enum) & its TA-Lib `signal` (+/-100, +/-200 for confirmed), only rows where a pattern
+            signals. With `packed`, `by` & `date` (or `index`) & the bit columns.
+
+        Raises
+        ------
+        ValueError
+            When a pattern is unknown
+        """
+        # NOTE - deduplicated in order, `pattern` Enum categories must be unique
+        patterns = (
+            list(dict.fromkeys(p.upper() for p in patterns)) if patterns else PATTERNS
         )
-        return self.df.with_columns(pl.Series(name, values))
+        unknown = set(patterns).difference(PATTERNS)
+        if unknown:
+            raise ValueError(f"Unknown candlestick patterns {sorted(unknown)}")
+
+        schema = self.df.collect_schema()
+        keys = [col for col in (self.by, "date") if col is not None and col in schema]
+        data = self.df.select(*keys, "open", "high", "low", "close").collect()
+        if not keys:
+            keys = ["index"]
+            data = data.with_row_index()
+        ohlc = [
+            np.ascontiguousarray(data.get_column(col).to_numpy(), dtype=np.float64)
+            for col in ("open", "high", "low", "close")
+        ]
+
+        # NOTE - groups are contiguous (frame is sorted by `by`), so each one is an array slice
+        if self.by is not None:
+            runs = data.get_column(self.by).rle().struct.field("len")
+            ends = np.cumsum(runs.to_numpy())
+        else:
+            ends = np.array([data.height])
+        slices = [slice(start, end) for start, end in zip([0, *ends[:-1]], ends)]
+
+        def detect(name: str) -> np.ndarray:
+            func = getattr(talib, name)
+            signal = np.empty(data.height, dtype=np.int32)
+            for s in slices:
+                signal[s] = func(*(values[s] for values in ohlc))
+            return signal
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            signals = list(executor.map(detect, patterns))
+
+        if packed:
+            bullish = np.zeros(data.height, dtype=np.uint64)
+            bearish = np.zeros(data.height, dtype=np.uint64)
+            for bit, signal in enumerate(signals):
+                bullish |= (signal > 0).astype(np.uint64) << np.uint64(bit)
+                bearish |= (signal < 0).astype(np.uint64) << np.uint64(bit)
+            return data.select(keys).with_columns(
+                CDL_bullish=pl.Series(bullish), CDL_bearish=pl.Series(bearish)
+            )
+
+        pattern_dtype = pl.Enum(patterns)
+        hits = []
+        for name, signal in zip(patterns, signals):
+            index = np.flatnonzero(signal)
+            hits.append(
+                data.select(keys)[index].with_columns(
+                    pattern=pl.lit(name, dtype=pattern_dtype),
+                    signal=pl.Series(signal[index], dtype=pl.Int32),
+                )
+            )
+        return pl.concat(hits).sort(keys, maintain_order=True)
+
+    def scan_all(
+        self, packed: bool = False, max_workers: int | None = None
+    ) -> pl.DataFrame:
+        """Detect all candlestick patterns, see `scan`."""
+
+        return self.scan(packed=packed, max_workers=max_workers)
 
     def cdl2crows(self) -> pl.LazyFrame:
         """Two Crows."""
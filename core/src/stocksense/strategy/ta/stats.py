@@ -1,6 +1,104 @@
+from dataclasses import dataclass
+from typing import ClassVar
+
 import polars as pl
 
+from . import expressions
+from ._base import TAAccessor
+
+
+@dataclass
+class StatsAccessor(TAAccessor):
+    # NOTE - cross-sectional stats compare tickers on the same date, so they can not be computed
+    # per `by` group like the rest & are attached right away
+    non_indicators: ClassVar[frozenset[str]] = frozenset({"cross_rank", "cross_zscore"})
+
+    def log_return(self, period: int = 1, col: str = "close") -> pl.LazyFrame:
+        """Log return over `period` bars."""
+
+        return self._native({
+            f"LOGRET_{period}": expressions.log_return(pl.col(col), period)
+        })
+
+    def zscore(self, period: int = 20, col: str = "close") -> pl.LazyFrame:
+        """Rolling z-score."""
+
+        return self._native({
+            f"ZSCORE_{period}": expressions.zscore(pl.col(col), period)
+        })
+
+    def correl(
+        self, benchmark: str, period: int = 30, col: str = "close"
+    ) -> pl.LazyFrame:
+        """Rolling Pearson correlation against a `benchmark` (e.g. index) column."""
+
+        return self._native({
+            f"CORREL_{period}": expressions.correl(
+                pl.col(col), pl.col(benchmark), period
+            )
+        })
+
+    def beta(self, benchmark: str, period: int = 5, col: str = "close") -> pl.LazyFrame:
+        """Rolling beta against a `benchmark` (e.g. index) column, on simple returns."""
+
+        return self._native({
+            f"BETA_{period}": expressions.beta(pl.col(col), pl.col(benchmark), period)
+        })
+
+    def linearreg_slope(self, period: int = 14, col: str = "close") -> pl.LazyFrame:
+        """Rolling Linear Regression slope."""
+
+        return self._native({
+            f"LINEARREG_SLOPE_{period}": expressions.linearreg_slope(
+                pl.col(col), period
+            )
+        })
+
+    def realized_volatility(
+        self, period: int = 20, periods_per_year: int = 252, col: str = "close"
+    ) -> pl.LazyFrame:
+        """Annualized rolling volatility of log returns."""
+
+        return self._native({
+            f"RVOL_{period}": expressions.realized_volatility(
+                pl.col(col), period, periods_per_year
+            )
+        })
+
+    def drawdown(self, col: str = "close") -> pl.LazyFrame:
+        """Drawdown from the running peak & the deepest drawdown so far."""
+
+        return self._native({
+            "DRAWDOWN": expressions.drawdown(pl.col(col)),
+            "MAX_DRAWDOWN": expressions.max_drawdown(pl.col(col)),
+        })
+
+    def percent_rank(self, period: int = 252, col: str = "close") -> pl.LazyFrame:
+        """Rolling percentile rank (0 - 100) of the latest value."""
+
+        return self._native({
+            f"PCTRANK_{period}": expressions.percent_rank(pl.col(col), period)
+        })
+
+    def cross_rank(self, col: str, on: str = "date") -> pl.LazyFrame:
+        """Percentile rank (0 - 100) of `col` among all rows sharing `on` (e.g. a date)."""
+
+        rank = pl.col(col).rank()
+        count = rank.count()
+        return self.df.with_columns(
+            pl
+            .when(count > 1)
+            .then((rank - 1) / (count - 1) * 100)
+            .over(on)
+            .alias(f"{col}_XRANK")
+        )
+
+    def cross_zscore(self, col: str, on: str = "date") -> pl.LazyFrame:
+        """Z-score of `col` among all rows sharing `on` (e.g. a date)."""
 
-class StatsAccessor:
-    def __init__(self, df: pl.DataFrame | pl.LazyFrame):
-        self._df = df
+        value = pl.col(col)
+        return self.df.with_columns(
+            ((value - value.mean()) / value.std(ddof=0))
+            .over(on)
+            .alias(f"{col}_XZSCORE")
+        )
@@ -1,40 +1,34 @@
 from dataclasses import dataclass
 
 import polars as pl
-import talib
 
+from . import expressions
+from ._base import TAAccessor
 
-@dataclass
-class VolatilityAccessor:
-    df: pl.LazyFrame
 
+@dataclass
+class VolatilityAccessor(TAAccessor):
     def atr(self, period: int = 14) -> pl.LazyFrame:
         """Average True Range."""
 
-        highs, lows, closes = (
-            self.df.select(["high", "low", "close"]).collect().get_columns()
-        )
-        atr = talib.ATR(
-            highs.to_numpy(), lows.to_numpy(), closes.to_numpy(), timeperiod=period
-        )
-        return self.df.with_columns(pl.Series(f"ATR_{period}", atr))
+        return self._native({
+            f"ATR_{period}": expressions.atr(
+                pl.col("high"), pl.col("low"), pl.col("close"), period
+            )
+        })
 
     def natr(self, period: int = 14) -> pl.LazyFrame:
         """Normalized Average True Range."""
 
-        highs, lows, closes = (
-            self.df.select(["high", "low", "close"]).collect().get_columns()
-        )
-        natr = talib.NATR(
-            highs.to_numpy(), lows.to_numpy(), closes.to_numpy(), timeperiod=period
-        )
-        return self.df.with_columns(pl.Series(f"NATR_{period}", natr))
+        return self._native({
+            f"NATR_{period}": expressions.natr(
+                pl.col("high"), pl.col("low"), pl.col("close"), period
+            )
+        })
 
     def trange(self) -> pl.LazyFrame:
         """True Range."""
 
-        highs, lows, closes = (
-            self.df.select(["high", "low", "close"]).collect().get_columns()
-        )
-        tr = talib.TRANGE(highs.to_numpy(), lows.to_numpy(), closes.to_numpy())
-        return self.df.with_columns(pl.Series("TRANGE", tr))
+        return self._native({
+            "TRANGE": expressions.trange(pl.col("high"), pl.col("low"), pl.col("close"))
+        })
@@ -1,13 +1,161 @@
 import logging
+from collections.abc import Sequence
 from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
 from typing import Self
 
 from sqlglot import exp, optimizer, parse_one
 from sqlglot.dialects.dialect import Dialects, DialectType
-from sqlglot.errors import ParseError
+from sqlglot.errors import ParseError, SqlglotError
+from sqlglot.optimizer.qualify import qualify
+from sqlglot.optimizer.scope import traverse_scope
 
 logger = logging.getLogger("stocksense")
 
+# NOTE - parsed queries shared by all validators, the agents validate the same query again &
+# again (retries, repeated questions)
+MAX_PARSED_QUERIES = 256
+
+# NOTE - functions whose result changes between runs of the same query on the same data
+VOLATILE_EXPRESSIONS = (
+    exp.CurrentDate,
+    exp.CurrentDatetime,
+    exp.CurrentTime,
+    exp.CurrentTimestamp,
+    exp.Localtimestamp,
+    exp.Rand,
+    exp.Randn,
+    exp.Uuid,
+)
+VOLATILE_FUNCTIONS = {
+    "now",
+    "get_current_timestamp",
+    "transaction_timestamp",
+    "current_localtimestamp",
+    "current_localtime",
+    "setseed",
+    "nextval",
+    "currval",
+}
+# NOTE - `'2024-01-01' <= date` is `date >= '2024-01-01'`
+_FLIPPED_COMPARISONS = {
+    exp.GT: exp.LT,
+    exp.GTE: exp.LTE,
+    exp.LT: exp.GT,
+    exp.LTE: exp.GTE,
+}
+
+
+@lru_cache(maxsize=MAX_PARSED_QUERIES)
+def _parse(query: str, dialect: DialectType) -> exp.Expression:
+    # NOTE - the AST is shared, it must only be read. sqlglot copies it before generating SQL or
+    # optimizing
+    return parse_one(query, dialect=dialect)
+
+
+@dataclass
+class ScanPushdown:
+    """
+    Parts of a SQL query which can be applied to the scan of the table it reads.
+
+    Every field is a superset of what the query needs, the query still applies its own filters.
+    `None` means nothing can be pushed down.
+
+    Attributes
+    ----------
+        columns : list[str] | None, optional
+            Table columns the query reads, empty if it reads none (e.g. `count(*)`)
+        tickers : list[str] | None, optional
+            Tickers the query is limited to
+        start : datetime | None, optional
+            Earliest date the query reads (inclusive)
+        end : datetime | None, optional
+            Latest date the query reads (inclusive)
+    """
+
+    columns: list[str] | None = None
+    tickers: list[str] | None = None
+    start: datetime | None = None
+    end: datetime | None = None
+
+
+def _is_column(node: exp.Expression, table: str, name: str) -> bool:
+    return (
+        isinstance(node, exp.Column)
+        and node.table == table
+        and node.name.lower() == name
+    )
+
+
+def _literal_datetime(node: exp.Expression) -> datetime | None:
+    # NOTE - `DATE '...'` & `TIMESTAMP '...'` are parsed as casts of a string literal
+    if isinstance(node, (exp.Cast, exp.TryCast)):
+        node = node.this
+    if not (isinstance(node, exp.Literal) and node.is_string):
+        return None
+    try:
+        value = datetime.fromisoformat(node.this)
+    except ValueError:
+        return None
+    # NOTE - `date` is stored timezone naive, an offset can't be compared with its partitions,
+    # file stats or naive literals of the same query, so it isn't pushed down
+    return value if value.tzinfo is None else None
+
+
+def _ticker_values(node: exp.Expression, table: str, ticker: str) -> set[str] | None:
+    """Tickers `node` is limited to, `None` if it does not limit them."""
+    node = node.unnest()
+    if isinstance(node, exp.Or):
+        values = [_ticker_values(child, table, ticker) for child in node.flatten()]
+        return None if None in values else set().union(*values)
+    if isinstance(node, exp.EQ):
+        for column, value in (
+            (node.this, node.expression),
+            (node.expression, node.this),
+        ):
+            if (
+                _is_column(column, table, ticker)
+                and isinstance(value, exp.Literal)
+                and value.is_string
+            ):
+                return {value.this}
+    if (
+        isinstance(node, exp.In)
+        and _is_column(node.this, table, ticker)
+        and node.expressions
+        and all(
+            isinstance(value, exp.Literal) and value.is_string
+            for value in node.expressions
+        )
+    ):
+        return {value.this for value in node.expressions}
+    return None
+
+
+def _date_range(
+    node: exp.Expression, table: str, date: str
+) -> tuple[datetime | None, datetime | None]:
+    """`(start, end)` dates `node` is limited to, both inclusive."""
+    node = node.unnest()
+    if isinstance(node, exp.Between) and _is_column(node.this, table, date):
+        return _literal_datetime(node.args["low"]), _literal_datetime(node.args["high"])
+    comparison = type(node)
+    if _is_column(node.expression, table, date):
+        column, value = node.expression, node.this
+        comparison = _FLIPPED_COMPARISONS.get(comparison, comparison)
+    else:
+        column, value = node.this, node.expression
+    if not _is_column(column, table, date) or comparison not in (
+        exp.EQ, exp.GT, exp.GTE, exp.LT, exp.LTE
+    ):  # fmt: skip
+        return None, None
+    value = _literal_datetime(value)
+    return (
+        value if comparison in (exp.EQ, exp.GT, exp.GTE) else None,
+        value if comparison in (exp.EQ, exp.LT, exp.LTE) else None,
+    )
+
 
 @dataclass
 class SQLQueryValidator:
@@ -16,34 +164,159 @@ class SQLQueryValidator:
     query: str
     dialect: DialectType = Dialects.DUCKDB
 
+    @property
+    def expression(self) -> exp.Expression:
+        """Parsed SQL query, parsed once & shared by all validations of the same query."""
+        return _parse(self.query.strip(), self.dialect)
+
     def run(self, optimize: bool = True) -> str:
         """Run the SQL query validations and return the original query if valid."""
         return (
-            optimizer.optimize(self.query, dialect=self.dialect).sql(
+            optimizer.optimize(self.expression, dialect=self.dialect).sql(
                 pretty=True, dialect=self.dialect
             )
             if optimize
             else self.query
         )
 
+    def normalize(self) -> str:
+        """Canonical form of the SQL query, same for queries differing only in formatting, comments,
+        keyword case or unquoted identifier case (e.g. to use as a cache key)."""
+        return self.expression.sql(dialect=self.dialect, normalize=True, comments=False)
+
+    def is_deterministic(self) -> bool:
+        """Whether the SQL query gives the same result on the same data every time it runs."""
+        return not any(
+            isinstance(node, VOLATILE_EXPRESSIONS)
+            or (
+                isinstance(node, exp.Anonymous)
+                and node.name.lower() in VOLATILE_FUNCTIONS
+            )
+            for node in self.expression.walk()
+        )
+
+    def scan_pushdown(
+        self,
+        columns: Sequence[str],
+        table_names: Sequence[str] = ("stockdb", "self"),
+        ticker_column: str = "ticker",
+        date_column: str = "date",
+    ) -> ScanPushdown:
+        """
+        Columns, tickers & date range the SQL query reads from its table, to apply to the scan.
+
+        Table readers (e.g. a DuckDB replacement scan of a polars `LazyFrame`) can't always push
+        the query's filters & projection down to the files. Applied to the scan instead, partitions
+        & files are skipped & unused columns are never read.
+
+        Columns are resolved with sqlglot's qualifier (expanding `*`). Ticker & date predicates
+        are taken from the `WHERE` of the `SELECT` reading the table, when they are `AND`-ed to
+        the rest of it & compare the bare column with literals.
+
+        Parameters
+        ----------
+        columns : Sequence[str]
+            Columns of the table
+        table_names : Sequence[str], optional
+            Names the query may refer the table with, by default ("stockdb", "self")
+        ticker_column : str, optional
+            Ticker column, by default "ticker"
+        date_column : str, optional
+            Date column, by default "date"
+
+        Returns
+        -------
+        ScanPushdown
+            What can be applied to the scan, nothing when the query can't be analysed
+        """
+        names = {name.lower(): name for name in columns}
+        table_names = {name.lower() for name in table_names}
+        try:
+            expression = qualify(
+                self.expression.copy(),
+                dialect=self.dialect,
+                schema={
+                    table: dict.fromkeys(columns, "UNKNOWN") for table in table_names
+                },
+                validate_qualify_columns=False,
+                quote_identifiers=False,
+            )
+            scans = [
+                (scope, alias)
+                for scope in traverse_scope(expression)
+                for alias, source in scope.sources.items()
+                if isinstance(source, exp.Table) and source.name.lower() in table_names
+            ]
+        except SqlglotError as e:
+            logger.debug(f"Query can't be analysed for pushdown: {e}")
+            return ScanPushdown()
+        if not scans:
+            return ScanPushdown()
+
+        pushdown = ScanPushdown()
+        aliases = {alias for _, alias in scans}
+        # NOTE - stars left unexpanded, DuckDB's `COLUMNS(...)` & whole row references (e.g.
+        # `SELECT t FROM stockdb t`) read columns which can't be listed
+        if not any(
+            (isinstance(node, exp.Star) and not isinstance(node.parent, exp.Count))
+            or isinstance(node, (exp.Columns, exp.TableColumn))
+            or (
+                isinstance(node, exp.Column)
+                and not node.table
+                and (node.name.lower() in names or node.name in aliases)
+            )
+            for node in expression.walk()
+        ):
+            used = {
+                node.name.lower()
+                for node in expression.find_all(exp.Column)
+                if node.table in aliases
+            }
+            pushdown.columns = [name for key, name in names.items() if key in used]
+
+        # NOTE - a table read more than once (e.g. a self join) needs the filters of every read
+        if len(scans) > 1:
+            return pushdown
+        scope, alias = scans[0]
+        where = scope.expression.args.get("where")
+        if where is None:
+            return pushdown
+        condition = where.this.unnest()
+        conjuncts = (
+            condition.flatten() if isinstance(condition, exp.And) else [condition]
+        )
+        tickers = None
+        for conjunct in conjuncts:
+            if (
+                ticker_column.lower() in names
+                and (values := _ticker_values(conjunct, alias, ticker_column.lower()))
+                is not None
+            ):
+                tickers = values if tickers is None else tickers & values
+            elif date_column.lower() in names:
+                start, end = _date_range(conjunct, alias, date_column.lower())
+                if start is not None:
+                    pushdown.start = max(start, pushdown.start or start)
+                if end is not None:
+                    pushdown.end = min(end, pushdown.end or end)
+        if tickers is not None:
+            pushdown.tickers = sorted(tickers)
+        return pushdown
+
     def verify_syntax(self) -> Self:
         """Method to verify the syntax of the SQL query."""
         try:
-            parse_one(self.query, dialect=self.dialect)
+            _ = self.expression  # parsing is the syntax check
             return self
         except ParseError as e:
-            # TODO - use logging instead of print
             logger.error(f"Invalid SQL syntax: {e}")
             raise e
 
     def verify_table_name(self, table_name: str = "stockdb") -> Self:
         """Method to verify if the SQL query contains the specified table name."""
         try:
-            # Parse the SQL query
-            expression = parse_one(self.query, dialect=self.dialect)
-
             # Find all 'exp.Table' nodes in the AST
-            table_expressions = expression.find_all(exp.Table)
+            table_expressions = self.expression.find_all(exp.Table)
 
             # Extract the table name
             table_names = {table.this.name for table in table_expressions}
@@ -65,11 +338,8 @@ class SQLQueryValidator:
         # where the resultant query will have a new calculated column then current logic won't work
 
         try:
-            # Parse the SQL query
-            expression = parse_one(self.query, dialect=self.dialect)
-
             # Find all 'exp.Column' nodes in the AST
-            column_expressions = expression.find_all(exp.Column)
+            column_expressions = self.expression.find_all(exp.Column)
 
             # Extract the column names
             column_names = {column.name for column in column_expressions}
@@ -1,9 +1,25 @@
+import io
 from pathlib import Path
 
 import polars as pl
 import pytest
-from duckdb import BinderException
-from stocksense.data import StockDataDB
+from duckdb import BinderException, CatalogException, PermissionException
+from polars.testing import assert_frame_equal
+from stocksense.data import (
+    DuckDBPool,
+    QueryLimitError,
+    QueryResultCache,
+    QueryTimeoutError,
+    ReadOnlyQueryError,
+    StockDataDB,
+    StockDataDBPool,
+    with_ticker_history_partitions,
+)
+from stocksense.data._db import (
+    TICKER_HISTORY_BUCKETS,
+    TICKER_HISTORY_PARTITION_COLUMNS,
+    ticker_bucket,
+)
 
 
 @pytest.fixture
@@ -56,3 +72,330 @@ def test_stock_data_db_polars_filter(nse_data_db: StockDataDB):
     )
     assert result.height == 7
     assert all(result["ticker"] == "INFY")
+
+
+def test_stock_data_db_pool(nse_data_db: StockDataDB):
+    pool = StockDataDBPool(nse_data_db.db_path.parent.parent)
+    handle = pool.get("nse", "ticker_history")
+
+    # same handle is reused across lookups & stays on the latest committed version
+    assert handle is pool.get("NSE", "ticker_history")
+    assert handle.version == nse_data_db.version
+    assert not handle.refresh()
+
+    pool.invalidate(exchange="nse")
+    assert handle is not pool.get("nse", "ticker_history")
+
+
+def test_ticker_bucket():
+    # bucket must be stable across processes since it decides the partition of every ticker
+    assert ticker_bucket("TCS") == ticker_bucket("TCS")
+    assert all(
+        0 <= ticker_bucket(t) < TICKER_HISTORY_BUCKETS
+        for t in ["TCS", "INFY", "RELIANCE", "MRF"]
+    )
+
+
+def test_stock_data_db_ticker_predicate(nse_data_db: StockDataDB):
+    result = (
+        nse_data_db
+        .polars_filter(nse_data_db.ticker_predicate(["TCS", "INFY"]))
+        .select(pl.col("ticker").unique())
+        .collect()
+    )
+    assert sorted(result.to_series().to_list()) == ["INFY", "TCS"]
+
+
+def test_stock_data_db_partitioned_reads(tmp_path: Path):
+    history = pl.DataFrame({
+        "date": pl.datetime_range(
+            pl.datetime(2023, 12, 30), pl.datetime(2024, 1, 2), "1d", eager=True
+        ),
+        "ticker": ["TCS", "INFY", "TCS", "INFY"],
+        "close": [1.0, 2.0, 3.0, 4.0],
+    })
+    with_ticker_history_partitions(history).write_delta(
+        tmp_path / "ticker_history",
+        delta_write_options={"partition_by": TICKER_HISTORY_PARTITION_COLUMNS},
+    )
+    db = StockDataDB(tmp_path / "ticker_history")
+
+    # partition columns prune the scan but never show up in what is read
+    columns = ["date", "ticker", "close"]
+    assert db.table_data.collect_schema().names() == columns
+    result = db.polars_filter(
+        db.ticker_predicate("TCS"), db.date_predicate(start=history.item(2, "date"))
+    ).collect()
+    assert result.columns == columns
+    assert result.get_column("close").to_list() == [3.0]
+    assert db.sql_filter("SELECT * FROM self").collect().columns == columns
+
+
+def test_stock_data_db_upsert(tmp_path: Path):
+    history = pl.DataFrame({
+        "date": pl.datetime_range(
+            pl.datetime(2024, 1, 1), pl.datetime(2024, 1, 5), "1d", eager=True
+        ),
+        "ticker": ["TCS"] * 5,
+        "close": [1.0] * 5,
+    })
+    history.write_delta(tmp_path)
+    db = StockDataDB(tmp_path)
+
+    # last 2 days overlap & are updated, new date & new ticker are appended
+    incoming = pl.concat([
+        history.tail(2).with_columns(close=pl.lit(2.0)),
+        history.tail(1).with_columns(
+            pl.col("date").dt.offset_by("1d"), close=pl.lit(3.0)
+        ),
+        history.head(1).with_columns(ticker=pl.lit("INFY")),
+    ])
+    result = db.upsert(incoming)
+
+    assert result["num_appended_rows"] == 2
+    assert result["num_target_rows_updated"] == 2
+    assert db.table_data.select(pl.len()).collect().item() == 7
+    assert (
+        db.polars_filter(pl.col("ticker") == "TCS")
+        .sort("date")
+        .select("close")
+        .collect()
+        .to_series()
+        .to_list()
+    ) == [1.0, 1.0, 1.0, 2.0, 2.0, 3.0]
+
+
+def test_duckdb_pool(tmp_path: Path):
+    history = pl.DataFrame({
+        "date": pl.datetime_range(
+            pl.datetime(2024, 1, 1), pl.datetime(2024, 1, 10), "1d", eager=True
+        ),
+        "ticker": ["TCS", "INFY"] * 5,
+        "close": [float(i) for i in range(10)],
+    })
+    with_ticker_history_partitions(history).write_delta(
+        tmp_path / "nse/ticker_history",
+        delta_write_options={"partition_by": TICKER_HISTORY_PARTITION_COLUMNS},
+    )
+    db_pool = StockDataDBPool(tmp_path)
+    pool = DuckDBPool(db_pool, size=2, threads=1)
+
+    query = "SELECT ticker, count(*) AS n, sum(close) AS total FROM self GROUP BY ticker ORDER BY ticker"
+    assert pool.execute("nse", "ticker_history", query).rows() == [
+        ("INFY", 5, 25.0),
+        ("TCS", 5, 20.0),
+    ]
+    # partition columns are not exposed & `stockdb` refers to the same table
+    result = pool.execute(
+        "nse",
+        "ticker_history",
+        "SELECT * FROM stockdb WHERE ticker = $ticker",
+        {"ticker": "TCS"},
+    )
+    assert result.columns == history.columns
+    assert result.height == 5
+    with pytest.raises(BinderException):
+        pool.execute("nse", "ticker_history", "SELECT ticker_bucket FROM self")
+
+    # a new version is picked up by the next query
+    db_pool.get("nse", "ticker_history").write(history.head(2), mode="append")
+    result = pool.execute("nse", "ticker_history", "SELECT count(*) FROM self")
+    assert result.item() == 12
+
+    for query in ("DROP VIEW self", "SELECT 1; SELECT 2"):
+        with pytest.raises(ReadOnlyQueryError):
+            pool.execute("nse", "ticker_history", query)
+    # file system outside the pool's base path is not accessible
+    with pytest.raises(PermissionException):
+        pool.execute("nse", "ticker_history", "SELECT * FROM read_csv('/etc/hosts')")
+    with pytest.raises(CatalogException):
+        pool.execute("nse", "ticker_history", "SELECT * FROM nse_ticker_history")
+    pool.close()
+
+
+def test_duckdb_pool_empty_table(tmp_path: Path):
+    history = pl.DataFrame(
+        schema={"date": pl.Datetime, "ticker": pl.String, "index_symbol": pl.List(pl.String)}
+    )
+    with_ticker_history_partitions(history).write_delta(
+        tmp_path / "nse/ticker_history",
+        delta_write_options={"partition_by": TICKER_HISTORY_PARTITION_COLUMNS},
+    )
+    pool = DuckDBPool(StockDataDBPool(tmp_path), size=1)
+
+    # a table without data files still has its (non partition) columns
+    result = pool.execute("nse", "ticker_history", "SELECT * FROM self")
+    assert result.schema == history.schema
+    result = pool.execute("nse", "ticker_history", "SELECT count(*) FROM stockdb")
+    assert result.item() == 0
+    pool.close()
+
+
+def test_duckdb_pool_pushdown(tmp_path: Path):
+    history = pl.DataFrame({
+        "date": pl.datetime_range(
+            pl.datetime(2022, 12, 31), pl.datetime(2023, 1, 5), "1d", eager=True
+        ),
+        "ticker": ["TCS", "INFY", "TCS", "INFY", "TCS", "INFY"],
+        "close": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+    })
+    with_ticker_history_partitions(history).write_delta(
+        tmp_path / "nse/ticker_history",
+        delta_write_options={"partition_by": TICKER_HISTORY_PARTITION_COLUMNS},
+    )
+    pool = DuckDBPool(StockDataDBPool(tmp_path), size=1)
+
+    def files(query: str) -> int:
+        return pool.source("nse", "ticker_history", query)[1].count(".parquet'")
+
+    # TCS in 2022 & 2023, INFY in 2023
+    assert files("SELECT * FROM self") == 3
+    # only the `ticker_bucket` & `year` partitions the query reads are listed
+    query = "SELECT sum(close) FROM self WHERE ticker = 'TCS' AND date >= '2023-01-01'"
+    assert files(query) == 1
+    assert pool.execute("nse", "ticker_history", query).item() == 8.0
+    query = "SELECT count(*) FROM stockdb WHERE date <= '2022-12-31'"
+    assert files(query) == 1
+    assert pool.execute("nse", "ticker_history", query).item() == 1
+    # WIPRO shares TCS's bucket, the file's ticker stats rule it out
+    query = "SELECT * FROM self WHERE ticker = 'WIPRO'"
+    assert files(query) == 0
+    assert pool.execute("nse", "ticker_history", query).is_empty()
+    # filters which can't be pushed down read every file
+    query = "SELECT count(*) FROM self WHERE ticker = 'TCS' OR close > 5"
+    assert files(query) == 3
+    assert pool.execute("nse", "ticker_history", query).item() == 4
+    # dates with a UTC offset aren't pushed down, DuckDB still compares them
+    query = "SELECT count(*) FROM self WHERE date >= '2023-01-02T00:00:00+00:00'"
+    assert files(query) == 3
+    assert pool.execute("nse", "ticker_history", query).item() == 4
+    query = (
+        "SELECT count(*) FROM self "
+        "WHERE date >= '2023-01-01' AND date >= '2023-01-02T00:00:00+00:00'"
+    )
+    assert files(query) == 2
+    assert pool.execute("nse", "ticker_history", query).item() == 4
+    pool.close()
+
+
+def test_duckdb_pool_limits(tmp_path: Path):
+    pl.DataFrame({"ticker": ["TCS"] * 1000, "close": range(1000)}).write_delta(
+        tmp_path / "nse/ticker_history"
+    )
+    pool = DuckDBPool(
+        StockDataDBPool(tmp_path), size=1, timeout=0.5, max_rows=250, batch_rows=100
+    )
+
+    with pytest.raises(QueryLimitError):
+        pool.execute("nse", "ticker_history", "SELECT * FROM self")
+    result = pool.execute("nse", "ticker_history", "SELECT * FROM self LIMIT 250")
+    assert result.height == 250
+
+    # streamed results are produced batch by batch & end at the limit
+    with pool.stream(
+        "nse", "ticker_history", "SELECT * FROM self", truncate=True
+    ) as stream:
+        batches = list(stream)
+    assert [batch.num_rows for batch in batches] == [100, 100, 50]
+    assert stream.truncated
+
+    with pytest.raises(QueryTimeoutError):
+        pool.execute(
+            "nse", "ticker_history", "SELECT count(*) FROM self, range(10000000000)"
+        )
+    # connection is released & usable after every failure
+    result = pool.execute("nse", "ticker_history", "SELECT count(*) FROM self")
+    assert result.item() == 1000
+
+
+def test_duckdb_pool_cache(tmp_path: Path):
+    history = pl.DataFrame({"ticker": ["TCS", "INFY"] * 5, "close": range(10)})
+    history.write_delta(tmp_path / "nse/ticker_history")
+    db_pool = StockDataDBPool(tmp_path)
+    cache = QueryResultCache()
+    pool = DuckDBPool(db_pool, size=1, cache=cache)
+
+    query = "SELECT ticker, sum(close) AS total FROM self GROUP BY ticker ORDER BY ticker"
+    expected = pool.execute("nse", "ticker_history", query)
+    version = db_pool.get("nse", "ticker_history").version
+    key = cache.key("nse", "ticker_history", version, query)
+    assert_frame_equal(cache.get(key), expected)
+    # same query written differently shares the entry
+    assert key == cache.key(
+        "nse", "ticker_history", version, query.lower().replace(" ", "\n ")
+    )
+    assert cache.key("nse", "ticker_history", version, "SELECT random()") is None
+
+    # a new commit changes the version, so the cached result is not used
+    db_pool.get("nse", "ticker_history").write(history.head(2), mode="append")
+    result = pool.execute("nse", "ticker_history", query)
+    assert result.get_column("total").to_list() == [26, 20]
+
+
+def test_query_result_cache_eviction(tmp_path: Path):
+    results = {
+        f"key{i}": pl.DataFrame({"value": pl.int_range(i * 10_000, (i + 1) * 10_000, eager=True)})
+        for i in range(4)
+    }
+    size = max(len(_ipc_bytes(result)) for result in results.values())
+    cache = QueryResultCache(
+        max_bytes=2 * size + 100,
+        disk_path=tmp_path,
+        disk_max_bytes=size + 100,
+        compression="lz4",
+    )
+    for key, result in results.items():
+        cache.put(key, result)
+
+    # 2 most recent in memory, the one evicted before them on disk, the oldest dropped
+    assert cache.get("key0") is None
+    assert [path.stem for path in tmp_path.glob("*.arrow")] == ["key1"]
+    for key in ("key1", "key2", "key3"):
+        assert_frame_equal(cache.get(key), results[key])
+
+    # disk entries outlive the process
+    cache = QueryResultCache(disk_path=tmp_path, disk_max_bytes=size + 100)
+    assert len(list(tmp_path.glob("*.arrow"))) == 1
+
+
+def _ipc_bytes(result: pl.DataFrame) -> bytes:
+    buffer = io.BytesIO()
+    result.write_ipc(buffer, compression="lz4")
+    return buffer.getvalue()
+
+
+def test_stock_data_db_sql_pushdown(tmp_path: Path):
+    history = with_ticker_history_partitions(
+        pl.DataFrame({
+            "date": pl.datetime_range(
+                pl.datetime(2023, 12, 29), pl.datetime(2024, 1, 3), "1d", eager=True
+            ),
+            "ticker": ["TCS", "INFY", "TCS", "INFY", "TCS", "INFY"],
+            "close": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+            "volume": [10, 20, 30, 40, 50, 60],
+        })
+    )
+    history.write_delta(
+        tmp_path / "ticker_history",
+        delta_write_options={"partition_by": TICKER_HISTORY_PARTITION_COLUMNS},
+    )
+    db = StockDataDB(tmp_path / "ticker_history")
+
+    query = (
+        "SELECT ticker, sum(close) AS total FROM stockdb "
+        "WHERE ticker IN ('TCS', 'WIPRO') AND date >= '2024-01-01' GROUP BY ticker"
+    )
+    scan = db.pushdown_scan(query)
+    assert scan.collect_schema().names() == ["date", "ticker", "close"]
+    assert scan.collect().get_column("close").to_list() == [5.0]
+    assert db.sql_filter(query).collect().to_dicts() == [
+        {"ticker": "TCS", "total": 5.0}
+    ]
+
+    # filters which can't be pushed down leave the scan whole
+    query = "SELECT count(*) AS n FROM self WHERE ticker = 'TCS' OR volume > 30"
+    assert db.pushdown_scan(query).collect().height == 6
+    assert db.sql_filter(query).collect().item() == 5
+    query = "SELECT count(*) AS n FROM self WHERE date >= '2024-01-02T00:00:00+00:00'"
+    assert db.pushdown_scan(query).collect().height == 6
+    assert db.sql_filter(query).collect().item() == 2
@@ -0,0 +1,93 @@
+import numpy as np
+import polars as pl
+import polars.selectors as cs
+import pytest
+from polars.testing import assert_frame_equal
+from stocksense.strategy import Backtest, TechnicalAnalysis
+
+
+@pytest.fixture(scope="module")
+def data() -> pl.DataFrame:
+    rng = np.random.default_rng(7)
+    frames = []
+    for ticker, size in (("TCS", 250), ("INFY", 200), ("MRF", 30)):
+        start = pl.date(2024, 1, 1)
+        frames.append(
+            pl.DataFrame({
+                "ticker": ticker,
+                "date": pl.date_range(
+                    start, start + pl.duration(days=size - 1), eager=True
+                ),
+                "close": 100 * np.exp(rng.normal(0, 0.02, size).cumsum()),
+            })
+        )
+    return pl.concat(frames).sample(fraction=1.0, shuffle=True, seed=7)
+
+
+def _reference(close: np.ndarray, signal: np.ndarray, backtest: Backtest) -> dict:
+    """Bar by bar backtest."""
+    position, equity, peak, max_drawdown, trades = 0.0, 1.0, 1.0, 0.0, 0
+    for i in range(1, len(close)):
+        target = 0.0 if np.isnan(signal[i - 1]) else signal[i - 1]
+        if not backtest.allow_short:
+            target = max(target, 0.0)
+        turnover = abs(target - position)
+        trades += turnover > 0
+        position = target
+        equity *= (
+            1
+            + position * (close[i] / close[i - 1] - 1)
+            - turnover * (backtest.cost + backtest.slippage)
+        )
+        peak = max(peak, equity)
+        max_drawdown = min(max_drawdown, equity / peak - 1)
+    return {"equity": equity, "max_drawdown": max_drawdown, "trades": trades}
+
+
+@pytest.mark.parametrize(
+    "backtest",
+    [Backtest(), Backtest(cost=0.001, slippage=0.0005), Backtest(allow_short=True)],
+)
+def test_matches_reference(data: pl.DataFrame, backtest: Backtest):
+    tcs = data.filter(ticker="TCS").sort("date")
+    signal = np.sign(np.sin(np.arange(tcs.height) / 7))
+    signal[:5] = np.nan
+    tcs = tcs.with_columns(signal=pl.Series(signal))
+
+    result = tcs.ta.backtest("signal", backtest).collect()
+    metrics = backtest.metrics(result.lazy()).collect()
+
+    expected = _reference(tcs.get_column("close").to_numpy(), signal, backtest)
+    assert result.get_column("equity")[-1] == pytest.approx(expected["equity"])
+    assert metrics.item(0, "total_return") == pytest.approx(expected["equity"] - 1)
+    assert metrics.item(0, "max_drawdown") == pytest.approx(expected["max_drawdown"])
+    assert metrics.item(0, "trades") == expected["trades"]
+
+
+def test_grid_across_tickers(data: pl.DataFrame):
+    backtest = Backtest(cost=0.001)
+    specs = [{"name": "sma_crossover", "fast": [5, 10], "slow": [20, 50]}]
+    result = (
+        data.ta
+        .over("ticker")
+        .compute(specs)
+        .ta.over("ticker")
+        .backtest(cs.starts_with("SMA_crossover"), backtest)
+    )
+    metrics = backtest.metrics(result, by="ticker").collect()
+
+    assert metrics.height == 3 * 4
+    for ticker in ("TCS", "MRF"):
+        single = TechnicalAnalysis(data.filter(ticker=ticker).sort("date")).compute(
+            specs
+        )
+        expected = backtest.metrics(
+            TechnicalAnalysis(single).backtest(
+                cs.starts_with("SMA_crossover"), backtest
+            )
+        ).collect()
+        assert_frame_equal(metrics.filter(ticker=ticker).drop("ticker"), expected)
+    # MRF is too short for a 50 bar SMA, that strategy never trades
+    mrf = metrics.filter(ticker="MRF", strategy="SMA_crossover_5_50")
+    assert mrf.item(0, "trades") == 0
+    assert mrf.item(0, "total_return") == 0
@@ -0,0 +1,100 @@
+import numpy as np
+import polars as pl
+import pytest
+from stocksense.strategy import TechnicalAnalysis
+
+
+@pytest.fixture(scope="module")
+def data() -> pl.DataFrame:
+    rng = np.random.default_rng(3)
+    frames = []
+    for ticker in ("TCS", "INFY"):
+        close = 100 + rng.normal(0, 1, 150).cumsum()
+        frames.append(
+            pl.DataFrame({
+                "ticker": ticker,
+                "date": pl.date_range(
+                    pl.date(2024, 1, 1), pl.date(2024, 5, 29), eager=True
+                ),
+                "open": close + rng.normal(0, 0.5, 150),
+                "high": close + 2,
+                "low": close - 2,
+                "close": close,
+                "volume": rng.integers(1_000, 10_000, 150),
+            })
+        )
+    return pl.concat(frames)
+
+
+def test_compute_matches_accessors(data: pl.DataFrame):
+    ta = data.ta.over("ticker")
+    result = ta.compute([
+        "rsi",
+        {"name": "trend.macd", "fastperiod": 10},
+        {"name": "overlap.bbands", "period": 10},
+        "volatility.atr",
+        "pattern.cdlengulfing",
+    ]).collect()
+
+    expected = (
+        ta.momentum
+        .rsi()
+        .ta.over("ticker")
+        .trend.macd(fastperiod=10)
+        .ta.over("ticker")
+        .overlap.bbands(period=10)
+        .ta.over("ticker")
+        .volatility.atr()
+        .ta.over("ticker")
+        .pattern.cdlengulfing()
+        .collect()
+    )
+    assert result.equals(expected, null_equal=True)
+
+
+def test_compute_sweep(data: pl.DataFrame):
+    result = data.ta.compute([
+        {"name": "rsi", "period": range(5, 30)},
+        {"name": "adx", "period": [7, 14]},
+        {"name": "sma_crossover", "fast": [5, 10], "slow": 20},
+    ])
+    names = result.collect_schema().names()[len(data.columns) :]
+    assert names[:25] == [f"RSI_{period}" for period in range(5, 30)]
+    assert names[25:27] == ["ADX_7", "ADX_14"]
+    assert "SMA_crossover_5_20" in names and "SMA_crossover_10_20" in names
+
+
+def test_compute_deduplicates(data: pl.DataFrame):
+    result = data.ta.compute([
+        "rsi",
+        "momentum.rsi",
+        {"name": "rsi", "period": 14},
+        {"name": "sma", "period": 20},
+        {"name": "trend.sma", "period": 20},
+    ])
+    assert result.collect_schema().names()[len(data.columns) :] == ["RSI_14", "SMA_20"]
+
+
+def test_compute_runs_single_query(data: pl.DataFrame):
+    calls = []
+
+    def source(df: pl.DataFrame) -> pl.DataFrame:
+        calls.append(1)
+        return df
+
+    lf = data.lazy().map_batches(source, schema=data.schema)
+    TechnicalAnalysis(lf).compute([
+        {"name": "rsi", "period": range(5, 15)},
+        {"name": "ema", "period": [12, 26]},
+        "macd",
+        "adx",
+    ]).collect()
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize(
+    "spec", ["unknown", "momentum.sma", "trend._native", {"period": 14}]
+)
+def test_compute_invalid_spec(data: pl.DataFrame, spec):
+    with pytest.raises(ValueError):
+        data.ta.compute([spec])
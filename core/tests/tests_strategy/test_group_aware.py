@@ -0,0 +1,63 @@
+import numpy as np
+import polars as pl
+import pytest
+from stocksense.strategy import TechnicalAnalysis
+
+
+@pytest.fixture(scope="module")
+def data() -> pl.DataFrame:
+    rng = np.random.default_rng(7)
+    frames = []
+    for ticker, size in (("TCS", 120), ("INFY", 80), ("MRF", 10)):
+        close = 100 + rng.normal(0, 1, size).cumsum()
+        start = pl.date(2024, 1, 1)
+        frames.append(
+            pl.DataFrame({
+                "ticker": ticker,
+                "date": pl.date_range(
+                    start, start + pl.duration(days=size - 1), eager=True
+                ),
+                "open": close + rng.normal(0, 0.5, size),
+                "high": close + 2,
+                "low": close - 2,
+                "close": close,
+                "volume": rng.integers(1_000, 10_000, size),
+            })
+        )
+    # NOTE - shuffled, grouping must not depend on input order
+    return pl.concat(frames).sample(fraction=1.0, shuffle=True, seed=7)
+
+
+def _per_ticker(data: pl.DataFrame, compute) -> pl.DataFrame:
+    return pl.concat(
+        compute(TechnicalAnalysis(group.sort("date"))).collect()
+        for _, group in data.group_by("ticker")
+    ).sort("ticker", "date")
+
+
+@pytest.mark.parametrize(
+    "compute",
+    [
+        lambda ta: ta.momentum.rsi(period=14),
+        lambda ta: ta.overlap.bbands(period=20),
+        lambda ta: ta.trend.sma(period=14),
+        lambda ta: ta.trend.sma_crossover(fast=5, slow=10),
+        lambda ta: ta.trend.adx_dmi(period=14),
+        lambda ta: ta.volatility.atr(period=14),
+        lambda ta: ta.volume.obv(),
+        lambda ta: ta.pattern.cdlengulfing(),
+    ],
+)
+def test_over_matches_per_ticker(data: pl.DataFrame, compute):
+    grouped = compute(data.ta.over("ticker")).collect()
+    expected = _per_ticker(data, compute)
+    assert grouped.equals(expected, null_equal=True)
+
+
+def test_over_does_not_leak_across_tickers(data: pl.DataFrame):
+    result = data.ta.over("ticker").momentum.rsi(period=14).collect()
+    # MRF has fewer rows than the RSI lookback, so it must get no values at all
+    assert result.filter(pl.col("ticker") == "MRF")["RSI_14"].is_null().all()
+    # every ticker starts its own warmup period
+    warmup = result.group_by("ticker").agg(pl.col("RSI_14").head(14).is_null().all())
+    assert warmup["RSI_14"].all()
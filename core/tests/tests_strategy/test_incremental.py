@@ -0,0 +1,137 @@
+import json
+
+import numpy as np
+import polars as pl
+import pytest
+import talib
+from stocksense.strategy import TechnicalAnalysis  # noqa: F401 - registers `df.ta`
+from stocksense.strategy.ta.incremental import (
+    ATR,
+    BBANDS,
+    EMA,
+    MACD,
+    MOM,
+    OBV,
+    ROC,
+    RSI,
+    SMA,
+    IncrementalIndicator,
+    IncrementalState,
+    batch_spec,
+    from_spec,
+)
+
+rng = np.random.default_rng(5)
+CLOSE = 100 + rng.normal(0, 1, 300).cumsum()
+HIGH = CLOSE + rng.uniform(0, 2, 300)
+LOW = CLOSE - rng.uniform(0, 2, 300)
+VOLUME = rng.integers(1_000, 10_000, 300).astype(float)
+
+BARS = pl.DataFrame({"high": HIGH, "low": LOW, "close": CLOSE, "volume": VOLUME})
+
+
+@pytest.mark.parametrize(
+    "indicator, expected",
+    [
+        (EMA(14), [talib.EMA(CLOSE, 14)]),
+        (SMA(20), [talib.SMA(CLOSE, 20)]),
+        (BBANDS(20, 2.0, 1.5), talib.BBANDS(CLOSE, 20, 2.0, 1.5)),
+        (RSI(14), [talib.RSI(CLOSE, 14)]),
+        (MACD(12, 26, 9), talib.MACD(CLOSE, 12, 26, 9)),
+        (MOM(10), [talib.MOM(CLOSE, 10)]),
+        (ROC(10), [talib.ROC(CLOSE, 10)]),
+        (ATR(14), [talib.ATR(HIGH, LOW, CLOSE, 14)]),
+        (OBV(), [talib.OBV(CLOSE, VOLUME)]),
+    ],
+)
+def test_matches_talib(indicator: IncrementalIndicator, expected):
+    result = indicator.run(BARS)
+    assert result.columns == indicator.outputs
+    for name, values in zip(indicator.outputs, expected):
+        np.testing.assert_allclose(
+            result[name].to_numpy(), values, rtol=1e-9, equal_nan=True
+        )
+
+
+@pytest.mark.parametrize(
+    "indicator", [EMA(14), BBANDS(20), RSI(14), MACD(), ROC(10), ATR(14), OBV()]
+)
+def test_resume_from_state(indicator: IncrementalIndicator):
+    expected = type(indicator).from_state(indicator.to_state()).run(BARS)
+
+    head = indicator.run(BARS.head(150))
+    state = json.loads(json.dumps(indicator.to_state()))
+    resumed = IncrementalState.from_state(state)
+    assert resumed == indicator
+
+    tail = resumed.run(BARS.tail(150))
+    assert pl.concat([head, tail]).equals(expected, null_equal=True)
+
+
+def test_unknown_state_kind():
+    with pytest.raises(ValueError):
+        IncrementalState.from_state({"kind": "Unknown"})
+
+
+def test_from_spec():
+    assert from_spec({"name": "RSI", "period": 21}) == RSI(21)
+    assert from_spec({"name": "MACD"}).outputs == ["MACD", "MACD_signal", "MACD_hist"]
+    with pytest.raises(ValueError):
+        from_spec({"name": "RollingWindow", "size": 3})
+
+
+@pytest.mark.parametrize("indicator", [SMA(20), BBANDS(20)])
+def test_resume_from_state_without_sums(indicator: IncrementalIndicator):
+    # states stored before running sums were kept only have the window
+    indicator.run(BARS.head(150))
+    state = indicator.to_state()
+    for key in ("total", "squares"):
+        state.pop(key, None)
+    resumed = IncrementalState.from_state(state)
+
+    for name in indicator.outputs:
+        np.testing.assert_allclose(
+            resumed.run(BARS.tail(150))[name].to_numpy(),
+            indicator.run(BARS.tail(150))[name].to_numpy(),
+            rtol=1e-9,
+        )
+
+
+def test_incremental_indicator_is_abstract():
+    with pytest.raises(TypeError):
+        IncrementalIndicator()
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        {"name": "EMA", "period": 14},
+        {"name": "SMA", "period": 20},
+        {"name": "BBANDS", "period": 20},
+        {"name": "RSI", "period": 14},
+        {"name": "MACD"},
+        {"name": "MOM", "period": 10},
+        {"name": "ROC", "period": 10},
+        {"name": "ATR", "period": 14},
+        {"name": "OBV"},
+    ],
+)
+def test_warm_up_from_batch(spec: dict):
+    bars = pl.DataFrame({
+        "high": np.tile(HIGH, 4),
+        "low": np.tile(LOW, 4),
+        "close": np.tile(CLOSE, 4),
+        "volume": np.tile(VOLUME, 4),
+    })
+    batch = bars.ta.compute([batch_spec(spec)]).collect()
+    expected = from_spec(spec)
+    expected.run(bars.head(1000))
+
+    indicator = from_spec(spec)
+    assert indicator.warmup < 1000
+    indicator.warm_up(bars.head(1000), batch.row(999, named=True))
+    np.testing.assert_allclose(
+        indicator.run(bars.tail(200)).to_numpy(),
+        expected.run(bars.tail(200)).to_numpy(),
+        rtol=1e-9,
+    )
@@ -0,0 +1,108 @@
+import numpy as np
+import polars as pl
+import pytest
+from stocksense.strategy import TechnicalAnalysis  # noqa: F401 - registers `df.ta`
+from stocksense.strategy.ta.pattern_recognition import PATTERNS
+
+
+@pytest.fixture(scope="module")
+def data() -> pl.DataFrame:
+    rng = np.random.default_rng(7)
+    frames = []
+    for ticker, size in (("TCS", 300), ("INFY", 200), ("MRF", 5)):
+        close = 100 + rng.normal(0, 1, size).cumsum()
+        open_ = close + rng.normal(0, 1, size)
+        start = pl.date(2024, 1, 1)
+        frames.append(
+            pl.DataFrame({
+                "ticker": ticker,
+                "date": pl.date_range(
+                    start, start + pl.duration(days=size - 1), eager=True
+                ),
+                "open": open_,
+                "high": np.maximum(open_, close) + rng.exponential(0.5, size),
+                "low": np.minimum(open_, close) - rng.exponential(0.5, size),
+                "close": close,
+                "volume": rng.integers(1_000, 10_000, size),
+            })
+        )
+    return pl.concat(frames).sample(fraction=1.0, shuffle=True, seed=7)
+
+
+@pytest.fixture(scope="module")
+def expected(data: pl.DataFrame) -> pl.DataFrame:
+    """Hits of every pattern using the per pattern methods."""
+    pattern = data.ta.over("ticker").pattern
+    signals = [
+        getattr(pattern, name.lower())()
+        .select("ticker", "date", pl.col(name).alias("signal"))
+        .filter(pl.col("signal") != 0)
+        .with_columns(pattern=pl.lit(name))
+        .collect()
+        for name in PATTERNS
+    ]
+    return pl.concat(signals).select("ticker", "date", "pattern", "signal")
+
+
+def _normalize(hits: pl.DataFrame) -> pl.DataFrame:
+    return hits.with_columns(pl.col("pattern").cast(pl.String)).sort(
+        "ticker", "date", "pattern"
+    )
+
+
+def test_scan_all_matches_per_pattern(data: pl.DataFrame, expected: pl.DataFrame):
+    hits = data.ta.over("ticker").pattern.scan_all(max_workers=4)
+
+    assert hits.columns == ["ticker", "date", "pattern", "signal"]
+    assert not hits.is_empty()
+    assert _normalize(hits).equals(_normalize(expected))
+    # a group too short for any pattern never borrows bars of its neighbour
+    assert hits.filter(ticker="MRF").is_empty()
+
+
+def test_scan_subset_and_packed(data: pl.DataFrame, expected: pl.DataFrame):
+    patterns = ["CDLDOJI", "cdlengulfing", "CDLHAMMER"]
+    hits = data.ta.over("ticker").pattern.scan(patterns)
+    packed = data.ta.over("ticker").pattern.scan(patterns, packed=True)
+
+    subset = expected.filter(
+        pl.col("pattern").is_in(["CDLDOJI", "CDLENGULFING", "CDLHAMMER"])
+    )
+    assert _normalize(hits).equals(_normalize(subset))
+    assert packed.height == data.height
+    bits = (
+        packed.get_column("CDL_bullish").to_numpy()
+        | packed.get_column("CDL_bearish").to_numpy()
+    )
+    for bit, name in enumerate(["CDLDOJI", "CDLENGULFING", "CDLHAMMER"]):
+        num_hits = ((bits >> np.uint64(bit)) & np.uint64(1)).sum()
+        assert num_hits == subset.filter(pattern=name).height
+
+
+def test_scan_duplicate_patterns(data: pl.DataFrame):
+    hits = data.ta.over("ticker").pattern.scan(["CDLDOJI", "cdldoji", "CDLHAMMER"])
+    packed = data.ta.over("ticker").pattern.scan(["CDLDOJI", "cdldoji"], packed=True)
+
+    assert hits.get_column("pattern").dtype == pl.Enum(["CDLDOJI", "CDLHAMMER"])
+    assert _normalize(hits).equals(
+        _normalize(data.ta.over("ticker").pattern.scan(["CDLDOJI", "CDLHAMMER"]))
+    )
+    # one bit per distinct pattern
+    bits = packed.get_column("CDL_bullish") | packed.get_column("CDL_bearish")
+    assert bits.max() <= 1
+
+
+def test_scan_without_groups(data: pl.DataFrame):
+    tcs = data.filter(ticker="TCS").sort("date").drop("ticker", "date")
+    hits = tcs.ta.pattern.scan(["CDLDOJI"])
+
+    expected = tcs.ta.pattern.cdldoji().collect().get_column("CDLDOJI")
+    assert hits.columns == ["index", "pattern", "signal"]
+    assert hits.get_column("index").to_list() == (expected.ne(0).arg_true().to_list())
+
+
+def test_scan_invalid(data: pl.DataFrame):
+    with pytest.raises(ValueError):
+        data.ta.pattern.scan(["CDLNOTAPATTERN"])
+    with pytest.raises(ValueError):
+        data.ta.compute(["pattern.scan"])
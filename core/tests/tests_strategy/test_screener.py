@@ -0,0 +1,75 @@
+from datetime import date, timedelta
+
+import polars as pl
+import pytest
+from stocksense.strategy import compile_screen, screen
+
+
+@pytest.fixture(scope="module")
+def snapshot() -> pl.DataFrame:
+    return pl.DataFrame({
+        "ticker": ["TCS", "TCS", "INFY", "INFY", "MRF", "MRF"],
+        # latest bar first, screening must not rely on the row order
+        "date": [date(2024, 1, 2), date(2024, 1, 1)] * 3,
+        "close": [12.0, 10, 18, 20, 6, 5],
+        "RSI_14": [25.0, 40, 20, 50, 10, None],
+        "SMA_200": [11.0, 11, 19, 19, 4, 4],
+        "index_symbol": [["NIFTY 50", "NIFTY IT"], ["NIFTY 50"]] * 2
+        + [["No Index"]] * 2,
+        "company": ["Tata Consultancy", "Tata Consultancy", "Infosys", "Infosys"]
+        + ["MRF's"] * 2,
+    })
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        (
+            "RSI_14 < 30 AND close > SMA_200 AND index_symbol contains 'NIFTY 50'",
+            ["TCS"],
+        ),
+        ("close > close[1]", ["MRF", "TCS"]),
+        ("close > 1.05 * SMA_200 or RSI_14 is null", ["MRF", "TCS"]),
+        ("ticker in ('TCS', 'MRF') and not (close < 7)", ["TCS"]),
+        ("company contains 'MRF''s'", ["MRF"]),
+        ("RSI_14 between 10 and 20", ["INFY", "MRF"]),
+        ("index_symbol not contains 'NIFTY IT'", ["MRF"]),
+        ('-"close" <= -12', ["INFY", "TCS"]),
+    ],
+)
+def test_screen(snapshot: pl.DataFrame, text: str, expected: list[str]):
+    result = screen(snapshot, text).collect()
+    assert result.get_column("ticker").sort().to_list() == expected
+    # only the latest bar of a ticker is screened
+    assert result.get_column("date").unique().to_list() == [date(2024, 1, 2)]
+
+
+def test_screen_skips_stale_tickers(snapshot: pl.DataFrame):
+    # a delisted ticker keeps its last bars in the snapshot
+    snapshot = pl.concat([
+        snapshot,
+        snapshot.filter(ticker="TCS").with_columns(
+            ticker=pl.lit("DELISTED"), date=pl.col("date") - timedelta(days=30)
+        ),
+    ])
+
+    assert screen(snapshot, "close > 0").collect().height == 4
+    result = screen(snapshot, "close > 0", max_age=timedelta(days=7)).collect()
+    assert result.get_column("ticker").sort().to_list() == ["INFY", "MRF", "TCS"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "RSI_15 < 30",
+        "close >",
+        "close > 1 and",
+        "close contains 'x'",
+        "close[1.5] > 1",
+        "close @ 1",
+        "(close > 1",
+    ],
+)
+def test_invalid_screen(snapshot: pl.DataFrame, text: str):
+    with pytest.raises(ValueError):
+        compile_screen(text, snapshot.schema)
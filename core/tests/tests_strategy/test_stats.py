@@ -0,0 +1,98 @@
+import numpy as np
+import polars as pl
+import pytest
+import talib
+from stocksense.strategy import TechnicalAnalysis
+
+
+@pytest.fixture(scope="module")
+def data() -> pl.DataFrame:
+    rng = np.random.default_rng(7)
+    size = 300
+    start = pl.date(2024, 1, 1)
+    dates = pl.date_range(start, start + pl.duration(days=size - 1), eager=True)
+    index = 1_000 + rng.normal(0, 5, size).cumsum()
+    frames = [
+        pl.DataFrame({
+            "ticker": ticker,
+            "date": dates,
+            "close": 100 + rng.normal(0, 1, size).cumsum() + 0.05 * index,
+            "index_close": index,
+        })
+        for ticker in ("TCS", "INFY", "MRF")
+    ]
+    return pl.concat(frames).sample(fraction=1.0, shuffle=True, seed=7)
+
+
+def _assert_close(result: pl.Series, expected: np.ndarray):
+    result = result.fill_null(np.nan).to_numpy()
+    np.testing.assert_array_equal(np.isnan(result), np.isnan(expected))
+    np.testing.assert_allclose(result, expected, rtol=1e-8, atol=1e-8)
+
+
+def test_matches_talib(data: pl.DataFrame):
+    tcs = data.filter(ticker="TCS").sort("date")
+    close = tcs.get_column("close").to_numpy()
+    index = tcs.get_column("index_close").to_numpy()
+    ta = TechnicalAnalysis(tcs).stats
+
+    result = ta.correl("index_close", 30).collect()
+    _assert_close(result.get_column("CORREL_30"), talib.CORREL(close, index, 30))
+    # NOTE - TA-Lib regresses its second input on the first
+    result = ta.beta("index_close", 5).collect()
+    _assert_close(result.get_column("BETA_5"), talib.BETA(index, close, 5))
+    result = ta.linearreg_slope(14).collect()
+    _assert_close(
+        result.get_column("LINEARREG_SLOPE_14"), talib.LINEARREG_SLOPE(close, 14)
+    )
+
+
+def test_grouped_stats_in_one_query(data: pl.DataFrame):
+    specs = [
+        "stats.log_return",
+        "stats.zscore",
+        {"name": "stats.beta", "benchmark": "index_close", "period": 20},
+        "stats.linearreg_slope",
+        "stats.realized_volatility",
+        "stats.drawdown",
+        {"name": "stats.percent_rank", "period": 50},
+    ]
+    result = data.ta.over("ticker").compute(specs).collect()
+
+    for ticker, group in result.group_by("ticker"):
+        expected = TechnicalAnalysis(
+            data.filter(ticker=ticker[0]).sort("date")
+        ).compute(specs)
+        assert group.equals(expected.collect())
+
+    tcs = result.filter(ticker="TCS")
+    close = tcs.get_column("close").to_numpy()
+    peak = np.maximum.accumulate(close)
+    np.testing.assert_allclose(tcs.get_column("DRAWDOWN"), close / peak - 1)
+    np.testing.assert_allclose(
+        tcs.get_column("MAX_DRAWDOWN"), np.minimum.accumulate(close / peak - 1)
+    )
+    log_returns = np.diff(np.log(close))
+    np.testing.assert_allclose(
+        tcs.get_column("RVOL_20")[-1], log_returns[-20:].std(ddof=1) * np.sqrt(252)
+    )
+    rank = tcs.get_column("PCTRANK_50")
+    assert rank.null_count() == 49
+    assert rank.min() >= 0 and rank.max() <= 100
+    assert rank[-1] == (close[-50:] < close[-1]).sum() / 49 * 100
+
+
+def test_cross_sectional(data: pl.DataFrame):
+    result = (
+        data.ta
+        .over("ticker")
+        .stats.cross_rank("close")
+        .ta.stats.cross_zscore("close")
+        .collect()
+    )
+
+    day = result.filter(date=result.get_column("date").max()).sort("close")
+    assert day.get_column("close_XRANK").to_list() == [0.0, 50.0, 100.0]
+    assert day.get_column("close_XZSCORE").sum() == pytest.approx(0)
+    with pytest.raises(ValueError):
+        data.ta.compute(["stats.cross_rank"])
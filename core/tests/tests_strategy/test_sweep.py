@@ -0,0 +1,70 @@
+import numpy as np
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+from stocksense.strategy import Backtest, Sweep
+
+
+def sma_cross(df: pl.LazyFrame, fast: int, slow: int) -> pl.LazyFrame:
+    return (
+        df.ta
+        .over("ticker")
+        .trend.sma_crossover(fast, slow)
+        .rename({f"SMA_crossover_{fast}_{slow}": "signal"})
+    )
+
+
+@pytest.fixture(scope="module")
+def data() -> pl.DataFrame:
+    rng = np.random.default_rng(7)
+    frames = []
+    for i, size in enumerate([150] * 4 + [40]):
+        start = pl.date(2024, 1, 1)
+        frames.append(
+            pl.DataFrame({
+                "ticker": f"T{i}",
+                "date": pl.date_range(
+                    start, start + pl.duration(days=size - 1), eager=True
+                ),
+                "close": 100 * np.exp(rng.normal(0, 0.02, size).cumsum()),
+            })
+        )
+    return pl.concat(frames).sample(fraction=1.0, shuffle=True, seed=7)
+
+
+def test_sweep_matches_single_process(data: pl.DataFrame):
+    backtest = Backtest(cost=0.001)
+    sweep = Sweep(
+        sma_cross,
+        {"fast": [5, 10], "slow": [30, 50]},
+        backtest=backtest,
+        max_workers=2,
+        tickers_per_unit=2,
+    )
+    results = sweep.run(data)
+
+    assert results.height == 5 * 4
+    assert results.columns[:3] == ["ticker", "fast", "slow"]
+    for params in sweep.param_sets:
+        signals = sma_cross(data.lazy().sort("ticker", "date"), **params)
+        expected = backtest.metrics(
+            backtest.run(signals, {"signal": pl.col("signal")}, by="ticker"),
+            by="ticker",
+        ).drop("strategy")
+        assert_frame_equal(
+            results.filter(**params).drop("fast", "slow"),
+            expected.collect(),
+            check_row_order=False,
+        )
+
+    summary = sweep.summarize(results)
+    assert summary.get_column("rank").to_list() == [1, 2, 3, 4]
+    assert summary.get_column("tickers").to_list() == [5] * 4
+    assert summary.get_column("mean_sharpe").is_sorted(descending=True)
+
+
+def test_sweep_empty():
+    with pytest.raises(ValueError):
+        Sweep(sma_cross, {"fast": [5], "slow": [30]}).run(
+            pl.DataFrame({"ticker": [], "date": [], "close": []})
+        )
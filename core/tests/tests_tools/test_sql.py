@@ -1,6 +1,8 @@
+from datetime import datetime
+
 import pytest
 from sqlglot.errors import ParseError
-from stocksense.tools.sql import SQLQueryValidator
+from stocksense.tools.sql import ScanPushdown, SQLQueryValidator, _parse
 
 
 @pytest.fixture(scope="module")
@@ -52,3 +54,107 @@ def test_sql_query_validator_columns(sql_queries: dict):
             .verify_columns(["non_existent_column"])
             .run(optimize=False)
         )
+
+
+def test_sql_query_validator_normalize():
+    normalized = SQLQueryValidator(
+        "select  *\nFROM self -- latest first\nwhere Ticker = 'TCS'"
+    ).normalize()
+    assert normalized == "SELECT * FROM self WHERE ticker = 'TCS'"
+    assert normalized == SQLQueryValidator(normalized).normalize()
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("SELECT avg(close) FROM self WHERE ticker = 'TCS'", True),
+        ("SELECT * FROM self WHERE date > current_date - INTERVAL 7 DAY", False),
+        ("SELECT * FROM self WHERE date > now() - INTERVAL 7 DAY", False),
+        ("SELECT * FROM self ORDER BY random() LIMIT 5", False),
+    ],
+)
+def test_sql_query_validator_is_deterministic(query: str, expected: bool):
+    assert SQLQueryValidator(query).is_deterministic() == expected
+
+
+def test_sql_query_validator_parses_once():
+    query = (
+        "SELECT s.ticker, avg(s.close) FROM stockdb AS s "
+        "WHERE s.ticker = 'INFY' GROUP BY s.ticker"
+    )
+    hits = _parse.cache_info().hits
+    validator = SQLQueryValidator(query)
+    validator.verify_syntax().verify_table_name().verify_columns(["ticker", "close"])
+    optimized = validator.run()
+    assert _parse.cache_info().hits - hits == 3
+    # later validators of the same query reuse the AST, which the checks left untouched
+    other = SQLQueryValidator(f"{query}\n")
+    assert other.expression is validator.expression
+    assert other.run() == optimized
+    assert other.run(optimize=False) == f"{query}\n"
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        (
+            "SELECT * FROM stockdb WHERE ticker = 'TCS' LIMIT 5",
+            ScanPushdown(
+                columns=["date", "ticker", "close", "volume"], tickers=["TCS"]
+            ),
+        ),
+        (
+            (
+                "SELECT ticker, avg(close) AS a FROM self "
+                "WHERE (ticker = 'TCS' OR ticker IN ('INFY', 'WIPRO')) AND volume > 0 "
+                "AND date BETWEEN DATE '2024-01-01' AND '2024-06-30' "
+                "GROUP BY ticker ORDER BY a"
+            ),
+            ScanPushdown(
+                columns=["date", "ticker", "close", "volume"],
+                tickers=["INFY", "TCS", "WIPRO"],
+                start=datetime(2024, 1, 1),
+                end=datetime(2024, 6, 30),
+            ),
+        ),
+        (
+            (
+                "WITH t AS (SELECT s.close FROM stockdb s WHERE '2024-01-01' < s.date) "
+                "SELECT count(*) FROM t"
+            ),
+            ScanPushdown(columns=["date", "close"], start=datetime(2024, 1, 1)),
+        ),
+        # dates with a UTC offset can't be compared with the naive `date` column
+        (
+            "SELECT close FROM stockdb WHERE date >= '2023-01-02T00:00:00+00:00'",
+            ScanPushdown(columns=["date", "close"]),
+        ),
+        (
+            (
+                "SELECT close FROM stockdb "
+                "WHERE date >= '2023-01-01' AND date >= '2023-01-02T00:00:00+00:00'"
+            ),
+            ScanPushdown(columns=["date", "close"], start=datetime(2023, 1, 1)),
+        ),
+        # predicates which don't limit every row read are not pushed down
+        (
+            "SELECT count(*) FROM stockdb WHERE ticker = 'TCS' OR close > 10",
+            ScanPushdown(columns=["ticker", "close"]),
+        ),
+        (
+            (
+                "SELECT a.close - b.close FROM stockdb a JOIN stockdb b USING (date) "
+                "WHERE a.ticker = 'TCS' AND b.ticker = 'INFY'"
+            ),
+            ScanPushdown(columns=["date", "ticker", "close"]),
+        ),
+        (
+            "SELECT COLUMNS('c.*') FROM stockdb WHERE ticker = 'TCS'",
+            ScanPushdown(tickers=["TCS"]),
+        ),
+        ("SELECT * FROM other_table WHERE ticker = 'TCS'", ScanPushdown()),
+    ],
+)
+def test_sql_query_validator_scan_pushdown(query: str, expected: ScanPushdown):
+    columns = ["date", "ticker", "close", "volume"]
+    assert SQLQueryValidator(query).scan_pushdown(columns) == expected
@@ -1,12 +1,55 @@
+import io
+from collections.abc import Iterator
 from typing import Annotated
 
-from fastapi import Body, HTTPException, Path, status
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi import Body, Header, HTTPException, Path, status
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from stocksense.config import get_settings
+from stocksense.data import (
+    DuckDBPool,
+    QueryResultCache,
+    QueryStream,
+    StockDataDBPool,
+)
 
 from api.models import (
+    ResponseFormat,
     StockExchange,
     StockExchangeYahooIdentifier,
     YahooTickerIdentifier,
 )
+from api.tasks import TaskManager
+
+settings = get_settings()
+
+# NOTE - shared by all routers so every request reuses the same in-memory Delta snapshots
+stock_db_pool = StockDataDBPool(settings.stockdb.data_base_path)
+# NOTE - SQL queries run on these connections, concurrently & off the event loop
+sql_pool = DuckDBPool(
+    stock_db_pool,
+    size=settings.stockdb.sql_connections,
+    threads=settings.stockdb.sql_threads,
+    memory_limit=settings.stockdb.sql_memory_limit,
+    timeout=settings.stockdb.sql_timeout,
+    max_rows=settings.stockdb.sql_max_rows,
+    max_bytes=settings.stockdb.sql_max_bytes,
+    # NOTE - identical queries (dashboards, text-to-sql) are answered from cache until the
+    # table gets a new commit
+    cache=QueryResultCache(
+        max_bytes=settings.stockdb.sql_cache_bytes,
+        disk_path=settings.stockdb.data_base_path / "common/query_cache"
+        if settings.stockdb.sql_cache_disk_bytes
+        else None,
+        disk_max_bytes=settings.stockdb.sql_cache_disk_bytes,
+    )
+    if settings.stockdb.sql_cache_bytes
+    else None,
+)
+# NOTE - long running operations (downloads, table maintenance) run here instead of inside requests
+task_manager = TaskManager()
 
 
 async def yahoo_finance_aware_ticker(
@@ -45,3 +88,83 @@ async def yahoo_finance_aware_exchange_check(
             detail=f"The following exchanges are not supported: {diff}",
         )
     return exchange
+
+
+async def negotiate_response_format(
+    accept: Annotated[
+        str | None,
+        Header(
+            description="Desired response format. Columnar formats avoid per row JSON serialization",
+            examples=[fmt.value for fmt in ResponseFormat],
+        ),
+    ] = None,
+) -> ResponseFormat:
+    """Dependency to pick response format from `Accept` header, defaults to JSON"""
+    for media_type in (accept or "").split(","):
+        try:
+            return ResponseFormat(media_type.split(";")[0].strip())
+        except ValueError:
+            continue
+    return ResponseFormat.json
+
+
+def dataframe_response(data: pl.DataFrame, response_format: ResponseFormat) -> Response:
+    """Serialize dataframe as per negotiated response format"""
+    if response_format == ResponseFormat.json:
+        return ORJSONResponse(data.to_dicts(), headers={"Vary": "Accept"})
+
+    buffer = io.BytesIO()
+    if response_format == ResponseFormat.arrow:
+        data.write_ipc_stream(buffer)
+    else:
+        data.write_parquet(buffer, compression="zstd")
+    return Response(
+        buffer.getvalue(),
+        media_type=response_format.value,
+        headers={"Vary": "Accept"},
+    )
+
+
+def query_stream_response(
+    stream: QueryStream, response_format: ResponseFormat
+) -> StreamingResponse:
+    """Stream query result batches as per negotiated response format, JSON as NDJSON"""
+
+    def chunks() -> Iterator[bytes]:
+        buffer = io.BytesIO()
+
+        def flush() -> bytes:
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
+
+        with stream:
+            if response_format == ResponseFormat.json:
+                for batch in stream:
+                    pl.from_arrow(batch).write_ndjson(buffer)
+                    yield flush()
+                return
+
+            writer = (
+                pa.ipc.new_stream(buffer, stream.schema)
+                if response_format == ResponseFormat.arrow
+                else pq.ParquetWriter(buffer, stream.schema, compression="zstd")
+            )
+            # NOTE - every batch is sent as soon as it is written (a parquet row group each), only
+            # one batch is held in memory at a time
+            for batch in stream:
+                writer.write_batch(batch)
+                yield flush()
+            writer.close()
+            yield flush()
+
+    return StreamingResponse(
+        chunks(),
+        media_type=(
+            "application/x-ndjson"
+            if response_format == ResponseFormat.json
+            else response_format.value
+        ),
+        headers={"Vary": "Accept"},
+    )
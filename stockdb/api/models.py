@@ -1,10 +1,15 @@
 from datetime import date, datetime
 from enum import Enum
+from typing import TYPE_CHECKING
 
+import polars as pl
 from pydantic import BaseModel, Field, model_validator
 
 from api.dependency import stable_hash
 
+if TYPE_CHECKING:
+    from stocksense.data import StockDataDB
+
 
 class APITags(Enum):
     root = "Root"
@@ -14,6 +19,7 @@ class APITags(Enum):
     dataset = "Dataset"
     task = "Task"
     ops = "Operation"
+    screener = "Screener"
 
 
 class Period(Enum):
@@ -99,11 +105,37 @@ class TickerHistoryDownloadMode(Enum):
     incremental = "incremental"
 
 
+class HistoryLayout(Enum):
+    long = "long"  # one row per ticker & date
+    grouped = "grouped"  # one row per ticker with its history nested
+
+
+class TickerTable(Enum):
+    ticker_history = "ticker_history"
+    ticker_features = (
+        "ticker_features"  # indicators of ticker_history, see `feature_indicators`
+    )
+
+
 class TaskMode(Enum):
     auto = "auto"
     manual = "manual"
 
 
+class TaskStatus(Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+    cancelled = "cancelled"
+
+
+class ResponseFormat(Enum):
+    json = "application/json"
+    arrow = "application/vnd.apache.arrow.stream"
+    parquet = "application/x-parquet"
+
+
 class PromptCacheTier(Enum):
     auto = "auto"  # Auto select tier based on data size
     tier1 = "tier1"  # Delta Lake Storage
@@ -176,6 +208,115 @@ class TickerHistoryQuery(BaseModel):
             raise ValueError("Start date must be less than end date")
         return self
 
+    @property
+    def is_intraday(self) -> bool:
+        """Whether requested interval is less than 1 day"""
+        return self.interval not in {
+            Interval.ONE_DAY,
+            Interval.FIVE_DAYS,
+            Interval.ONE_WEEK,
+            Interval.ONE_MONTH,
+            Interval.THREE_MONTHS,
+        }
+
+    def filter_history(
+        self, history_data: "StockDataDB", tickers: list[str]
+    ) -> pl.LazyFrame:
+        """Lazily filter history of given `tickers` as per query & resample it to query interval.
+
+        Ticker & date range predicates are applied first so that they are pushed down to the delta
+        scan; `period` is then taken relative to the latest date among the selected tickers.
+        """
+        # 1. Ticker & start/end condition
+        query = [history_data.ticker_predicate(tickers)]
+        if self.start_date is not None:
+            query.append(history_data.date_predicate(self.start_date, self.end_date))
+        result = history_data.polars_filter(query)
+
+        # 2. Period condition
+        if self.start_date is None and self.period:
+            result = result.filter(
+                pl.col("date")
+                >= (
+                    pl.col("date").min()
+                    if self.period == Period.MAX
+                    else pl.datetime(datetime.now().year, 1, 1)
+                    if self.period == Period.YEAR_TO_DATE
+                    else pl.col("date").max().dt.offset_by(f"-{self.period.value}")
+                )
+            )
+
+        # 3. Interval condition
+        # NOTE - Normalize interval value for '1w'/'1wk'
+        interval_value = self.interval.value
+        if interval_value == "1wk":
+            interval_value = "1w"
+
+        return (
+            result
+            .sort("ticker", "date")  # grouping requires ascending sorted data
+            .group_by_dynamic(
+                index_column="date",
+                every=interval_value,
+                group_by="ticker",
+                start_by="datapoint",  # grouping should start from first data point
+                # aggregation is done by simply taking all value from group; then taking first value from each
+            )
+            .agg(pl.all().first())
+            .select(
+                "date", "ticker", "company", "open", "high", "low", "close", "volume"
+            )
+            .sort(["ticker", "date"], descending=[False, True])  # latest date first
+        )
+
+
+class BulkTickerHistoryQuery(TickerHistoryQuery):
+    ticker: list[str] | None = Field(
+        None,
+        description="Desired company's `Ticker` symbols. This is mutually exclusive with `index`",
+        examples=[["infy", "tcs", "AKASH"], ["AAPL", "msft"]],
+    )
+    index: str | None = Field(
+        None,
+        description="Index symbol whose constituent tickers are needed. This is mutually exclusive with `ticker`",
+        examples=["NIFTY 50", "S&P 500"],
+    )
+    layout: HistoryLayout = Field(
+        HistoryLayout.long,
+        description="`long` returns one row per ticker & date. `grouped` returns one row per ticker with nested `history`",
+    )
+
+    @model_validator(mode="after")
+    def check_ticker_or_index(self):
+        if (self.ticker is None) == (self.index is None):
+            raise ValueError("Exactly one of ticker or index is required")
+        if self.ticker is not None:
+            # making sure that ticker symbol are always Upper case
+            self.ticker = [t.upper() for t in self.ticker]
+        return self
+
+
+class ScreenerQuery(BaseModel):
+    model_config = {"extra": "forbid"}
+
+    filter: str = Field(
+        description="Screen over the latest bar of every ticker. Columns (see `fields`) are compared with `< <= > >= = !=`, combined with `AND`, `OR` & `NOT`, and support `+ - * /`, `CONTAINS`, `IN (...)`, `BETWEEN ... AND ...` & `IS [NOT] NULL`. `column[n]` is the value `n` bars earlier",
+        examples=[
+            "RSI_14 < 30 AND close > SMA_200 AND index_symbol contains 'NIFTY 50'",
+            "close > close[1] * 1.05 AND volume > 2 * volume[1]",
+        ],
+    )
+    columns: list[str] | None = Field(
+        None,
+        description="Columns to return besides `ticker` & `date`, all columns if not provided",
+        examples=[["close", "RSI_14", "SMA_200"]],
+    )
+    sort_by: str | None = Field(
+        None, description="Column to sort matches by, `ticker` if not provided"
+    )
+    descending: bool = Field(False, description="Sort in descending order")
+    limit: int | None = Field(None, ge=1, description="Maximum number of matches")
+
 
 class TickerInput(BaseModel):
     ticker: list[str] = Field(
@@ -1,13 +1,25 @@
+from typing import Annotated
+
 import polars as pl
-from fastapi import APIRouter
-from fastapi.responses import ORJSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Path, status
+from fastapi.responses import ORJSONResponse, Response
 from stocksense.config import get_settings
 from stocksense.data import Exchange
 
+from api.dependency.utils import (
+    dataframe_response,
+    negotiate_response_format,
+    stock_db_pool,
+)
 from api.models import (
     APITags,
+    BulkTickerHistoryQuery,
     ExchangeTickerInfo,
+    ExchangeTickersHistory,
+    HistoryLayout,
+    ResponseFormat,
     StockExchange,
+    TickerHistoryOutput,
 )
 
 settings = get_settings()
@@ -53,3 +65,57 @@ async def list_exchange_wise_indexes() -> ORJSONResponse:
             all_exchanges[exch_name.value] = None
 
     return ORJSONResponse(all_exchanges)
+
+
+@router.post(
+    "/{exchange}/history",
+    response_model=list[TickerHistoryOutput] | list[ExchangeTickersHistory],
+)
+async def bulk_ticker_history(
+    exchange: Annotated[
+        StockExchange,
+        Path(
+            description="Symbol of the exchange",
+            examples=["nse", "nyse"],
+        ),
+    ],
+    query: BulkTickerHistoryQuery,
+    response_format: Annotated[ResponseFormat, Depends(negotiate_response_format)],
+) -> Response:
+    """Get stock history data for many `ticker` (or all tickers of an `index`) in a single scan"""
+    if query.is_intraday:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Interval less than 1 day is not supported",
+        )
+
+    tickers = query.ticker
+    if query.index is not None:
+        table_path = settings.stockdb.data_base_path / f"{exchange.value}/equity"
+        if not table_path.exists():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Exchange data for '{exchange.value}' not found",
+            )
+        index_tickers = await (
+            pl
+            .scan_delta(table_path)
+            .filter(pl.col("index_symbol").list.contains(query.index))
+            .select("symbol")
+            .collect_async()
+        )
+        tickers = index_tickers.to_series().to_list()
+
+    history_data = stock_db_pool.get(exchange.value, "ticker_history")
+    result = query.filter_history(history_data, tickers)
+
+    if query.layout == HistoryLayout.grouped:
+        result = (
+            result
+            .group_by("ticker", maintain_order=True)
+            .agg(pl.struct(pl.all()).alias("history"))
+            .select(pl.lit(exchange.value).alias("exchange"), "ticker", "history")
+        )
+
+    result = await result.collect_async()
+    return dataframe_response(result, response_format)
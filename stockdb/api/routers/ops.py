@@ -1,14 +1,19 @@
+from collections.abc import Callable, Coroutine
 from datetime import datetime, timedelta
 from typing import Annotated
 
 import polars as pl
 from deltalake import DeltaTable
-from fastapi import APIRouter, HTTPException, Path, status
+from fastapi import APIRouter, HTTPException, Path, Query, status
 from fastapi.responses import ORJSONResponse
+from pipeline.download_scheduler import DownloadScheduler
+from pipeline.job_ledger import summarize_jobs
+from pipeline.ticker_features import update_ticker_features
 from pipeline.ticker_history_data_download import download_ticker_history
+from pipeline.ticker_snapshot import update_ticker_snapshot
 from stocksense.config import get_settings
-from stocksense.data import StockDataDB
 
+from api.dependency.utils import stock_db_pool, task_manager
 from api.models import (
     APITags,
     PromptCacheInput,
@@ -19,13 +24,61 @@ from api.models import (
     TaskTickerHistoryDownloadInput,
     TickerHistoryDownloadMode,
 )
+from api.tasks import TableBusyError, run_in_thread_to_completion
 
 settings = get_settings()
 
 router = APIRouter(prefix="/api/operation", tags=[APITags.ops])
 
 
-@router.put("/optimize/{exchange}/ticker/history")
+def _submit_task(
+    name: str, table: str, job: Coroutine, progress: Callable[[], dict] | None = None
+) -> ORJSONResponse:
+    """Submit `job` to the background task manager & respond with the accepted task"""
+    try:
+        task = task_manager.submit(name, table, job, progress=progress)
+    except TableBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)) from e
+    return ORJSONResponse(status_code=status.HTTP_202_ACCEPTED, content=task.as_dict())
+
+
+async def _optimize_ticker_history(
+    exchange: StockExchange, compact: bool, vacuum: bool, progress: dict
+) -> dict:
+    result = {}
+    dt_table = DeltaTable(
+        settings.stockdb.data_base_path / f"{exchange.value}/ticker_history"
+    )
+    # NOTE - delta maintenance calls are blocking, running them in a thread keeps the API responsive
+    if compact:
+        progress["compaction"] = "running"
+        result["compaction"] = await run_in_thread_to_completion(
+            dt_table.optimize.compact
+        )
+        progress["compaction"] = "done"
+    if vacuum:
+        progress["vacuum"] = "running"
+        result["vacuum"] = await run_in_thread_to_completion(
+            dt_table.vacuum, dry_run=False
+        )
+        progress["vacuum"] = "done"
+    return result
+
+
+async def _download_ticker_history(
+    exchange: StockExchange, full_download: bool, scheduler: DownloadScheduler
+) -> dict:
+    result = await download_ticker_history(
+        exchange=exchange, full_download=full_download, scheduler=scheduler
+    )
+    # NOTE - feature store only computes the newly downloaded bars, keeping it in sync is cheap
+    result["features"] = await update_ticker_features(exchange)
+    # NOTE - screens run on the latest bars & features, so the snapshot is rebuilt after both
+    result["snapshot"] = await update_ticker_snapshot(exchange)
+    return result
+
+
+@router.put("/optimize/{exchange}/ticker/history", status_code=status.HTTP_202_ACCEPTED)
 async def table_optimize_ticker_history(
     exchange: Annotated[
         StockExchange,
@@ -41,24 +94,28 @@ async def table_optimize_ticker_history(
     Optimization includes -
     1. compaction of small files and reorganization of data for better query performance.
     2. vacuuming to remove old data files and free up storage space.
+
+    Runs in background, poll `/api/operation/tasks/{task_id}` with the returned `task_id` for status.
     """
-    result = {}
-    dt_table = DeltaTable(
-        settings.stockdb.data_base_path / f"{exchange.value}/ticker_history"
+    progress = {
+        step: "pending"
+        for step, enabled in (("compaction", compact), ("vacuum", vacuum))
+        if enabled
+    }
+    return _submit_task(
+        f"optimize {exchange.value} ticker history",
+        f"{exchange.value}/ticker_history",
+        _optimize_ticker_history(exchange, compact, vacuum, progress),
+        progress=lambda: progress,
     )
-    if compact:
-        compact_result = dt_table.optimize.compact()
-        result["compaction"] = compact_result
-    if vacuum:
-        vacuum_result = dt_table.vacuum(dry_run=False)
-        result["vacuum"] = vacuum_result
 
-    return ORJSONResponse(result)
 
-
-@router.post("/download/ticker/history")
+@router.post("/download/ticker/history", status_code=status.HTTP_202_ACCEPTED)
 async def daily_ticker_history_download(task_input: TaskTickerHistoryDownloadInput):
-    """Trigger daily ticker history download for all tickers in given exchange"""
+    """Trigger daily ticker history download for all tickers in given exchange
+
+    Runs in background, poll `/api/operation/tasks/{task_id}` with the returned `task_id` for status.
+    """
     # SECTION 1- Auto mode
     if task_input.task_mode == TaskMode.auto:
         # checking if download is actually needed
@@ -66,10 +123,7 @@ async def daily_ticker_history_download(task_input: TaskTickerHistoryDownloadInp
         latest_data_date = (
             now.date() if now.hour >= 18 else now.date() - timedelta(days=1)
         )
-        stock_db = StockDataDB(
-            settings.stockdb.data_base_path
-            / f"{task_input.exchange.value}/ticker_history"
-        )
+        stock_db = stock_db_pool.get(task_input.exchange.value, "ticker_history")
         date_check = (
             await stock_db
             .polars_filter(pl.col("date").max().cast(pl.Date) < latest_data_date)
@@ -79,19 +133,29 @@ async def daily_ticker_history_download(task_input: TaskTickerHistoryDownloadInp
         )
 
         if date_check.item() == 0:
-            # No new data to download
-            return {"message": "No new data to download"}
-        # Trigger the download task for all tickers in the exchange
-        # REVIEW - IF we dont want to wait for result here, then fastapi background task should be used
-        # background_tasks.add_task(download_ticker_history, exchange=task_input.exchange)
-        if task_input.download_mode == TickerHistoryDownloadMode.incremental:
-            result = await download_ticker_history(exchange=task_input.exchange)
-            return ORJSONResponse(result)
-        if task_input.download_mode == TickerHistoryDownloadMode.full:
-            result = await download_ticker_history(
-                exchange=task_input.exchange, full_download=True
+            # NOTE - nothing is submitted, so no `202` which clients read a `task_id` from
+            return ORJSONResponse(
+                status_code=status.HTTP_200_OK,
+                content={"message": "No new data to download"},
             )
-            return ORJSONResponse(result)
+        # Trigger the download task for all tickers in the exchange
+        scheduler = DownloadScheduler(
+            max_workers=settings.stockdb.download_workers,
+            rate_limit=settings.stockdb.download_rate_limit,
+            max_retries=settings.stockdb.download_max_retries,
+        )
+        return _submit_task(
+            f"{task_input.download_mode.value} {task_input.exchange.value} ticker history download",
+            f"{task_input.exchange.value}/ticker_history",
+            _download_ticker_history(
+                exchange=task_input.exchange,
+                full_download=task_input.download_mode
+                == TickerHistoryDownloadMode.full,
+                scheduler=scheduler,
+            ),
+            # NOTE - scheduler replaces its progress object on every run, so it is looked up lazily
+            progress=lambda: scheduler.progress.as_dict(),
+        )
 
     # SECTION 2 - Manual mode
     elif task_input.task_mode == TaskMode.manual:
@@ -116,13 +180,92 @@ async def daily_ticker_history_download(task_input: TaskTickerHistoryDownloadInp
             # ]
 
 
+@router.get("/tasks")
+async def list_tasks() -> ORJSONResponse:
+    """List background tasks of this API process, latest first"""
+    return ORJSONResponse([task.as_dict() for task in task_manager.list_tasks()])
+
+
+@router.get("/tasks/{task_id}")
+async def task_status(task_id: str) -> ORJSONResponse:
+    """Get status, progress & result of a background task"""
+    task = task_manager.get(task_id)
+    if task is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task '{task_id}' not found",
+        )
+    return ORJSONResponse(task.as_dict())
+
+
+@router.post("/tasks/{task_id}/cancel")
+async def cancel_task(task_id: str) -> ORJSONResponse:
+    """Cancel a pending or running background task"""
+    task = task_manager.get(task_id)
+    if task is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task '{task_id}' not found",
+        )
+    if not task_manager.cancel(task_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Task '{task_id}' is already {task.status.value}",
+        )
+    return ORJSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"message": f"Cancellation requested for task '{task_id}'"},
+    )
+
+
+def _job_ledger_table():
+    if not (settings.stockdb.data_base_path / "common/job_ledger").exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No download job has been run yet",
+        )
+    return stock_db_pool.get("common", "job_ledger")
+
+
+@router.get("/jobs")
+async def list_download_jobs(
+    exchange: StockExchange | None = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 10,
+) -> ORJSONResponse:
+    """List latest ticker history download jobs with their state"""
+    ledger = _job_ledger_table().table_data
+    if exchange is not None:
+        ledger = ledger.filter(pl.col("exchange") == exchange.value)
+    jobs = await summarize_jobs(ledger).head(limit).collect_async()
+    return ORJSONResponse(jobs.to_dicts())
+
+
+@router.get("/jobs/{job_id}")
+async def download_job_status(job_id: str) -> ORJSONResponse:
+    """Get state of a ticker history download job along with its per batch records"""
+    events = _job_ledger_table().polars_filter(pl.col("job_id") == job_id)
+    job = await summarize_jobs(events).collect_async()
+    if job.is_empty():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Download job '{job_id}' not found",
+        )
+    batches = await (
+        events
+        .filter(pl.col("status").is_in(["committed", "failed"]))
+        # NOTE - batch numbers restart on every resumed run, commit time keeps them in order
+        .sort("last_modified", "batch")
+        .select("batch", "tickers", "status", "rows", "attempts", "elapsed", "error")
+        .collect_async()
+    )
+    return ORJSONResponse({**job.to_dicts()[0], "batches": batches.to_dicts()})
+
+
 @router.post("/prompt/search", response_model=PromptCacheOutput)
 async def search_prompt_cache(query: PromptSearchInput) -> ORJSONResponse:
     """Retrieve LLM response from cache"""
     key = query.get_cache_key()
-    prompt_cache_table = StockDataDB(
-        settings.stockdb.data_base_path / "common/prompt_cache"
-    )
+    prompt_cache_table = stock_db_pool.get("common", "prompt_cache")
 
     result = await prompt_cache_table.polars_filter(
         (pl.col("prompt_hash") == key)
@@ -144,9 +287,7 @@ async def search_prompt_cache(query: PromptSearchInput) -> ORJSONResponse:
 async def cache_prompt_response(cache_data: PromptCacheInput) -> ORJSONResponse:
     """Store LLM response in cache for future reuse"""
     # Tier 1 - Store in StockDB Delta Table as Hash
-    prompt_cache_table = StockDataDB(
-        settings.stockdb.data_base_path / "common/prompt_cache"
-    )
+    prompt_cache_table = stock_db_pool.get("common", "prompt_cache")
 
     current_cache_df = pl.LazyFrame({
         "prompt_hash": cache_data.get_cache_key(),
@@ -1,24 +1,42 @@
-from datetime import datetime
+import asyncio
 from typing import Annotated, Any
 
 import polars as pl
-from duckdb import BinderException, ParserException
+from deltalake.exceptions import TableNotFoundError
+from duckdb import (
+    BinderException,
+    CatalogException,
+    ParserException,
+    PermissionException,
+)
 from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query, status
-from fastapi.responses import ORJSONResponse
+from fastapi.responses import Response
 from stocksense.config import get_settings
-from stocksense.data import StockDataDB, YFStockData
+from stocksense.data import (
+    QueryLimitError,
+    QueryTimeoutError,
+    ReadOnlyQueryError,
+    YFStockData,
+)
 
-from api.dependency.utils import yahoo_finance_aware_ticker
+from api.dependency.utils import (
+    dataframe_response,
+    negotiate_response_format,
+    query_stream_response,
+    sql_pool,
+    stock_db_pool,
+    yahoo_finance_aware_ticker,
+)
 from api.models import (
     APITags,
     ExchangeTickerInfo,
-    Interval,
-    Period,
+    ResponseFormat,
     StockExchange,
     StockExchangeFullName,
     StockExchangeYahooIdentifier,
     TickerHistoryOutput,
     TickerHistoryQuery,
+    TickerTable,
     YahooTickerIdentifier,
 )
 
@@ -42,8 +60,9 @@ async def list_ticker(
             examples=["nse", "nyse"],
         ),
     ],
+    response_format: Annotated[ResponseFormat, Depends(negotiate_response_format)],
     # REVIEW - Should I add more exchange info?
-) -> ORJSONResponse:
+) -> Response:
     """Get all the available `ticker` in given `exchange`"""
     table_path = settings.stockdb.data_base_path / f"{exchange.value}/equity"
 
@@ -59,7 +78,7 @@ async def list_ticker(
         .sort("ticker")
         .collect_async()
     )
-    return ORJSONResponse(result.to_dicts())
+    return dataframe_response(result, response_format)
 
 
 @router.get("/{exchange}/{index}", response_model=ExchangeTickerInfo)
@@ -78,7 +97,8 @@ async def list_ticker_in_index(
             examples=["NIFTY 50", "S&P 500"],
         ),
     ],
-) -> ORJSONResponse:
+    response_format: Annotated[ResponseFormat, Depends(negotiate_response_format)],
+) -> Response:
     """Get all the available `ticker` in given `exchange` & `index`"""
     table_path = settings.stockdb.data_base_path / f"{exchange.value}/equity"
     if not table_path.exists():
@@ -94,7 +114,7 @@ async def list_ticker_in_index(
         .sort("ticker")
         .collect_async()
     )
-    return ORJSONResponse(result.to_dicts())
+    return dataframe_response(result, response_format)
 
 
 @router.post("/{exchange}/query", response_model=TickerHistoryOutput)
@@ -115,20 +135,52 @@ async def ticker_query(
             NOTE: Always use `self` as table name in the sql query.""",
         ),
     ],
-) -> ORJSONResponse:
-    """Get stock history data for given `exchange` using SQL query"""
-    history_data = StockDataDB(
-        settings.stockdb.data_base_path / f"{exchange.value}/ticker_history"
-    )
-    # Execute SQL query
+    response_format: Annotated[ResponseFormat, Depends(negotiate_response_format)],
+    table: Annotated[
+        TickerTable,
+        Query(
+            description="Table referred as `self`, history or its indicator features"
+        ),
+    ] = TickerTable.ticker_history,
+    stream: Annotated[
+        bool,
+        Query(
+            description="Stream the result as it is computed (JSON as NDJSON), it ends at the row & size limits instead of failing"
+        ),
+    ] = False,
+) -> Response:
+    """Get stock history (or indicator features) data for given `exchange` using SQL query"""
+    # Execute SQL query on a pooled connection, in a worker thread
     try:
-        result = history_data.sql_filter(sql_query)
-        result = await result.collect_async()
-        return ORJSONResponse(result.to_dicts())
-    except (BinderException, ParserException) as e:
+        if stream:
+            result = await asyncio.to_thread(
+                sql_pool.stream, exchange.value, table.value, sql_query, truncate=True
+            )
+            return query_stream_response(result, response_format)
+        result = await asyncio.to_thread(
+            sql_pool.execute, exchange.value, table.value, sql_query
+        )
+    except TableNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{exchange.value}/{table.value} table does not exist yet",
+        ) from e
+    except (
+        BinderException,
+        CatalogException,
+        ParserException,
+        PermissionException,
+        QueryLimitError,
+        ReadOnlyQueryError,
+    ) as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
         ) from e
+    except QueryTimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT, detail=str(e)
+        ) from e
+    return dataframe_response(result, response_format)
 
 
 @router.get("/{exchange}/{ticker}")
@@ -148,62 +200,16 @@ async def ticker_information(
 async def ticker_history(
     ticker: Annotated[YahooTickerIdentifier, Depends(yahoo_finance_aware_ticker)],
     query_param: Annotated[TickerHistoryQuery, Query()],
-) -> ORJSONResponse:
+    response_format: Annotated[ResponseFormat, Depends(negotiate_response_format)],
+) -> Response:
     """Get stock history data for given `Ticker`"""
-    history_data = StockDataDB(
-        settings.stockdb.data_base_path / f"{ticker.exchange.lower()}/ticker_history"
-    )
-    # Building the query
-    query = [pl.col("ticker") == ticker.symbol]
-    # 1. start & end condition
-    if query_param.start_date is not None:
-        query.append(
-            pl.col("date").is_between(query_param.start_date, query_param.end_date)
-        )
-    # 2. Period condition
-    elif query_param.period:
-        query.append(
-            pl.col("date")
-            >= (
-                pl.col("date").min()
-                if query_param.period == Period.MAX
-                else pl.datetime(datetime.now().year, 1, 1)
-                if query_param.period == Period.YEAR_TO_DATE
-                else pl.col("date").max().dt.offset_by(f"-{query_param.period.value}")
-            )
-        )
-    result = history_data.polars_filter(query)
-
-    # 3. Interval condition
-    if query_param.interval not in {
-        Interval.ONE_DAY,
-        Interval.FIVE_DAYS,
-        Interval.ONE_WEEK,
-        Interval.ONE_MONTH,
-        Interval.THREE_MONTHS,
-    }:
+    history_data = stock_db_pool.get(ticker.exchange, "ticker_history")
+    if query_param.is_intraday:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Interval less than 1 day is not supported",
         )
-    # NOTE - Normalize interval value for '1w'/'1wk'
-    interval_value = query_param.interval.value
-    if interval_value == "1wk":
-        interval_value = "1w"
-
-    result = (
-        result
-        .sort("date")  # grouping requires ascending sorted data
-        .group_by_dynamic(
-            index_column="date",
-            every=interval_value,
-            start_by="datapoint",  # grouping should start from first data point
-            # aggregation is done by simply taking all value from group; then taking first value from each
-        )
-        .agg(pl.all().first())
-        .select("date", "ticker", "company", "open", "high", "low", "close", "volume")
-        .sort("date", descending=True)  # sorting back to latest date first
-    )
+    result = query_param.filter_history(history_data, [ticker.symbol])
 
     result = await result.collect_async()
-    return ORJSONResponse(result.to_dicts())
+    return dataframe_response(result, response_format)
@@ -0,0 +1,119 @@
+from dataclasses import dataclass, field
+from typing import Annotated
+
+import polars as pl
+from deltalake.exceptions import TableNotFoundError
+from fastapi import APIRouter, Depends, HTTPException, Path, status
+from fastapi.responses import Response
+from stocksense.strategy import compile_screen
+
+from api.dependency.utils import (
+    dataframe_response,
+    negotiate_response_format,
+    stock_db_pool,
+)
+from api.models import APITags, ResponseFormat, ScreenerQuery, StockExchange
+
+router = APIRouter(prefix="/api/screener", tags=[APITags.screener])
+
+# NOTE - compiled filters kept per snapshot, repeated screens (e.g. a saved screen polled by the
+# UI) skip parsing
+MAX_PLANS = 256
+
+
+@dataclass
+class _Snapshot:
+    """In memory `ticker_snapshot` of an exchange at a Delta version."""
+
+    version: int
+    data: pl.DataFrame
+    plans: dict[str, pl.Expr] = field(default_factory=dict)
+
+    def plan(self, text: str) -> pl.Expr:
+        """Compiled screen `text`, restricted to the latest bar of every ticker."""
+        if text not in self.plans:
+            if len(self.plans) >= MAX_PLANS:
+                self.plans.clear()
+            self.plans[text] = (
+                pl.col("date") == pl.col("date").max().over("ticker")
+            ) & compile_screen(text, self.data.schema)
+        return self.plans[text]
+
+
+_snapshots: dict[str, _Snapshot] = {}
+
+
+async def get_snapshot(
+    exchange: Annotated[
+        StockExchange,
+        Path(
+            description="Symbol of the exchange",
+            examples=["nse", "nyse"],
+        ),
+    ],
+) -> _Snapshot:
+    """Dependency to get the exchange's snapshot, re-read only when a newer version was written"""
+    try:
+        handle = stock_db_pool.get(exchange.value, "ticker_snapshot")
+    except TableNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Screener snapshot for '{exchange.value}' not found, it is built after ticker history download",
+        ) from None
+
+    snapshot = _snapshots.get(exchange.value)
+    if snapshot is None or snapshot.version != handle.version:
+        data = await handle.table_data.sort("ticker", "date").collect_async()
+        snapshot = _Snapshot(version=handle.version, data=data)
+        _snapshots[exchange.value] = snapshot
+    return snapshot
+
+
+@router.get("/{exchange}/fields")
+async def list_screener_fields(
+    snapshot: Annotated[_Snapshot, Depends(get_snapshot)],
+) -> dict[str, str]:
+    """Get the columns (& their data types) screens can use"""
+    return {name: str(dtype) for name, dtype in snapshot.data.schema.items()}
+
+
+@router.post("/{exchange}")
+async def screen_tickers(
+    query: ScreenerQuery,
+    snapshot: Annotated[_Snapshot, Depends(get_snapshot)],
+    response_format: Annotated[ResponseFormat, Depends(negotiate_response_format)],
+) -> Response:
+    """Get the latest bar of every `ticker` matching the screen `filter`"""
+    columns = query.columns or [
+        col for col in snapshot.data.columns if col not in ("ticker", "date")
+    ]
+    unknown = [
+        col
+        for col in [*columns, query.sort_by]
+        if col is not None and col not in snapshot.data.schema
+    ]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown columns: {unknown}",
+        )
+    try:
+        plan = snapshot.plan(query.filter)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from e
+
+    result = (
+        snapshot.data
+        .lazy()
+        .filter(plan)
+        .sort(query.sort_by or "ticker", descending=query.descending, nulls_last=True)
+        .select(
+            "ticker", "date", *(col for col in columns if col not in ("ticker", "date"))
+        )
+    )
+    if query.limit is not None:
+        result = result.head(query.limit)
+    result = await result.collect_async()
+    return dataframe_response(result, response_format)
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import uuid
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from api.models import TaskStatus
+
+logger = logging.getLogger("stockdb")
+
+
+class TableBusyError(Exception):
+    """Raised when a write task is submitted for a table which already has an active one."""
+
+
+async def run_in_thread_to_completion(func: Callable, /, *args, **kwargs) -> Any:
+    """
+    Run blocking `func` in a thread, waiting for it to finish even if the caller is cancelled.
+
+    Cancelling an `asyncio.to_thread` call does not stop the thread, so a Delta commit could still be
+    running after its task is reported as cancelled (and the table freed for the next write). Here the
+    cancellation is delivered only once the thread is done.
+    """
+    future = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await future
+        raise
+
+
+@dataclass
+class BackgroundTask:
+    """State of a task submitted to `TaskManager`."""
+
+    name: str
+    table: str
+    task_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: TaskStatus = TaskStatus.pending
+    submitted_at: datetime = field(default_factory=datetime.now)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    result: Any = None
+    error: str | None = None
+    progress: Callable[[], dict] | None = field(default=None, repr=False)
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (TaskStatus.pending, TaskStatus.running)
+
+    def as_dict(self) -> dict:
+        return {
+            "task_id": self.task_id,
+            "name": self.name,
+            "table": self.table,
+            "status": self.status.value,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress() if self.progress else None,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+@dataclass
+class TaskManager:
+    """
+    Runs long operations (downloads, table maintenance) as background asyncio tasks.
+
+    Every task writes to one `table`, only one active task per table is allowed at a time. Finished
+    tasks are kept for status lookups, up to `max_history` of them.
+
+    Attributes
+    ----------
+        max_history : int, optional
+            Maximum finished tasks to keep, by default 100
+    """
+
+    max_history: int = 100
+
+    def __post_init__(self):
+        self._tasks: dict[str, BackgroundTask] = {}
+        # NOTE - strong references, otherwise running asyncio tasks can be garbage collected
+        self._handles: dict[str, asyncio.Task] = {}
+
+    def submit(
+        self,
+        name: str,
+        table: str,
+        job: Coroutine,
+        progress: Callable[[], dict] | None = None,
+    ) -> BackgroundTask:
+        """Schedule `job` coroutine writing to `table`, raises `TableBusyError` if table is in use."""
+        active = self.active_task(table)
+        if active is not None:
+            job.close()
+            raise TableBusyError(
+                f"Task '{active.task_id}' ({active.name}) is already writing to '{table}'"
+            )
+
+        task = BackgroundTask(name=name, table=table, progress=progress)
+        self._tasks[task.task_id] = task
+        handle = asyncio.create_task(self._run(task, job))
+        handle.add_done_callback(lambda _: self._finalize(task, job))
+        self._handles[task.task_id] = handle
+        self._prune()
+        logger.info(f"submitted task {task.task_id} ({name}) for '{table}'")
+        return task
+
+    async def _run(self, task: BackgroundTask, job: Coroutine) -> None:
+        task.status = TaskStatus.running
+        task.started_at = datetime.now()
+        try:
+            task.result = await job
+            task.status = TaskStatus.completed
+        except asyncio.CancelledError:
+            task.status = TaskStatus.cancelled
+            logger.warning(f"task {task.task_id} ({task.name}) cancelled")
+        except Exception as e:
+            task.status = TaskStatus.failed
+            task.error = f"{e.__class__.__name__}: {e}"
+            logger.exception(f"task {task.task_id} ({task.name}) failed")
+        finally:
+            task.finished_at = datetime.now()
+
+    def _finalize(self, task: BackgroundTask, job: Coroutine) -> None:
+        self._handles.pop(task.task_id, None)
+        if task.is_active:
+            # NOTE - task was cancelled before it got to run
+            job.close()
+            task.status = TaskStatus.cancelled
+            task.finished_at = datetime.now()
+
+    def _prune(self) -> None:
+        finished = [t for t in self._tasks.values() if not t.is_active]
+        for task in finished[: max(0, len(finished) - self.max_history)]:
+            del self._tasks[task.task_id]
+
+    def get(self, task_id: str) -> BackgroundTask | None:
+        return self._tasks.get(task_id)
+
+    def list_tasks(self) -> list[BackgroundTask]:
+        """All known tasks, latest first."""
+        return sorted(self._tasks.values(), key=lambda t: t.submitted_at, reverse=True)
+
+    def active_task(self, table: str) -> BackgroundTask | None:
+        return next(
+            (t for t in self._tasks.values() if t.table == table and t.is_active), None
+        )
+
+    def cancel(self, task_id: str) -> bool:
+        """Request cancellation, returns `False` if task is unknown or already finished."""
+        handle = self._handles.get(task_id)
+        if handle is None:
+            return False
+        return handle.cancel()
@@ -8,14 +8,14 @@ from pathlib import Path as Pathlib_Path
 import polars as pl
 from about_time import about_time
 from api import setup
+from api.dependency.utils import stock_db_pool
 from api.models import APITags, StockExchange
-from api.routers import bulk, ops, per_security
+from api.routers import bulk, ops, per_security, screener
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from scalar_fastapi import get_scalar_api_reference
 from stocksense.config import get_settings
-from stocksense.data import StockDataDB
 
 logger = logging.getLogger("stockdb")
 settings = get_settings()
@@ -91,9 +91,7 @@ async def _stockdb_data_health() -> dict:
 
     # Getting data health loop
     for exch in all_exchanges:
-        stock_db = StockDataDB(
-            settings.stockdb.data_base_path / f"{exch}/ticker_history"
-        )
+        stock_db = stock_db_pool.get(exch, "ticker_history")
         count = await stock_db.table_data.select("close").count().collect_async()
         if count.item() == 0:
             all_exchanges[exch] = "NO DATA"
@@ -115,6 +113,7 @@ async def _stockdb_data_health() -> dict:
 app.include_router(per_security.router)
 app.include_router(bulk.router)
 app.include_router(ops.router)
+app.include_router(screener.router)
 
 
 # Scalar interactive docs
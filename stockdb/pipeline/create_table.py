@@ -8,12 +8,24 @@ from rich.console import Console
 from rich.prompt import Confirm, Prompt
 from rich.table import Table
 from stocksense.config import get_settings
+from stocksense.data import (
+    TICKER_HISTORY_PARTITION_COLUMNS,
+    StockDataDB,
+    with_ticker_history_partitions,
+)
+
+from pipeline.job_ledger import create_job_ledger_table
 
 logger = logging.getLogger("stockdb")
 settings = get_settings()
 
 
-def create_ticker_history_table():
+def create_ticker_history_table(partitioned: bool = True):
+    """Create ticker history table for all exchanges.
+
+    With `partitioned`, data is laid out by `ticker_bucket` (stable hash of `ticker`) & `year(date)`,
+    so ticker lookups & date range scans only touch a few files.
+    """
     # SECTION - Create ticker history table
     ticker_history = pl.DataFrame(
         schema={
@@ -27,6 +39,8 @@ def create_ticker_history_table():
             "volume": pl.Int64,
         }
     )
+    if partitioned:
+        ticker_history = with_ticker_history_partitions(ticker_history)
 
     # Creating ticker history table for all exchange
     for exchange in StockExchange:
@@ -39,6 +53,9 @@ def create_ticker_history_table():
                     compression="ZSTD", compression_level=5
                 ),
                 "schema_mode": "overwrite",
+                "partition_by": TICKER_HISTORY_PARTITION_COLUMNS
+                if partitioned
+                else None,
             },
         )
         dt = DeltaTable(
@@ -48,6 +65,59 @@ def create_ticker_history_table():
         logger.info(f"Finished creating table & z-ordering for {exchange.name}")
 
 
+def partition_ticker_history_table():
+    """Migrate existing ticker history tables to `ticker_bucket`/`year` partitioned layout.
+
+    The table is rewritten one ticker bucket at a time, reading from the pre-migration version so
+    memory stays bounded to one bucket. Old files are only removed by a later vacuum, hence the
+    migration can be rolled back with `DeltaTable.restore`.
+    """
+    for exchange in StockExchange:
+        table_path = (
+            settings.stockdb.data_base_path / f"{exchange.value}/ticker_history"
+        )
+        if not DeltaTable.is_deltatable(table_path.as_posix()):
+            logger.warning(f"Skipping {exchange.name}, ticker history table not found")
+            continue
+        stock_db = StockDataDB(table_path)
+        if stock_db.is_ticker_partitioned:
+            logger.info(
+                f"Ticker history table for {exchange.name} is already partitioned"
+            )
+            continue
+
+        logger.info(f"Partitioning ticker history table for {exchange.name}")
+        source_version = stock_db.version
+        source = pl.scan_delta(table_path, version=source_version)
+        buckets = with_ticker_history_partitions(
+            source.select("ticker", "date").unique("ticker").collect()
+        ).partition_by("ticker_bucket")
+        # NOTE - empty table still needs one (empty) write to change its layout
+        buckets = buckets or [pl.DataFrame(schema={"ticker": pl.String})]
+
+        for i, bucket_tickers in enumerate(buckets):
+            data = with_ticker_history_partitions(
+                source.filter(
+                    pl.col("ticker").is_in(bucket_tickers.get_column("ticker"))
+                ).collect()
+            )
+            data.write_delta(
+                table_path,
+                mode="overwrite" if i == 0 else "append",
+                delta_write_options={
+                    "writer_properties": deltalake.WriterProperties(
+                        compression="ZSTD", compression_level=5
+                    ),
+                    "schema_mode": "overwrite" if i == 0 else None,
+                    "partition_by": TICKER_HISTORY_PARTITION_COLUMNS,
+                },
+            )
+        logger.info(
+            f"Finished partitioning {exchange.name} from version {source_version} "
+            f"into {len(buckets)} ticker buckets"
+        )
+
+
 # SECTION - Create equity table
 def create_exchange_equity_table():
     ticker_equity = pl.DataFrame(
@@ -106,6 +176,12 @@ def create_cache_table():
     logger.info("Finished creating table & z-ordering for prompt cache")
 
 
+def create_download_job_ledger_table():
+    """Create job ledger table, which tracks progress of ticker history download jobs"""
+    create_job_ledger_table(settings.stockdb.data_base_path / "common/job_ledger")
+    logger.info("Finished creating job ledger table")
+
+
 def _display_menu(console: Console) -> None:
     """Render a small menu of options using Rich Table."""
     table = Table(title="Create Tables")
@@ -114,6 +190,8 @@ def _display_menu(console: Console) -> None:
     table.add_row("1", "Create ticker history table")
     table.add_row("2", "Create exchange equity table")
     table.add_row("3", "Create prompt cache table")
+    table.add_row("4", "Migrate ticker history table to partitioned layout")
+    table.add_row("5", "Create download job ledger table")
     table.add_row("all", "Create all tables")
     table.add_row("q", "Quit")
     console.print(table)
@@ -126,10 +204,13 @@ def main() -> None:
         "1": create_ticker_history_table,
         "2": create_exchange_equity_table,
         "3": create_cache_table,
+        "4": partition_ticker_history_table,
+        "5": create_download_job_ledger_table,
         "all": lambda: (
             create_ticker_history_table(),
             create_exchange_equity_table(),
             create_cache_table(),
+            create_download_job_ledger_table(),
         ),
     }
 
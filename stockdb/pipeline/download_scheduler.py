@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import polars as pl
+from yfinance.exceptions import YFException
+
+logger = logging.getLogger("stockdb")
+
+# NOTE - network errors (`requests` & `curl_cffi` ones subclass OSError), Yahoo errors & malformed
+# responses failing to collect are worth retrying, anything else is a bug & fails the whole run
+DOWNLOAD_ERRORS: tuple[type[Exception], ...] = (
+    OSError,
+    YFException,
+    pl.exceptions.PolarsError,
+)
+
+
+@dataclass
+class TokenBucket:
+    """
+    Async token bucket rate limiter.
+
+    Attributes
+    ----------
+        rate : float
+            Tokens added per second, i.e. sustained requests per second
+        capacity : int, optional
+            Maximum tokens that can pile up, i.e. allowed burst size, by default 1
+    """
+
+    rate: float
+    capacity: int = 1
+
+    def __post_init__(self):
+        if self.rate <= 0:
+            raise ValueError("Rate must be greater than zero.")
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available & consume it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated_at) * self.rate
+                )
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class BatchResult:
+    """Outcome of a single download batch."""
+
+    batch: int
+    tickers: list[str]
+    data: pl.DataFrame | None = None
+    error: Exception | None = None
+    attempts: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def rows(self) -> int:
+        return 0 if self.data is None else self.data.height
+
+
+@dataclass
+class DownloadProgress:
+    """Live progress of a download run."""
+
+    total_batches: int = 0
+    completed_batches: int = 0
+    failed_batches: int = 0
+    downloaded_rows: int = 0
+    failed_tickers: list[str] = field(default_factory=list)
+    started_at: datetime = field(default_factory=datetime.now)
+
+    @property
+    def finished_batches(self) -> int:
+        return self.completed_batches + self.failed_batches
+
+    def update(self, result: BatchResult) -> None:
+        if result.ok:
+            self.completed_batches += 1
+            self.downloaded_rows += result.rows
+        else:
+            self.failed_batches += 1
+            self.failed_tickers.extend(result.tickers)
+
+    def as_dict(self) -> dict:
+        return {
+            "total_batches": self.total_batches,
+            "completed_batches": self.completed_batches,
+            "failed_batches": self.failed_batches,
+            "downloaded_rows": self.downloaded_rows,
+            "failed_tickers": self.failed_tickers,
+            "started_at": self.started_at,
+        }
+
+
+@dataclass
+class DownloadScheduler:
+    """
+    Runs blocking batch downloads concurrently on a bounded worker pool.
+
+    Each batch runs in a worker thread, so the event loop (and other API requests) is never blocked.
+    Batch starts are throttled by a token bucket & failed batches are retried with exponential
+    backoff. Results are yielded as soon as each batch finishes, a new batch only starts once
+    the consumer has taken a finished one.
+
+    Attributes
+    ----------
+        max_workers : int, optional
+            Maximum batches downloading at the same time, by default 4
+        rate_limit : float, optional
+            Maximum batch requests started per second, by default 1.0
+        max_retries : int, optional
+            Attempts per batch before giving up on it, by default 3
+        backoff : float, optional
+            Base delay in seconds between attempts, doubled after every failure, by default 2.0
+        retry_on : tuple[type[Exception], ...], optional
+            Errors a batch is retried on & finally marked failed with, by default `DOWNLOAD_ERRORS`
+    """
+
+    max_workers: int = 4
+    rate_limit: float = 1.0
+    max_retries: int = 3
+    backoff: float = 2.0
+    retry_on: tuple[type[Exception], ...] = DOWNLOAD_ERRORS
+
+    def __post_init__(self):
+        if self.max_workers <= 0:
+            raise ValueError("Max workers must be greater than zero.")
+        if self.max_retries <= 0:
+            raise ValueError("Max retries must be greater than zero.")
+        self.progress = DownloadProgress()
+
+    async def run(
+        self,
+        batches: list[list[str]],
+        download: Callable[[list[str]], pl.DataFrame],
+    ) -> AsyncIterator[BatchResult]:
+        """Download all `batches` with `download` & yield every `BatchResult` as it completes."""
+        self.progress = DownloadProgress(total_batches=len(batches))
+        limiter = TokenBucket(self.rate_limit)
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def _worker(batch: int, tickers: list[str]) -> BatchResult:
+            # NOTE - slot is released by the consumer side below, after the result is taken, so at
+            # most `max_workers` batches are held in memory even when the consumer is slower
+            await semaphore.acquire()
+            return await self._download_with_retry(batch, tickers, download, limiter)
+
+        tasks = [
+            asyncio.create_task(_worker(batch, tickers))
+            for batch, tickers in enumerate(batches)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                self.progress.update(result)
+                logger.info(
+                    f"batch {result.batch} {'done' if result.ok else 'failed'} "
+                    f"({self.progress.finished_batches}/{self.progress.total_batches}) "
+                    f"with {result.rows} rows in {result.elapsed:.1f}s"
+                )
+                yield result
+                semaphore.release()
+        finally:
+            # NOTE - stopping pending batches if consumer stops early or the run is cancelled
+            for task in tasks:
+                task.cancel()
+
+    async def _download_with_retry(
+        self,
+        batch: int,
+        tickers: list[str],
+        download: Callable[[list[str]], pl.DataFrame],
+        limiter: TokenBucket,
+    ) -> BatchResult:
+        start = time.monotonic()
+        for attempt in range(1, self.max_retries + 1):
+            await limiter.acquire()
+            try:
+                data = await asyncio.to_thread(download, tickers)
+                return BatchResult(
+                    batch,
+                    tickers,
+                    data=data,
+                    attempts=attempt,
+                    elapsed=time.monotonic() - start,
+                )
+            except self.retry_on as e:
+                if attempt == self.max_retries:
+                    logger.error(f"batch {batch} failed after {attempt} attempts: {e}")
+                    return BatchResult(
+                        batch,
+                        tickers,
+                        error=e,
+                        attempts=attempt,
+                        elapsed=time.monotonic() - start,
+                    )
+                delay = self.backoff * 2 ** (attempt - 1)
+                logger.warning(
+                    f"batch {batch} attempt {attempt} failed: {e}, retrying in {delay}s"
+                )
+                await asyncio.sleep(delay)
@@ -0,0 +1,198 @@
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+
+import deltalake
+import polars as pl
+from deltalake import DeltaTable
+from stocksense.data import StockDataDB
+
+from pipeline.download_scheduler import BatchResult
+
+logger = logging.getLogger("stockdb")
+
+JOB_LEDGER_SCHEMA = {
+    "job_id": pl.String,
+    "exchange": pl.String,
+    "mode": pl.String,
+    "start_date": pl.Date,
+    "batch": pl.Int64,
+    "tickers": pl.List(pl.String),
+    "status": pl.String,
+    "rows": pl.Int64,
+    "attempts": pl.Int64,
+    "elapsed": pl.Float64,
+    "error": pl.String,
+    "last_modified": pl.Datetime,
+}
+
+
+def create_job_ledger_table(db_path: Path) -> None:
+    """Create empty job ledger table at `db_path` if it does not exist yet."""
+    if DeltaTable.is_deltatable(str(db_path)):
+        return
+    logger.info("Creating job ledger table")
+    pl.DataFrame(schema=JOB_LEDGER_SCHEMA).write_delta(
+        db_path,
+        mode="ignore",
+        delta_write_options={
+            "writer_properties": deltalake.WriterProperties(
+                compression="ZSTD", compression_level=5
+            ),
+        },
+    )
+
+
+def summarize_jobs(ledger: pl.LazyFrame) -> pl.LazyFrame:
+    """Fold ledger events into one row of current state per job, latest job first."""
+    committed = pl.col("status") == "committed"
+    failed = pl.col("status") == "failed"
+    return (
+        ledger
+        .group_by("job_id")
+        .agg(
+            pl.col("exchange").first(),
+            pl.col("mode").first(),
+            pl.col("start_date").first(),
+            started_at=pl.col("last_modified").min(),
+            last_modified=pl.col("last_modified").max(),
+            total_tickers=pl
+            .col("tickers")
+            .filter(pl.col("status") == "started")
+            .first()
+            .list.len(),
+            committed_tickers=pl
+            .col("tickers")
+            .filter(committed)
+            .list.explode()
+            .n_unique(),
+            committed_batches=committed.sum(),
+            failed_batches=failed.sum(),
+            rows=pl.col("rows").filter(committed).sum(),
+            finished=(pl.col("status") == "finished").any(),
+        )
+        .with_columns(
+            state=pl
+            .when(pl.col("finished") & (pl.col("failed_batches") > 0))
+            .then(pl.lit("finished_with_failures"))
+            .when(pl.col("finished"))
+            .then(pl.lit("finished"))
+            .otherwise(pl.lit("incomplete"))
+        )
+        .drop("finished")
+        .sort("started_at", descending=True)
+    )
+
+
+@dataclass
+class DownloadJob:
+    """Identity of a (possibly resumed) ticker history download job."""
+
+    exchange: str
+    mode: str
+    start_date: date | None
+    tickers: list[str]
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+
+@dataclass
+class JobLedger:
+    """
+    Append-only log of download job events stored in a small Delta table.
+
+    A job writes one `started` row holding all its tickers (and the earliest ticker watermark as
+    `start_date`), one `committed`/`failed` row per batch
+    (written after the batch data is committed) & a `finished` row at the end. Current state of a
+    job is folded from its rows, see `summarize_jobs`.
+
+    Attributes
+    ----------
+        db_path : Path
+            Location of the ledger table, created if missing
+    """
+
+    db_path: Path
+
+    def __post_init__(self):
+        create_job_ledger_table(self.db_path)
+        self._db = StockDataDB(self.db_path)
+
+    def _append(self, job: DownloadJob, events: list[dict]) -> None:
+        now = datetime.now()
+        self._db.write(
+            pl.DataFrame(
+                [
+                    {
+                        "job_id": job.job_id,
+                        "exchange": job.exchange,
+                        "mode": job.mode,
+                        "start_date": job.start_date,
+                        "last_modified": now,
+                        **event,
+                    }
+                    for event in events
+                ],
+                schema=JOB_LEDGER_SCHEMA,
+            ),
+            mode="append",
+        )
+
+    def start(self, job: DownloadJob) -> None:
+        self._append(job, [{"status": "started", "tickers": job.tickers}])
+
+    def record(self, job: DownloadJob, results: list[BatchResult]) -> None:
+        """Record batch results, must only be called once their data is committed."""
+        if results:
+            self._append(
+                job,
+                [
+                    {
+                        "batch": result.batch,
+                        "tickers": result.tickers,
+                        "status": "committed" if result.ok else "failed",
+                        "rows": result.rows,
+                        "attempts": result.attempts,
+                        "elapsed": result.elapsed,
+                        "error": None if result.ok else repr(result.error),
+                    }
+                    for result in results
+                ],
+            )
+
+    def finish(self, job: DownloadJob) -> None:
+        self._append(job, [{"status": "finished"}])
+
+    def resumable_job(self, exchange: str, mode: str) -> DownloadJob | None:
+        """
+        Latest unfinished job of `exchange` & `mode`, with only its not yet committed tickers.
+
+        Returns `None` if the latest such job did finish.
+        """
+        self._db.refresh()
+        events = self._db.polars_filter(
+            (pl.col("exchange") == exchange) & (pl.col("mode") == mode)
+        )
+        latest = summarize_jobs(events).head(1).collect()
+        if latest.is_empty() or latest.item(0, "state") != "incomplete":
+            return None
+
+        job_id = latest.item(0, "job_id")
+        job_events = events.filter(pl.col("job_id") == job_id)
+        started = job_events.filter(pl.col("status") == "started").collect()
+        committed = set(
+            job_events
+            .filter(pl.col("status") == "committed")
+            .select(pl.col("tickers").list.explode())
+            .collect()
+            .to_series()
+            .to_list()
+        )
+        return DownloadJob(
+            exchange=exchange,
+            mode=mode,
+            start_date=started.item(0, "start_date"),
+            tickers=[t for t in started.item(0, "tickers") if t not in committed],
+            job_id=job_id,
+        )
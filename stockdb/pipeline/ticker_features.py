@@ -0,0 +1,392 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import deltalake
+import polars as pl
+from api.models import StockExchange
+from api.tasks import run_in_thread_to_completion
+from deltalake import DeltaTable
+from rich.prompt import Confirm, Prompt
+from stocksense.config import get_settings
+from stocksense.data import StockDataDB
+from stocksense.strategy import TechnicalAnalysis  # noqa: F401 - registers `df.ta`
+from stocksense.strategy.ta.incremental import (
+    IncrementalIndicator,
+    IncrementalState,
+    batch_spec,
+    from_spec,
+)
+
+logger = logging.getLogger("stockdb")
+settings = get_settings()
+
+BAR_COLUMNS = ["date", "ticker", "open", "high", "low", "close", "volume"]
+
+
+def compute_features(
+    bars: pl.DataFrame,
+    specs: list[dict[str, Any]],
+    states: dict[str, list[dict]] | None = None,
+) -> tuple[pl.DataFrame, dict[str, list[dict]]]:
+    """
+    Feed `bars` to incremental indicators of every ticker.
+
+    Tickers starting fresh (e.g. a (re)build) are computed with the batch `df.ta.compute()`
+    expressions over all their bars at once, their indicator states are then rebuilt from their
+    tail bars. Only tickers continuing from a saved state (e.g. a daily update) are fed bar by
+    bar, which is cheap for a few new bars but GIL bound pure python.
+
+    Parameters
+    ----------
+    bars : pl.DataFrame
+        New bars (`BAR_COLUMNS`), sorted by ticker & date
+    specs : list[dict[str, Any]]
+        Incremental indicator specs, see `stocksense.strategy.ta.incremental.from_spec`
+    states : dict[str, list[dict]] | None, optional
+        Saved indicator states of tickers to continue from, other tickers start fresh
+
+    Returns
+    -------
+    tuple[pl.DataFrame, dict[str, list[dict]]]
+        Feature rows (`date`, `ticker` & indicator outputs) of `bars`, and new indicator states
+        of every ticker in `bars`
+    """
+    states = states or {}
+    frames, new_states = [], {}
+    batch_specs = [batch_spec(spec) for spec in specs]
+    fresh = bars.filter(~pl.col("ticker").is_in(list(states)))
+    if None not in batch_specs and not fresh.is_empty():
+        columns = [name for spec in specs for name in from_spec(spec).outputs]
+        features = (
+            fresh.ta
+            .over("ticker")
+            .compute(batch_specs)
+            # NOTE - TA-Lib based indicators warm up with NaN, incremental ones with null
+            .select("date", "ticker", pl.col(columns).fill_nan(None))
+            .collect()
+        )
+        frames.append(features)
+
+        last_rows = {
+            row["ticker"]: row
+            for row in features
+            .group_by("ticker", maintain_order=True)
+            .last()
+            .iter_rows(named=True)
+        }
+        warmup = max((from_spec(spec).warmup for spec in specs), default=0)
+        for (ticker,), ticker_bars in (
+            fresh
+            .group_by("ticker", maintain_order=True)
+            .tail(warmup)
+            .partition_by("ticker", as_dict=True, maintain_order=True)
+            .items()
+        ):
+            indicators = [from_spec(spec) for spec in specs]
+            for indicator in indicators:
+                indicator.warm_up(ticker_bars, last_rows[ticker])
+            new_states[ticker] = [indicator.to_state() for indicator in indicators]
+        bars = bars.filter(pl.col("ticker").is_in(list(states)))
+
+    for (ticker,), ticker_bars in bars.partition_by(
+        "ticker", as_dict=True, maintain_order=True
+    ).items():
+        indicators: list[IncrementalIndicator] = (
+            [IncrementalState.from_state(state) for state in states[ticker]]
+            if ticker in states
+            else [from_spec(spec) for spec in specs]
+        )
+        frames.append(
+            pl.concat(
+                [
+                    ticker_bars.select("date", "ticker"),
+                    *(indicator.run(ticker_bars) for indicator in indicators),
+                ],
+                how="horizontal",
+            )
+        )
+        new_states[ticker] = [indicator.to_state() for indicator in indicators]
+    return pl.concat(frames) if frames else pl.DataFrame(), new_states
+
+
+@dataclass
+class TickerFeatureStore:
+    """
+    Indicator feature store of one exchange, kept in sync with its ticker_history table.
+
+    Feature rows live in `ticker_features` (`date`, `ticker` & one column per indicator output).
+    The incremental state of every ticker's indicators lives in `ticker_features_state` along with
+    the last date it covers, so an update only feeds the bars after it & appends their features.
+
+    Attributes
+    ----------
+        base_path : Path
+            Exchange directory holding the tables, e.g. `<data_base_path>/nse`
+        specs : list[dict[str, Any]]
+            Incremental indicator specs, see `stocksense.strategy.ta.incremental.from_spec`
+    """
+
+    base_path: Path
+    specs: list[dict[str, Any]]
+
+    def __post_init__(self):
+        self.features_path = self.base_path / "ticker_features"
+        self.state_path = self.base_path / "ticker_features_state"
+        # NOTE - states are only valid for the specs they were built with
+        self.spec_key = json.dumps(self.specs, sort_keys=True)
+        self.columns = [name for spec in self.specs for name in from_spec(spec).outputs]
+        if len(set(self.columns)) != len(self.columns):
+            raise ValueError(
+                f"Feature indicators have duplicate outputs: {self.columns}"
+            )
+
+    def load_states(self) -> dict[str, tuple[Any, list[dict]]] | None:
+        """
+        Last date & indicator states of every stored ticker.
+
+        Returns `None` when the store has to be (re)built, i.e. it does not exist yet or was built
+        with other indicator specs.
+        """
+        if not (
+            DeltaTable.is_deltatable(self.state_path.as_posix())
+            and DeltaTable.is_deltatable(self.features_path.as_posix())
+        ):
+            return None
+
+        states = pl.read_delta(self.state_path)
+        if states.is_empty():
+            return {}
+        if (states.get_column("spec") != self.spec_key).any():
+            return None
+        return {
+            ticker: (last_date, json.loads(state))
+            for ticker, last_date, state in states.select(
+                "ticker", "last_date", "state"
+            ).iter_rows()
+        }
+
+    def rollback_uncommitted(self, states: dict[str, tuple[Any, list[dict]]]) -> int:
+        """
+        Delete feature rows newer than their ticker's saved state.
+
+        Features are appended before states are saved, an update that failed in between leaves
+        such rows behind & they would be appended again by the next update.
+        """
+        feature_last_dates = (
+            pl
+            .scan_delta(self.features_path)
+            .group_by("ticker")
+            .agg(last_date=pl.col("date").max())
+            .collect()
+        )
+        predicates = []
+        for ticker, last_date in feature_last_dates.iter_rows():
+            quoted = ticker.replace("'", "''")
+            if ticker not in states:
+                predicates.append(f"ticker = '{quoted}'")
+            elif last_date > states[ticker][0]:
+                predicates.append(
+                    f"(ticker = '{quoted}' AND date > '{states[ticker][0].isoformat()}')"
+                )
+        if not predicates:
+            return 0
+
+        result = DeltaTable(self.features_path).delete(" OR ".join(predicates))
+        logger.warning(f"rolled back uncommitted features of {len(predicates)} tickers")
+        return result.get("num_deleted_rows", 0)
+
+    def pending_tickers(
+        self,
+        ticker_history_table: StockDataDB,
+        states: dict[str, tuple[Any, list[dict]]],
+    ) -> list[str]:
+        """Tickers whose ticker_history has bars after their saved state."""
+        last_dates = ticker_history_table.last_dates().collect()
+        return sorted(
+            ticker
+            for ticker, last_date in last_dates.iter_rows()
+            if ticker not in states or last_date > states[ticker][0]
+        )
+
+    def update(
+        self,
+        ticker_history_table: StockDataDB,
+        tickers: list[str],
+        states: dict[str, tuple[Any, list[dict]]],
+        overwrite: bool = False,
+    ) -> int:
+        """
+        Compute & store features of `tickers` bars after their saved state.
+
+        With `overwrite` both tables are replaced, used for the first commit of a (re)build.
+
+        Returns
+        -------
+        int
+            Number of feature rows written
+        """
+        watermarks = pl.LazyFrame(
+            {
+                "ticker": [t for t in tickers if t in states],
+                "last_date": [states[t][0] for t in tickers if t in states],
+            },
+            schema={
+                "ticker": pl.String,
+                "last_date": ticker_history_table.table_data.collect_schema()["date"],
+            },
+        )
+        bars = (
+            ticker_history_table
+            .polars_filter(ticker_history_table.ticker_predicate(tickers))
+            .select(BAR_COLUMNS)
+            .join(watermarks, on="ticker", how="left")
+            .filter(
+                pl.col("last_date").is_null() | (pl.col("date") > pl.col("last_date"))
+            )
+            .drop("last_date")
+            .sort("ticker", "date")
+            .collect()
+        )
+        if bars.is_empty():
+            return 0
+
+        features, new_states = compute_features(
+            bars, self.specs, {t: states[t][1] for t in tickers if t in states}
+        )
+        # NOTE - `new_states` lists fresh tickers before continuing ones, not in `bars` order
+        last_dates = dict(bars.group_by("ticker").agg(pl.col("date").max()).iter_rows())
+        state_rows = pl.DataFrame(
+            {
+                "ticker": list(new_states),
+                "last_date": [last_dates[ticker] for ticker in new_states],
+                "state": [json.dumps(state) for state in new_states.values()],
+                "spec": self.spec_key,
+            },
+            schema_overrides={"last_date": bars.schema["date"]},
+        )
+
+        writer_properties = deltalake.WriterProperties(
+            compression="ZSTD", compression_level=5
+        )
+        # NOTE - features first, states last. See `rollback_uncommitted` for the failure in between
+        features.write_delta(
+            self.features_path,
+            mode="overwrite" if overwrite else "append",
+            delta_write_options={
+                "writer_properties": writer_properties,
+                "schema_mode": "overwrite" if overwrite else None,
+            },
+        )
+        if overwrite:
+            state_rows.write_delta(
+                self.state_path,
+                mode="overwrite",
+                delta_write_options={
+                    "writer_properties": writer_properties,
+                    "schema_mode": "overwrite",
+                },
+            )
+        else:
+            (
+                state_rows
+                .write_delta(
+                    self.state_path,
+                    mode="merge",
+                    delta_merge_options={
+                        "writer_properties": writer_properties,
+                        "source_alias": "s",
+                        "target_alias": "t",
+                        "predicate": "s.ticker = t.ticker",
+                    },
+                )
+                .when_matched_update_all()
+                .when_not_matched_insert_all()
+                .execute()
+            )
+        return features.height
+
+
+async def update_ticker_features(
+    exchange: StockExchange, rebuild: bool = False
+) -> dict:
+    """
+    Bring the `{exchange}/ticker_features` table up to date with its ticker_history table.
+
+    Only bars after each ticker's last stored feature are computed, continuing from the saved
+    incremental indicator state, so a daily update costs in proportion to the day's bars. The
+    store is rebuilt from the entire history when it does not exist yet, when the configured
+    `feature_indicators` changed or when `rebuild` is requested. Nothing is done when no
+    `feature_indicators` are configured.
+
+    Parameters
+    ----------
+    exchange : StockExchange
+        Exchange to update
+    rebuild : bool, optional
+        Recompute features of the entire history, by default False
+
+    Returns
+    -------
+    dict
+        Number of updated tickers & written feature rows, and whether the store was rebuilt
+    """
+    if not settings.stockdb.feature_indicators:
+        logger.info("no feature indicators configured, feature store is disabled")
+        return {"rebuilt": False, "num_tickers": 0, "num_rows": 0}
+
+    store = TickerFeatureStore(
+        settings.stockdb.data_base_path / exchange.value,
+        settings.stockdb.feature_indicators,
+    )
+    ticker_history_table = StockDataDB(
+        settings.stockdb.data_base_path / f"{exchange.value}/ticker_history"
+    )
+
+    states = None if rebuild else await run_in_thread_to_completion(store.load_states)
+    rebuild = states is None
+    if rebuild:
+        logger.info(f"building feature store of {exchange.value} from entire history")
+        states = {}
+    else:
+        await run_in_thread_to_completion(store.rollback_uncommitted, states)
+
+    tickers = await run_in_thread_to_completion(
+        store.pending_tickers, ticker_history_table, states
+    )
+    logger.info(f"updating features of {len(tickers)} tickers")
+
+    batch_size = settings.stockdb.feature_batch_size
+    num_rows = 0
+    for i in range(0, len(tickers), batch_size):
+        # NOTE - computing features is CPU bound, running it in a thread keeps the event loop
+        # free. Every batch is committed, so a failure keeps the earlier batches
+        num_rows += await run_in_thread_to_completion(
+            store.update,
+            ticker_history_table,
+            tickers[i : i + batch_size],
+            states,
+            overwrite=rebuild and i == 0,
+        )
+
+    result = {"rebuilt": rebuild, "num_tickers": len(tickers), "num_rows": num_rows}
+    logger.info(f"updated {store.features_path} with following result: {result}")
+    return result
+
+
+if __name__ == "__main__":
+    logger.setLevel(logging.INFO)
+    selected_exc = Prompt.ask(
+        "Choose exchange to update features of",
+        choices=StockExchange._member_names_,
+        default=StockExchange.nse.value,
+        case_sensitive=False,
+    ).lower()
+    rebuild = Confirm.ask("Rebuild from entire history?", default=False)
+
+    asyncio.run(
+        update_ticker_features(getattr(StockExchange, selected_exc), rebuild=rebuild)
+    )
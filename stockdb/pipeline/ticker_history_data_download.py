@@ -1,19 +1,21 @@
 import asyncio
 import logging
 from datetime import date, timedelta
+from functools import partial
 
 import polars as pl
-from api.models import StockExchange
-from rich.progress import track
+from api.models import StockExchange, TickerHistoryDownloadMode
+from api.tasks import run_in_thread_to_completion
+from rich.progress import Progress
 from rich.prompt import Prompt
 from stocksense.config import get_settings
-from stocksense.data import (
-    Interval,
-    Period,
-    StockDataDB,
-    StockExchangeYahooIdentifier,
-    YFStockData,
-)
+from stocksense.data import StockDataDB, YFStockData
+from stocksense.types import DataInterval, DataPeriod, StockExchangeYahooIdentifier
+
+from pipeline.download_scheduler import BatchResult, DownloadScheduler
+from pipeline.job_ledger import DownloadJob, JobLedger
+from pipeline.ticker_features import update_ticker_features
+from pipeline.ticker_snapshot import update_ticker_snapshot
 
 logger = logging.getLogger("stockdb")
 settings = get_settings()
@@ -74,7 +76,7 @@ def download_specific_date_ticker_history(
         exchange_market=getattr(StockExchangeYahooIdentifier, exchange.value),
     )
     result = yf.get_ticker_history(
-        start=start_date, end=today, interval=Interval.ONE_DAY
+        start=start_date, end=today, interval=DataInterval.ONE_DAY
     )
 
     return (
@@ -103,7 +105,7 @@ def download_entire_ticker_history(
         exchange_market=getattr(StockExchangeYahooIdentifier, exchange.value),
     )
     logger.debug("downloading entire historical data")
-    result = yf.get_ticker_history(period=Period.MAX, interval=Interval.ONE_DAY)
+    result = yf.get_ticker_history(period=DataPeriod.MAX, interval=DataInterval.ONE_DAY)
 
     return (
         pl
@@ -123,80 +125,221 @@ def download_entire_ticker_history(
     )
 
 
+async def get_ticker_watermarks(
+    ticker_history_table: StockDataDB, tickers: list[str]
+) -> dict[str, date | None]:
+    """Last stored date of every ticker in one aggregated scan, `None` for tickers without history"""
+    last_dates = await ticker_history_table.last_dates(tickers).collect_async()
+    watermarks = dict.fromkeys(tickers)
+    watermarks.update(
+        zip(
+            last_dates.get_column("ticker"),
+            last_dates.get_column("last_date").dt.date(),
+        )
+    )
+    return watermarks
+
+
+def plan_batches(
+    watermarks: dict[str, date | None], batch_size: int
+) -> list[list[str]]:
+    """
+    Group tickers by their watermark & split every group into batches of up to `batch_size`.
+
+    Every batch then shares a single start date, so it requests exactly the range its tickers miss.
+    """
+    groups: dict[date | None, list[str]] = {}
+    for ticker, last_date in watermarks.items():
+        groups.setdefault(last_date, []).append(ticker)
+    return [
+        group[batch * batch_size : (batch + 1) * batch_size]
+        for group in groups.values()
+        for batch in range(calculate_batches(len(group), batch_size=batch_size))
+    ]
+
+
+def _download_batch(
+    exchange: StockExchange, watermarks: dict[str, date | None], ticker: list[str]
+) -> pl.DataFrame:
+    """Download & collect one batch, runs inside a scheduler worker thread"""
+    logger.debug(f"current tickers: \n{ticker}")
+    # NOTE - all tickers of a batch share the same watermark, see `plan_batches`
+    last_run_date = watermarks[ticker[0]]
+    if last_run_date is None:
+        return download_entire_ticker_history(exchange, ticker).collect()
+    return download_specific_date_ticker_history(
+        exchange, ticker, last_run_date
+    ).collect()
+
+
+async def _flush(
+    ticker_history_table: StockDataDB,
+    ledger: JobLedger,
+    job: DownloadJob,
+    buffered_results: list[BatchResult],
+) -> dict:
+    """Upsert buffered batches into ticker_history & then mark them committed in the job ledger"""
+    buffered_data = [r.data for r in buffered_results if r.ok and r.rows]
+    result = {}
+    if buffered_data:
+        data = pl.concat(buffered_data, how="vertical")
+        logger.info(f"flushing {len(buffered_data)} batches with {data.height} rows")
+        # NOTE - upsert is blocking, running it in a thread so the event loop stays free. A cancelled
+        # job still waits for the running commit, so the table is never left mid-write
+        result = await run_in_thread_to_completion(ticker_history_table.upsert, data)
+    # NOTE - ledger is written only after data is committed, a crash in between just makes the
+    # resumed job download these batches again, which upsert handles idempotently
+    await run_in_thread_to_completion(ledger.record, job, buffered_results)
+    return result
+
+
+def _add_merge_metrics(total: dict, metrics: dict) -> None:
+    """Accumulate numeric merge metrics of every flush into `total`"""
+    for key, value in metrics.items():
+        if isinstance(value, (int, float)):
+            total[key] = total.get(key, 0) + value
+    total["num_flushes"] = total.get("num_flushes", 0) + 1
+
+
 async def download_ticker_history(
-    exchange: StockExchange, full_download: bool = False
+    exchange: StockExchange,
+    full_download: bool = False,
+    scheduler: DownloadScheduler | None = None,
+    resume: bool = True,
 ) -> dict:
+    """
+    Download ticker history for every equity of `exchange` & merge it into its ticker_history table.
+
+    In incremental mode every ticker is downloaded from its own last stored date (watermark), so a
+    ticker that failed earlier catches up & a newly listed ticker gets its entire history.
+
+    Every run is recorded as a job in the `common/job_ledger` table. If the latest job of the same
+    exchange & mode did not finish, it is resumed: only its not yet committed tickers are downloaded.
+
+    Parameters
+    ----------
+    exchange : StockExchange
+        Exchange to download
+    full_download : bool, optional
+        Download entire history instead of only new dates, by default False
+    scheduler : DownloadScheduler | None, optional
+        Scheduler to run batches with, pass it to follow `scheduler.progress` while the job runs.
+        By default one is created from the `stockdb` settings
+    resume : bool, optional
+        Resume the latest unfinished job instead of starting a new one, by default True
+
+    Returns
+    -------
+    dict
+        Merge metrics of the ticker_history table along with the `job_id`
+    """
     batch_size = settings.stockdb.download_batch_size
-    tickers = (
-        await pl
-        .scan_delta(settings.stockdb.data_base_path / f"{exchange.value}/equity")
-        .select(pl.col("symbol").alias("ticker"))
-        .collect_async()
+    mode = (
+        TickerHistoryDownloadMode.full
+        if full_download
+        else TickerHistoryDownloadMode.incremental
     )
-    ticker_length = tickers.count()
+    if scheduler is None:
+        scheduler = DownloadScheduler(
+            max_workers=settings.stockdb.download_workers,
+            rate_limit=settings.stockdb.download_rate_limit,
+            max_retries=settings.stockdb.download_max_retries,
+        )
+    ledger = JobLedger(settings.stockdb.data_base_path / "common/job_ledger")
     ticker_history_table = StockDataDB(
         settings.stockdb.data_base_path / f"{exchange.value}/ticker_history"
     )
-    logger.debug(f"total tickers: {ticker_length}")
 
-    # getting latest date to run the insert job
-    logger.info("getting last inserted date")
-
-    latest_date_df = (
-        await ticker_history_table.table_data
-        .select(pl.col("date").max())  # to get latest available date
-        # NOTE - polars return null row if no date found, which makes `is_empty()` `False`
-        .filter(~pl.col("date").is_null())
-        .collect_async()
-    )
+    job = ledger.resumable_job(exchange.value, mode.value) if resume else None
+    if job is not None:
+        logger.info(
+            f"resuming job {job.job_id} with {len(job.tickers)} remaining tickers"
+        )
+        tickers = job.tickers
+    else:
+        tickers = (
+            (
+                await pl
+                .scan_delta(
+                    settings.stockdb.data_base_path / f"{exchange.value}/equity"
+                )
+                .select(pl.col("symbol"))
+                .collect_async()
+            )
+            .get_column("symbol")
+            .to_list()
+        )
+    logger.debug(f"total tickers: {len(tickers)}")
 
-    # Determining mode to run from - 'max' or 'last run date'
+    # Determining what to download for every ticker - 'max' or after its own last date
     if full_download:
-        use_max = True
+        watermarks = dict.fromkeys(tickers)
         logger.info("full download requested, running for max date")
-    elif latest_date_df.is_empty():
-        use_max = True
-        logger.info(f"no data found for {exchange}, running for max date")
     else:
-        use_max = False
-        logger.info(f"last inserted date was: {latest_date_df.item()}")
+        logger.info("getting last inserted date of every ticker")
+        watermarks = await get_ticker_watermarks(ticker_history_table, tickers)
+        today = date.today()
+        up_to_date = [t for t, d in watermarks.items() if d is not None and d >= today]
+        for ticker in up_to_date:
+            del watermarks[ticker]
+        logger.info(
+            f"{len(up_to_date)} tickers are up to date, "
+            f"{sum(d is None for d in watermarks.values())} tickers have no history yet"
+        )
+
+    if job is None:
+        job = DownloadJob(
+            exchange=exchange.value,
+            mode=mode.value,
+            start_date=min((d for d in watermarks.values() if d), default=None),
+            tickers=tickers,
+        )
+        await run_in_thread_to_completion(ledger.start, job)
+        logger.info(f"started job {job.job_id}")
 
     # running batch job
-    batched_data = []
-    no_of_batches = calculate_batches(ticker_length.item(), batch_size=batch_size)
-    for batch in track(
-        range(no_of_batches),
-        description="Downloading ticker history data",
-        total=no_of_batches,
-    ):
-        current_tickers = (
-            tickers
-            .slice(batch * batch_size, batch_size)
-            .select("ticker")
-            .to_series()
-            .to_list()
+    batches = plan_batches(watermarks, batch_size)
+    no_of_batches = len(batches)
+    # NOTE - downloaded batches are buffered & flushed as separate merge commits once either
+    # limit is hit, so memory stays bounded & already committed batches survive a later failure
+    flush_batches = settings.stockdb.download_flush_batches
+    flush_rows = settings.stockdb.download_flush_rows
+    buffered_results: list[BatchResult] = []
+    result: dict = {}
+    with Progress() as progress_bar:
+        task = progress_bar.add_task(
+            "Downloading ticker history data", total=no_of_batches
         )
-        logger.debug(f"current tickers: \n{current_tickers}")
-        if use_max:
-            batched_data.append(
-                download_entire_ticker_history(exchange, current_tickers)
-            )
-        else:
-            batched_data.append(
-                download_specific_date_ticker_history(
-                    exchange,
-                    current_tickers,
-                    latest_date_df.select("date").item(0, 0),
+        async for batch_result in scheduler.run(
+            batches, partial(_download_batch, exchange, watermarks)
+        ):
+            buffered_results.append(batch_result)
+            if len(buffered_results) >= flush_batches or (
+                sum(r.rows for r in buffered_results) >= flush_rows
+            ):
+                _add_merge_metrics(
+                    result,
+                    await _flush(ticker_history_table, ledger, job, buffered_results),
                 )
-            )
+                buffered_results = []
+            progress_bar.advance(task)
 
-    complete_ticker_history_data = pl.concat(batched_data, how="vertical")
-    logger.info("downloading complete of ticker history data")
+    if buffered_results:
+        _add_merge_metrics(
+            result, await _flush(ticker_history_table, ledger, job, buffered_results)
+        )
 
-    # merging data into respective deltalake table
-    result = ticker_history_table.merge(
-        await complete_ticker_history_data.collect_async()
-    )
+    if scheduler.progress.failed_batches:
+        logger.error(
+            f"{scheduler.progress.failed_batches} batches failed, skipped tickers: "
+            f"{scheduler.progress.failed_tickers}"
+        )
+    if scheduler.progress.failed_batches and not scheduler.progress.completed_batches:
+        # NOTE - job is left unfinished, so the next run resumes it
+        raise RuntimeError(f"all ticker history batches failed for {exchange.value}")
+
+    await run_in_thread_to_completion(ledger.finish, job)
+    result["job_id"] = job.job_id
     logger.info(
         f"successfully merged data into {ticker_history_table.db_path} with following result: {result}"
     )
@@ -212,4 +355,7 @@ if __name__ == "__main__":
         case_sensitive=False,
     ).lower()
 
-    asyncio.run(download_ticker_history(getattr(StockExchange, selected_exc)))
+    exchange = getattr(StockExchange, selected_exc)
+    asyncio.run(download_ticker_history(exchange))
+    asyncio.run(update_ticker_features(exchange))
+    asyncio.run(update_ticker_snapshot(exchange))
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+from datetime import timedelta
+from pathlib import Path
+
+import deltalake
+import polars as pl
+from api.models import StockExchange
+from api.tasks import run_in_thread_to_completion
+from deltalake import DeltaTable
+from rich.prompt import Prompt
+from stocksense.config import get_settings
+
+logger = logging.getLogger("stockdb")
+settings = get_settings()
+
+EQUITY_COLUMNS = ["index_symbol", "series"]
+
+
+def build_snapshot(
+    base_path: Path,
+    num_bars: int,
+    max_age: timedelta | None = None,
+    features: bool = True,
+) -> pl.DataFrame:
+    """
+    Latest `num_bars` bars of every ticker, joined with their features & equity info.
+
+    Parameters
+    ----------
+    base_path : Path
+        Exchange directory holding the tables, e.g. `<data_base_path>/nse`
+    num_bars : int
+        Bars kept per ticker, screens can look back `num_bars - 1` bars
+    max_age : timedelta | None, optional
+        Leave out tickers whose latest bar is older than the exchange's latest bar by more than
+        `max_age` (e.g. delisted ones), by default every ticker is kept
+    features : bool, optional
+        Join the `ticker_features` indicator columns, by default True
+
+    Returns
+    -------
+    pl.DataFrame
+        `ticker_history` columns, `ticker_features` indicator columns & `EQUITY_COLUMNS` (when
+        those tables exist), sorted by ticker & date
+    """
+    history = pl.scan_delta(base_path / "ticker_history")
+    columns = [
+        col
+        for col in history.collect_schema().names()
+        if col not in ("ticker_bucket", "year")
+    ]
+    # NOTE - top k per group keeps only `num_bars` rows of a ticker in memory while scanning
+    snapshot = (
+        history
+        .group_by("ticker")
+        .agg(pl.exclude("ticker").top_k_by("date", num_bars))
+        .explode(pl.exclude("ticker"))
+        .select(columns)
+    )
+    if max_age is not None:
+        snapshot = snapshot.filter(
+            pl.col("date").max().over("ticker") >= pl.col("date").max() - max_age
+        )
+
+    features_path = base_path / "ticker_features"
+    if features and DeltaTable.is_deltatable(features_path.as_posix()):
+        snapshot = snapshot.join(
+            pl.scan_delta(features_path), on=["ticker", "date"], how="left"
+        )
+
+    equity_path = base_path / "equity"
+    if DeltaTable.is_deltatable(equity_path.as_posix()):
+        equity = pl.scan_delta(equity_path)
+        snapshot = snapshot.join(
+            equity.select(
+                pl.col("symbol").str.to_uppercase().alias("ticker"),
+                *(
+                    col
+                    for col in EQUITY_COLUMNS
+                    if col in equity.collect_schema().names()
+                ),
+            ).unique("ticker"),
+            on="ticker",
+            how="left",
+        )
+    return snapshot.sort("ticker", "date").collect()
+
+
+def write_snapshot(
+    base_path: Path,
+    num_bars: int,
+    max_age: timedelta | None = None,
+    features: bool = True,
+) -> int:
+    """Replace the `ticker_snapshot` table with a fresh `build_snapshot`, returns its rows."""
+    snapshot = build_snapshot(base_path, num_bars, max_age, features)
+    snapshot.write_delta(
+        base_path / "ticker_snapshot",
+        mode="overwrite",
+        delta_write_options={
+            "writer_properties": deltalake.WriterProperties(
+                compression="ZSTD", compression_level=5
+            ),
+            "schema_mode": "overwrite",
+        },
+    )
+    return snapshot.height
+
+
+async def update_ticker_snapshot(exchange: StockExchange) -> dict:
+    """
+    Rebuild the `{exchange}/ticker_snapshot` table screens run on.
+
+    The snapshot is small (`screener_bars` bars per ticker), rebuilding it after every download is
+    cheaper than keeping it in sync & lets screens be answered without scanning the history.
+
+    Parameters
+    ----------
+    exchange : StockExchange
+        Exchange to update
+
+    Returns
+    -------
+    dict
+        Number of snapshot rows
+    """
+    base_path = settings.stockdb.data_base_path / exchange.value
+    num_rows = await run_in_thread_to_completion(
+        write_snapshot,
+        base_path,
+        settings.stockdb.screener_bars,
+        timedelta(days=settings.stockdb.screener_max_age),
+        # NOTE - a `ticker_features` table left from before the feature store was disabled is stale
+        bool(settings.stockdb.feature_indicators),
+    )
+    result = {"num_rows": num_rows}
+    snapshot_path = base_path / "ticker_snapshot"
+    logger.info(f"updated {snapshot_path} with following result: {result}")
+    return result
+
+
+if __name__ == "__main__":
+    logger.setLevel(logging.INFO)
+    selected_exc = Prompt.ask(
+        "Choose exchange to update snapshot of",
+        choices=StockExchange._member_names_,
+        default=StockExchange.nse.value,
+        case_sensitive=False,
+    ).lower()
+
+    asyncio.run(update_ticker_snapshot(getattr(StockExchange, selected_exc)))
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+from api.models import TaskStatus
+from api.tasks import TableBusyError, TaskManager
+
+
+async def _job(seconds: float, result: str = "done") -> str:
+    await asyncio.sleep(seconds)
+    return result
+
+
+async def _failing_job() -> None:
+    raise ValueError("boom")
+
+
+@pytest.mark.asyncio
+async def test_task_manager_runs_task_in_background():
+    manager = TaskManager()
+    task = manager.submit("job", "nse/ticker_history", _job(0.01))
+    assert task.status == TaskStatus.pending
+
+    await asyncio.sleep(0.05)
+    assert task.status == TaskStatus.completed
+    assert task.result == "done"
+    assert manager.get(task.task_id) is task
+
+
+@pytest.mark.asyncio
+async def test_task_manager_one_active_task_per_table():
+    manager = TaskManager()
+    task = manager.submit("job", "nse/ticker_history", _job(1))
+
+    with pytest.raises(TableBusyError):
+        manager.submit("other job", "nse/ticker_history", _job(0))
+    # different table is free
+    manager.submit("other job", "bse/ticker_history", _job(0))
+
+    assert manager.cancel(task.task_id)
+    await asyncio.sleep(0.01)
+    assert task.status == TaskStatus.cancelled
+    assert not manager.cancel(task.task_id)
+    # table is free again once its task is finished
+    manager.submit("job", "nse/ticker_history", _job(0))
+
+
+@pytest.mark.asyncio
+async def test_task_manager_failed_task():
+    manager = TaskManager()
+    task = manager.submit("job", "nse/ticker_history", _failing_job())
+
+    await asyncio.sleep(0.01)
+    assert task.status == TaskStatus.failed
+    assert task.error == "ValueError: boom"
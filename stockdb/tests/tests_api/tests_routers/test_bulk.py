@@ -0,0 +1,69 @@
+from collections.abc import AsyncGenerator
+
+import polars as pl
+import pytest
+import pytest_asyncio
+from api.models import Interval, Period
+from httpx import ASGITransport, AsyncClient
+from main import app
+
+
+@pytest_asyncio.fixture(scope="module")
+async def async_client() -> AsyncGenerator[AsyncClient, None]:
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_bulk_ticker_history_long(async_client: AsyncClient):
+    response = await async_client.post(
+        url="/api/bulk/nse/history",
+        json={
+            "ticker": ["tcs", "infy"],
+            "period": Period.ONE_MONTH.value,
+            "interval": Interval.ONE_DAY.value,
+        },
+    )
+    assert response.status_code == 200
+
+    result = pl.DataFrame(response.json())
+    assert sorted(result.get_column("ticker").unique().to_list()) == ["INFY", "TCS"]
+    counts = result.group_by("ticker").len()
+    assert counts.get_column("len").is_between(1, 30).all()
+
+
+@pytest.mark.asyncio
+async def test_bulk_ticker_history_grouped_index(async_client: AsyncClient):
+    response = await async_client.post(
+        url="/api/bulk/nse/history",
+        json={
+            "index": "NIFTY 50",
+            "period": Period.THREE_MONTHS.value,
+            "interval": Interval.ONE_WEEK.value,
+            "layout": "grouped",
+        },
+        headers={"Accept": "application/vnd.apache.arrow.stream"},
+    )
+    assert response.status_code == 200
+
+    result = pl.read_ipc_stream(response.content)
+    assert result.columns == ["exchange", "ticker", "history"]
+    assert result.get_column("ticker").is_unique().all()
+    assert (result.get_column("history").list.len() > 0).all()
+
+
+@pytest.mark.asyncio
+async def test_bulk_ticker_history_invalid_input(async_client: AsyncClient):
+    # ticker & index are mutually exclusive
+    response = await async_client.post(
+        url="/api/bulk/nse/history", json={"ticker": ["tcs"], "index": "NIFTY 50"}
+    )
+    assert response.status_code == 422
+
+    response = await async_client.post(
+        url="/api/bulk/nse/history",
+        json={"ticker": ["tcs"], "interval": Interval.ONE_MINUTE.value},
+    )
+    assert response.status_code == 400
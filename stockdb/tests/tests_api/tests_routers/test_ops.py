@@ -0,0 +1,38 @@
+from collections.abc import AsyncGenerator
+from datetime import datetime
+
+import polars as pl
+import pytest
+import pytest_asyncio
+from api.routers import ops
+from httpx import ASGITransport, AsyncClient
+from main import app
+from stocksense.data import StockDataDBPool
+
+
+@pytest_asyncio.fixture
+async def async_client() -> AsyncGenerator[AsyncClient, None]:
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_daily_download_no_new_data(
+    tmp_path, monkeypatch, async_client: AsyncClient
+):
+    pl.DataFrame({
+        "date": [datetime.now()],
+        "ticker": ["TCS"],
+        "close": [10.0],
+    }).write_delta(tmp_path / "nse/ticker_history")
+    monkeypatch.setattr(ops, "stock_db_pool", StockDataDBPool(tmp_path))
+
+    response = await async_client.post(
+        "/api/operation/download/ticker/history",
+        json={"exchange": "nse", "task_mode": "auto"},
+    )
+    # NOTE - no task is submitted, `202` is kept for responses carrying a `task_id`
+    assert response.status_code == 200
+    assert response.json() == {"message": "No new data to download"}
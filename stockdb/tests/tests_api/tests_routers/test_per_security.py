@@ -111,6 +111,39 @@ async def test_ticker_history_tcs_date(
     assert dates_and_interval_1w_result.select("close").count().collect().item() == 13
 
 
+@pytest.mark.asyncio
+async def test_ticker_history_tcs_columnar_format(
+    async_client: AsyncClient, nse_stock_data: pl.LazyFrame
+):
+    params = {"period": Period.ONE_MONTH.value, "interval": Interval.ONE_DAY.value}
+    json_response = await async_client.get(
+        url="/api/per-security/nse/tcs/history", params=params
+    )
+    arrow_response = await async_client.get(
+        url="/api/per-security/nse/tcs/history",
+        params=params,
+        headers={"Accept": "application/vnd.apache.arrow.stream"},
+    )
+    parquet_response = await async_client.get(
+        url="/api/per-security/nse/tcs/history",
+        params=params,
+        headers={"Accept": "application/x-parquet"},
+    )
+    assert arrow_response.status_code == 200
+    assert parquet_response.status_code == 200
+    assert (
+        arrow_response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    )
+    assert parquet_response.headers["content-type"] == "application/x-parquet"
+
+    arrow_result = pl.read_ipc_stream(arrow_response.content)
+    parquet_result = pl.read_parquet(parquet_response.content)
+    # columnar formats keep the table dtypes as-is
+    assert arrow_result.schema == nse_stock_data.collect_schema()
+    assert arrow_result.equals(parquet_result)
+    assert arrow_result.height == len(json_response.json())
+
+
 @pytest.mark.asyncio
 async def test_ticker_query_simple(async_client: AsyncClient):
     simple_query1 = "select * from self where ticker = 'TCS' limit 5"
@@ -0,0 +1,97 @@
+from collections.abc import AsyncGenerator
+from datetime import date
+
+import polars as pl
+import pytest
+import pytest_asyncio
+from api.routers import screener
+from httpx import ASGITransport, AsyncClient
+from main import app
+from stocksense.data import StockDataDBPool
+
+
+@pytest.fixture
+def snapshot_pool(tmp_path, monkeypatch) -> StockDataDBPool:
+    pl.DataFrame({
+        "ticker": ["TCS", "TCS", "INFY", "INFY"],
+        "date": [date(2024, 1, 1), date(2024, 1, 2)] * 2,
+        "close": [10.0, 12.0, 20.0, 18.0],
+        "RSI_14": [40.0, 25.0, 50.0, 20.0],
+        "index_symbol": [["NIFTY 50", "NIFTY IT"]] * 2 + [["NIFTY 50"]] * 2,
+    }).write_delta(tmp_path / "nse/ticker_snapshot")
+    pool = StockDataDBPool(tmp_path)
+    monkeypatch.setattr(screener, "stock_db_pool", pool)
+    monkeypatch.setattr(screener, "_snapshots", {})
+    return pool
+
+
+@pytest_asyncio.fixture
+async def async_client() -> AsyncGenerator[AsyncClient, None]:
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_screen(snapshot_pool: StockDataDBPool, async_client: AsyncClient):
+    response = await async_client.get("/api/screener/nse/fields")
+    assert response.status_code == 200
+    assert response.json()["index_symbol"] == "List(String)"
+
+    response = await async_client.post(
+        "/api/screener/nse",
+        json={
+            "filter": "RSI_14 < 30 and index_symbol contains 'NIFTY 50'",
+            "columns": ["close"],
+            "sort_by": "close",
+            "descending": True,
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"ticker": "INFY", "date": "2024-01-02", "close": 18.0},
+        {"ticker": "TCS", "date": "2024-01-02", "close": 12.0},
+    ]
+
+    response = await async_client.post(
+        "/api/screener/nse", json={"filter": "close > close[1]", "limit": 5}
+    )
+    assert [row["ticker"] for row in response.json()] == ["TCS"]
+
+
+@pytest.mark.asyncio
+async def test_screen_sees_new_snapshot(
+    snapshot_pool: StockDataDBPool, async_client: AsyncClient
+):
+    query = {"filter": "close > 15"}
+    response = await async_client.post("/api/screener/nse", json=query)
+    assert [row["ticker"] for row in response.json()] == ["INFY"]
+
+    pl.DataFrame({
+        "ticker": ["TCS", "INFY"],
+        "date": [date(2024, 1, 3)] * 2,
+        "close": [16.0, 14.0],
+        "RSI_14": [60.0, 10.0],
+        "index_symbol": [["NIFTY 50", "NIFTY IT"], ["NIFTY 50"]],
+    }).write_delta(snapshot_pool.base_path / "nse/ticker_snapshot", mode="append")
+    response = await async_client.post("/api/screener/nse", json=query)
+    assert [row["ticker"] for row in response.json()] == ["TCS"]
+
+
+@pytest.mark.asyncio
+async def test_screen_invalid(
+    snapshot_pool: StockDataDBPool, async_client: AsyncClient
+):
+    for query in (
+        {"filter": "RSI_15 < 30"},
+        {"filter": "close >"},
+        {"filter": "close > 1", "sort_by": "SMA_200"},
+    ):
+        response = await async_client.post("/api/screener/nse", json=query)
+        assert response.status_code == 400
+
+    response = await async_client.post(
+        "/api/screener/nyse", json={"filter": "close > 1"}
+    )
+    assert response.status_code == 404
@@ -0,0 +1,44 @@
+import polars as pl
+import pytest
+from pipeline.download_scheduler import DownloadScheduler
+from yfinance.exceptions import YFRateLimitError
+
+
+def test_scheduler_needs_an_attempt():
+    with pytest.raises(ValueError, match="Max retries"):
+        DownloadScheduler(max_retries=0)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_retries_download_errors():
+    calls = []
+
+    def download(tickers: list[str]) -> pl.DataFrame:
+        calls.append(tickers)
+        if tickers == ["INFY"] and len(calls) < 3:
+            raise ConnectionError("connection reset")
+        if tickers == ["WIPRO"]:
+            raise YFRateLimitError()
+        return pl.DataFrame({"ticker": tickers})
+
+    scheduler = DownloadScheduler(rate_limit=1000, max_retries=2, backoff=0)
+    results = {
+        result.batch: result
+        async for result in scheduler.run([["TCS"], ["INFY"], ["WIPRO"]], download)
+    }
+
+    assert results[0].ok and results[0].attempts == 1
+    assert results[1].ok and results[1].rows == 1
+    assert isinstance(results[2].error, YFRateLimitError) and results[2].attempts == 2
+    assert scheduler.progress.failed_tickers == ["WIPRO"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_raises_unexpected_errors():
+    def download(tickers: list[str]) -> pl.DataFrame:
+        raise KeyError(tickers[0])
+
+    scheduler = DownloadScheduler(rate_limit=1000, backoff=0)
+    with pytest.raises(KeyError):
+        async for _ in scheduler.run([["TCS"]], download):
+            pass
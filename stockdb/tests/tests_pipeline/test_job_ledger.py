@@ -0,0 +1,52 @@
+from datetime import date
+
+import polars as pl
+import pytest
+from pipeline.download_scheduler import BatchResult
+from pipeline.job_ledger import DownloadJob, JobLedger, summarize_jobs
+
+
+@pytest.fixture
+def ledger(tmp_path) -> JobLedger:
+    return JobLedger(tmp_path / "job_ledger")
+
+
+@pytest.fixture
+def job() -> DownloadJob:
+    return DownloadJob(
+        exchange="nse",
+        mode="incremental",
+        start_date=date(2025, 1, 1),
+        tickers=["ABB", "INFY", "MRF", "TCS"],
+    )
+
+
+def test_resume_unfinished_job(ledger: JobLedger, job: DownloadJob):
+    ledger.start(job)
+    ledger.record(
+        job,
+        [
+            BatchResult(0, ["ABB", "INFY"], data=pl.DataFrame({"a": [1, 2]})),
+            BatchResult(1, ["MRF"], error=ConnectionError("timeout")),
+        ],
+    )
+
+    resumed = ledger.resumable_job("nse", "incremental")
+    assert resumed.job_id == job.job_id
+    assert resumed.start_date == job.start_date
+    # failed & never downloaded tickers are picked again
+    assert resumed.tickers == ["MRF", "TCS"]
+    assert ledger.resumable_job("nse", "full") is None
+
+
+def test_finished_job_is_not_resumed(ledger: JobLedger, job: DownloadJob):
+    ledger.start(job)
+    ledger.record(job, [BatchResult(0, job.tickers, data=pl.DataFrame({"a": [1]}))])
+    ledger.finish(job)
+
+    assert ledger.resumable_job("nse", "incremental") is None
+    summary = summarize_jobs(pl.scan_delta(ledger.db_path)).collect()
+    assert summary.height == 1
+    assert summary.item(0, "state") == "finished"
+    assert summary.item(0, "committed_tickers") == 4
+    assert summary.item(0, "rows") == 1
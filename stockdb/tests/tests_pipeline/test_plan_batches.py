@@ -0,0 +1,18 @@
+from datetime import date
+
+from pipeline.ticker_history_data_download import plan_batches
+
+
+def test_plan_batches_groups_by_watermark():
+    watermarks = {
+        "ABB": date(2025, 1, 10),
+        "INFY": date(2025, 1, 10),
+        "TCS": date(2025, 1, 10),
+        "MRF": date(2025, 1, 3),
+        "NEWCO": None,
+    }
+    batches = plan_batches(watermarks, batch_size=2)
+
+    assert batches == [["ABB", "INFY"], ["TCS"], ["MRF"], ["NEWCO"]]
+    # every batch shares a single start date
+    assert all(len({watermarks[t] for t in batch}) == 1 for batch in batches)
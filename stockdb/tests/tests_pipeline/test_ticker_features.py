@@ -0,0 +1,130 @@
+from datetime import date, timedelta
+
+import numpy as np
+import polars as pl
+import pytest
+from api.models import StockExchange
+from pipeline import ticker_features
+from pipeline.ticker_features import TickerFeatureStore
+from polars.testing import assert_frame_equal
+from stocksense.data import StockDataDB
+
+SPECS = [
+    {"name": "SMA", "period": 5},
+    {"name": "RSI", "period": 14},
+    {"name": "MACD"},
+    {"name": "ATR", "period": 14},
+    {"name": "OBV"},
+]
+
+
+def make_history(num_days: int) -> pl.DataFrame:
+    rng = np.random.default_rng(7)
+    frames = []
+    for ticker, days in (("ABB", num_days), ("INFY", num_days), ("MRF", 10)):
+        close = 100 + rng.normal(0, 1, days).cumsum()
+        frames.append(
+            pl.DataFrame({
+                "date": [date(2024, 1, 1) + timedelta(days=i) for i in range(days)],
+                "ticker": ticker,
+                "open": close + rng.normal(0, 0.5, days),
+                "high": close + 1,
+                "low": close - 1,
+                "close": close,
+                "volume": rng.integers(1_000, 10_000, days),
+            })
+        )
+    return pl.concat(frames)
+
+
+def build(base_path, history: pl.DataFrame) -> tuple[TickerFeatureStore, StockDataDB]:
+    history.write_delta(base_path / "ticker_history", mode="overwrite")
+    history_db = StockDataDB(base_path / "ticker_history")
+    store = TickerFeatureStore(base_path, SPECS)
+    states = store.load_states() or {}
+    store.update(
+        history_db,
+        store.pending_tickers(history_db, states),
+        states,
+        overwrite=not states,
+    )
+    return store, history_db
+
+
+def read_features(store: TickerFeatureStore) -> pl.DataFrame:
+    return pl.read_delta(store.features_path).sort("ticker", "date")
+
+
+def test_incremental_update_matches_full_build(tmp_path):
+    history = make_history(120)
+    full_store, _ = build(tmp_path / "full", history)
+
+    # build on the first 100 days, then append the rest (MRF gets no new bars)
+    store, _ = build(
+        tmp_path / "inc", history.filter(pl.col("date") < date(2024, 4, 10))
+    )
+    store, history_db = build(tmp_path / "inc", history)
+
+    assert store.pending_tickers(history_db, store.load_states()) == []
+    assert_frame_equal(read_features(store), read_features(full_store))
+    assert set(store.columns) < set(read_features(store).columns)
+
+
+def test_update_with_new_and_continuing_tickers(tmp_path):
+    history = make_history(60)
+    full_store, _ = build(tmp_path / "full", history)
+
+    # ABB is new to the second build, INFY continues & ends before ABB
+    first = history.filter(pl.col("date") < date(2024, 2, 1), ticker="INFY")
+    store, _ = build(tmp_path / "inc", first)
+    history = history.filter(
+        (pl.col("ticker") != "INFY") | (pl.col("date") < date(2024, 2, 20))
+    )
+    store, history_db = build(tmp_path / "inc", history)
+
+    states = store.load_states()
+    assert {ticker: last_date for ticker, (last_date, _) in states.items()} == {
+        "ABB": date(2024, 2, 29),
+        "INFY": date(2024, 2, 19),
+        "MRF": date(2024, 1, 10),
+    }
+    assert store.pending_tickers(history_db, states) == []
+    assert_frame_equal(
+        read_features(store),
+        read_features(full_store).filter(
+            (pl.col("ticker") != "INFY") | (pl.col("date") < date(2024, 2, 20))
+        ),
+    )
+
+
+def test_rollback_uncommitted(tmp_path):
+    store, _ = build(tmp_path, make_history(40))
+    committed = read_features(store)
+    # features appended by an update which failed before saving its states
+    committed.filter(ticker="ABB").tail(3).with_columns(
+        pl.col("date") + pl.duration(days=30)
+    ).write_delta(store.features_path, mode="append")
+
+    assert store.rollback_uncommitted(store.load_states()) == 3
+    assert_frame_equal(read_features(store), committed)
+
+
+def test_spec_change_triggers_rebuild(tmp_path):
+    store, _ = build(tmp_path, make_history(40))
+    assert store.load_states() is not None
+
+    assert TickerFeatureStore(tmp_path, SPECS[:2]).load_states() is None
+    with pytest.raises(ValueError):
+        TickerFeatureStore(tmp_path, [{"name": "SMA"}, {"name": "SMA", "period": 30}])
+
+
+@pytest.mark.asyncio
+async def test_disabled_feature_store(tmp_path, monkeypatch):
+    settings = ticker_features.settings
+    monkeypatch.setattr(settings.stockdb, "data_base_path", tmp_path)
+    monkeypatch.setattr(settings.stockdb, "feature_indicators", [])
+    make_history(40).write_delta(tmp_path / "nse/ticker_history")
+
+    result = await ticker_features.update_ticker_features(StockExchange.nse)
+    assert result == {"rebuilt": False, "num_tickers": 0, "num_rows": 0}
+    assert not (tmp_path / "nse/ticker_features").exists()
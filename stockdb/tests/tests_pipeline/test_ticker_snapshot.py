@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+
+import polars as pl
+from pipeline.ticker_snapshot import build_snapshot, write_snapshot
+
+
+def make_history(base_path) -> pl.DataFrame:
+    history = pl.concat(
+        pl.DataFrame({
+            "date": [date(2024, 1, 1) + timedelta(days=i) for i in range(days)],
+            "ticker": ticker,
+            "company": f"{ticker} Ltd",
+            "open": [float(i) for i in range(days)],
+            "high": [i + 1.0 for i in range(days)],
+            "low": [i - 1.0 for i in range(days)],
+            "close": [float(i) for i in range(days)],
+            "volume": list(range(days)),
+        })
+        for ticker, days in (("TCS", 30), ("INFY", 20), ("MRF", 2))
+    )
+    history.write_delta(base_path / "ticker_history")
+    return history
+
+
+def test_snapshot_keeps_latest_bars(tmp_path):
+    history = make_history(tmp_path)
+    snapshot = build_snapshot(tmp_path, 5)
+
+    assert snapshot.columns == history.columns
+    assert snapshot.group_by("ticker").len().sort("ticker").rows() == [
+        ("INFY", 5),
+        ("MRF", 2),
+        ("TCS", 5),
+    ]
+    assert snapshot.filter(ticker="TCS").get_column("date").to_list() == [
+        date(2024, 1, 26) + timedelta(days=i) for i in range(5)
+    ]
+
+
+def test_snapshot_skips_stale_tickers(tmp_path):
+    make_history(tmp_path)
+    snapshot = build_snapshot(tmp_path, 5, max_age=timedelta(days=10))
+
+    # MRF's & INFY's latest bars are 28 & 10 days older than the exchange's latest bar
+    assert snapshot.get_column("ticker").unique().sort().to_list() == ["INFY", "TCS"]
+    assert build_snapshot(tmp_path, 5, max_age=timedelta(0)).get_column(
+        "ticker"
+    ).unique().to_list() == ["TCS"]
+
+
+def test_snapshot_joins_features_and_equity(tmp_path):
+    history = make_history(tmp_path)
+    history.select(
+        "date", "ticker", SMA_2=pl.col("close").rolling_mean(2).over("ticker")
+    ).write_delta(tmp_path / "ticker_features")
+    pl.DataFrame({
+        "symbol": ["tcs", "INFY"],
+        "company": ["Tata Consultancy Services", "Infosys"],
+        "index_symbol": [["NIFTY 50", "NIFTY IT"], ["NIFTY 50"]],
+        "series": ["EQ", "EQ"],
+    }).write_delta(tmp_path / "equity")
+
+    assert write_snapshot(tmp_path, 3) == 8
+    snapshot = pl.read_delta(tmp_path / "ticker_snapshot").sort("ticker", "date")
+
+    assert snapshot.columns == [*history.columns, "SMA_2", "index_symbol", "series"]
+    latest = snapshot.group_by("ticker").last().sort("ticker")
+    assert latest.get_column("SMA_2").to_list() == [18.5, 0.5, 28.5]
+    assert latest.get_column("index_symbol").to_list() == [
+        ["NIFTY 50"],
+        None,
+        ["NIFTY 50", "NIFTY IT"],
+    ]
+
+
+def test_snapshot_without_features(tmp_path):
+    history = make_history(tmp_path)
+    history.select("date", "ticker", SMA_2=pl.col("close")).write_delta(
+        tmp_path / "ticker_features"
+    )
+
+    assert build_snapshot(tmp_path, 3, features=False).columns == history.columns
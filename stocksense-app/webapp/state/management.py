@@ -1,7 +1,8 @@
+import asyncio
 from datetime import datetime
 
 import reflex as rx
-from httpx import AsyncClient
+from httpx import AsyncClient, Response
 from stocksense.config import get_settings
 
 from webapp.state.shared import CommonMixin
@@ -9,6 +10,24 @@ from webapp.state.shared import CommonMixin
 settings = get_settings()
 
 
+async def _wait_for_task(
+    client: AsyncClient, task_id: str, poll_interval: float = 5.0
+) -> Response:
+    """Poll StockDB background task until it is finished & return its final status response"""
+    url = (
+        f"{settings.common.base_url}:{settings.stockdb.port}"
+        f"/api/operation/tasks/{task_id}"
+    )
+    while True:
+        response = await client.get(url)
+        if response.status_code != 200 or response.json()["status"] not in (
+            "pending",
+            "running",
+        ):
+            return response
+        await asyncio.sleep(poll_interval)
+
+
 class ConfigurationState(rx.State):
     """Application configuration state."""
 
@@ -254,17 +273,28 @@ class TaskState(CommonMixin, rx.State):
 
             url = (
                 f"{settings.common.base_url}:{settings.stockdb.port}"
-                "/api/task/ticker/history"
+                "/api/operation/download/ticker/history"
             )
 
             async with AsyncClient(follow_redirects=True) as client:
                 response = await client.post(url, json=payload)
+                if response.status_code == 202:
+                    response = await _wait_for_task(client, response.json()["task_id"])
 
             async with self:
-                if response.status_code == 200:
-                    self.update_submit_success = (
-                        "Data update task successfully completed!"
-                    )
+                if response.status_code == 200 and "status" not in response.json():
+                    # nothing to download, no task was submitted
+                    self.update_submit_success = response.json()["message"]
+                elif response.status_code == 200:
+                    task = response.json()
+                    if task["status"] == "completed":
+                        self.update_submit_success = (
+                            "Data update task successfully completed!"
+                        )
+                    else:
+                        self.update_submit_error = (
+                            f"Data update task {task['status']}: {task['error']}"
+                        )
                 else:
                     detail = "Request failed."
                     try:
@@ -312,12 +342,22 @@ class TaskState(CommonMixin, rx.State):
                     url,
                     params=payload,
                 )
+                if response.status_code == 202:
+                    response = await _wait_for_task(client, response.json()["task_id"])
 
             async with self:
-                if response.status_code == 200:
+                if (
+                    response.status_code == 200
+                    and response.json()["status"] == "completed"
+                ):
                     self.optimize_submit_success = (
                         "Table optimization task successfully completed with below stats:\n"
-                        f"{response.text}"
+                        f"{response.json()['result']}"
+                    )
+                elif response.status_code == 200:
+                    task = response.json()
+                    self.optimize_submit_error = (
+                        f"Table optimization task {task['status']}: {task['error']}"
                     )
                 else:
                     detail = "Request failed."
@@ -116,11 +116,15 @@ with tasks_tab:
                     else None,
                 }
                 response = rest_request_sync(
-                    url=f"{settings.common.base_url}:{settings.stockdb.port}/api/task/ticker/history",
+                    url=f"{settings.common.base_url}:{settings.stockdb.port}/api/operation/download/ticker/history",
                     method="POST",
                     payload_data=payload,
                 )
-            if response.status_code == 200:
-                st.success("Data update task successfully completed!")
+            if response.status_code == 202:
+                st.success(
+                    f"Data update task submitted with task id `{response.json()['task_id']}`"
+                )
+            elif response.status_code == 200:
+                st.success(response.json()["message"])
             else:
                 st.error(response.json()["detail"])
@@ -6,16 +6,19 @@ from stocksense.config import get_settings
 from app.state.model import PreviewMethodChoice
 
 settings = get_settings()
+# NOTE - Arrow IPC keeps column types & skips per row JSON (de)serialization on both ends
+ARROW_STREAM_HEADERS = {"Accept": "application/vnd.apache.arrow.stream"}
 
 
 def fetch_data_from_sql_query(exchange: str, sql_query: str) -> pl.LazyFrame | None:
     response = httpx.post(
         url=f"{settings.common.base_url}:{settings.stockdb.port}/api/per-security/{exchange}/query",
         json={"sql_query": sql_query},
+        headers=ARROW_STREAM_HEADERS,
     )
     if response.status_code == 200:
         st.success("Data fetched successfully!")
-        return pl.LazyFrame(response.json())
+        return pl.read_ipc_stream(response.content).lazy()
     else:
         st.error(f"Error fetching data: {response.json()['detail']}")
         # Return empty DataFrame on error
@@ -24,20 +27,19 @@ def fetch_data_from_sql_query(exchange: str, sql_query: str) -> pl.LazyFrame | N
 
 def fetch_data_from_form(
     exchange: str, params: dict, selected_tickers: pl.DataFrame
-) -> list[pl.LazyFrame]:
-    data_collection = []
-    with httpx.Client(
-        base_url=f"{settings.common.base_url}:{settings.stockdb.port}/api/per-security/{exchange}",
-        params=params,
-    ) as client:
-        for ticker in selected_tickers.iter_rows():
-            response = client.get(f"/{ticker[0]}/history")
-            if response.status_code == 200:
-                data_collection.append(pl.LazyFrame(response.json()))
-            else:
-                st.error(f"Error fetching data for {ticker[0]}")
+) -> pl.LazyFrame | None:
+    # NOTE - all tickers are fetched in one request (& one table scan) by bulk history endpoint
+    response = httpx.post(
+        url=f"{settings.common.base_url}:{settings.stockdb.port}/api/bulk/{exchange}/history",
+        json={**params, "ticker": selected_tickers.to_series().to_list()},
+        headers=ARROW_STREAM_HEADERS,
+        timeout=None,
+    )
+    if response.status_code == 200:
         st.success("Data fetched successfully!")
-    return data_collection
+        return pl.read_ipc_stream(response.content).lazy()
+    else:
+        st.error(f"Error fetching data: {response.json()['detail']}")
 
 
 def data_preview_control(